@@ -0,0 +1,131 @@
+"""
+Seeded generator for synthetic markdown corpora.
+
+Produces pages that exercise everything the parser understands - headings,
+paragraphs with (nested) emphasis, links, images, quotes, long unordered
+and ordered lists and fenced code - at a configurable size. The same seed
+always yields the same corpus, so results are comparable across revisions.
+
+Usage:
+    python benchmarks/corpus.py OUT_DIR --pages 1000 --page-size 10KB --seed 1
+"""
+import random
+import argparse
+from pathlib import Path
+
+WORDS = (
+    "elven ring mountain river shadow light forest tower road silver golden "
+    "ancient council journey hobbit wizard king shire dwarf bridge harbour "
+    "star song lamp stone gate hall fire winter spring valley ship sea"
+).split()
+
+SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(text: str) -> int:
+    """
+    Parse a size such as "512", "1KB" or "10MB" into bytes.
+    """
+    text = text.strip().upper()
+    for unit in sorted(SIZE_UNITS, key=len, reverse=True):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * SIZE_UNITS[unit])
+    return int(text)
+
+class MarkdownGenerator:
+    """
+    Builds random but well-formed markdown blocks from a seeded RNG.
+    """
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def words(self, low: int, high: int) -> str:
+        return " ".join(self.rng.choice(WORDS) for _ in range(self.rng.randint(low, high)))
+
+    def inline(self) -> str:
+        """
+        A run of text with a sprinkling of inline markup.
+        """
+        parts = []
+        for _ in range(self.rng.randint(3, 12)):
+            roll = self.rng.random()
+            if roll < 0.55:
+                parts.append(self.words(2, 10))
+            elif roll < 0.65:
+                parts.append(f"**{self.words(1, 3)}**")
+            elif roll < 0.70:
+                # Emphasis nested inside bold
+                parts.append(f"**{self.words(1, 2)} _{self.words(1, 2)}_ {self.words(1, 2)}**")
+            elif roll < 0.78:
+                parts.append(f"*{self.words(1, 3)}*")
+            elif roll < 0.84:
+                parts.append(f"`{self.rng.choice(WORDS)}()`")
+            elif roll < 0.94:
+                target = self.rng.choice(["/blog/", "https://example.com/", "/contact/"])
+                parts.append(f"[{self.words(1, 3)}]({target}{self.rng.choice(WORDS)})")
+            else:
+                parts.append(f"![{self.words(1, 3)}](/images/{self.rng.choice(WORDS)}.png)")
+        return " ".join(parts)
+
+    def block(self) -> str:
+        roll = self.rng.random()
+        if roll < 0.45:
+            lines = [self.inline() for _ in range(self.rng.randint(1, 4))]
+            return "\n".join(lines)
+        if roll < 0.55:
+            return f"{'#' * self.rng.randint(2, 4)} {self.words(2, 6)}"
+        if roll < 0.65:
+            return "\n".join(f"- {self.inline()}" for _ in range(self.rng.randint(3, 40)))
+        if roll < 0.75:
+            return "\n".join(f"{i}. {self.inline()}" for i in range(1, self.rng.randint(3, 40)))
+        if roll < 0.85:
+            return "\n".join(f"> {self.inline()}" for _ in range(self.rng.randint(1, 5)))
+        code = "\n".join(f"    {self.rng.choice(WORDS)}({self.rng.choice(WORDS)}) ** 2" for _ in range(self.rng.randint(2, 25)))
+        return f"```python\ndef {self.rng.choice(WORDS)}():\n{code}\n```"
+
+    def page(self, size: int) -> str:
+        """
+        A page of roughly size bytes, starting with its h1 title.
+        """
+        blocks = [f"# {self.words(2, 5).title()}"]
+        length = len(blocks[0])
+        while length < size:
+            block = self.block()
+            blocks.append(block)
+            length += len(block) + 2
+        return "\n\n".join(blocks) + "\n"
+
+def generate_corpus(out_dir: Path, pages: int, page_size: int, seed: int = 1, per_dir: int = 100) -> list:
+    """
+    Write a content tree of generated pages, one page in memory at a time.
+
+    Args:
+        out_dir (Path): Directory to create the pages under
+        pages (int): Number of pages
+        page_size (int): Approximate size of each page in bytes
+        seed (int): RNG seed; the same seed reproduces the same corpus
+        per_dir (int): Pages per section directory
+
+    Returns:
+        list[Path]: Paths of the generated markdown files
+    """
+    generator = MarkdownGenerator(seed)
+    paths = []
+    for index in range(pages):
+        path = Path(out_dir) / f"section-{index // per_dir:04d}" / f"page-{index:06d}" / "index.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(generator.page(page_size), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic markdown corpus.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--page-size", type=parse_size, default="1KB")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    generate_corpus(args.out_dir, args.pages, args.page_size, args.seed)
+
+if __name__ == "__main__":
+    main()
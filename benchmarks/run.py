@@ -0,0 +1,241 @@
+"""
+Benchmark suite for the site generator.
+
+Generates a seeded corpus, then times the parser and renderer stages and a
+full generate_pages_recursive build over it. Results are written as JSON
+so revisions can be compared; each benchmark reports throughput (MB/s and
+pages/s) and, from a separate traced run, peak memory. The memory run also
+reports the retained bytes per node of the corpus's node objects.
+
+Usage:
+    python benchmarks/run.py --pages 100 --page-size 10KB --output results.json
+    python benchmarks/run.py --bench markdown_to_html_node --bench to_html --repeat 5
+"""
+import sys
+import json
+import time
+import shutil
+import logging
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import generate_corpus, parse_size
+from block_parser import markdown_to_blocks
+from markdown_to_html import markdown_to_html, markdown_to_html_node
+from text_to_textnodes import text_to_textnodes
+from generate_page import generate_pages_recursive
+
+TEMPLATE = ROOT / "template.html"
+
+def bench_markdown_to_html_node(paths, workdir):
+    """Parse every page into an HTMLNode tree."""
+    elapsed = 0.0
+    for path in paths:
+        markdown = path.read_text(encoding='utf-8')
+        start = time.perf_counter()
+        markdown_to_html_node(markdown)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def bench_markdown_to_html(paths, workdir):
+    """Render every page straight to an HTML string, without a node tree."""
+    elapsed = 0.0
+    for path in paths:
+        markdown = path.read_text(encoding='utf-8')
+        start = time.perf_counter()
+        markdown_to_html(markdown)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def bench_text_to_textnodes(paths, workdir):
+    """Run inline parsing over every block of every page."""
+    elapsed = 0.0
+    for path in paths:
+        blocks = markdown_to_blocks(path.read_text(encoding='utf-8'))
+        # Code blocks are never inline-parsed
+        blocks = [block for block in blocks if not block.startswith("```")]
+        start = time.perf_counter()
+        for block in blocks:
+            text_to_textnodes(block)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def bench_to_html(paths, workdir):
+    """Render pre-built ParentNode trees to strings."""
+    elapsed = 0.0
+    for path in paths:
+        node = markdown_to_html_node(path.read_text(encoding='utf-8'))
+        start = time.perf_counter()
+        node.to_html()
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+def bench_generate_pages_recursive(paths, workdir, jobs=1):
+    """A full build of the corpus into a fresh output directory."""
+    dest = workdir / "docs"
+    shutil.rmtree(dest, ignore_errors=True)
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        generate_pages_recursive(workdir / "content", TEMPLATE, dest, "/", workers=jobs)
+        return time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+BENCHMARKS = {
+    "markdown_to_html_node": bench_markdown_to_html_node,
+    "markdown_to_html": bench_markdown_to_html,
+    "text_to_textnodes": bench_text_to_textnodes,
+    "to_html": bench_to_html,
+    "generate_pages_recursive": bench_generate_pages_recursive,
+}
+
+def peak_memory(fn, *args) -> int:
+    """
+    Run fn once under tracemalloc and return its peak traced allocation in bytes.
+    """
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def count_nodes(node) -> int:
+    """
+    Count the HTMLNodes in a tree, iteratively so deep trees are fine.
+    """
+    count = 0
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+def retained_memory(build) -> tuple:
+    """
+    Return (objects built, bytes still allocated while they are alive).
+    """
+    tracemalloc.start()
+    try:
+        objects = build()
+        retained = tracemalloc.get_traced_memory()[0]
+        return objects, retained
+    finally:
+        tracemalloc.stop()
+
+def node_memory(paths) -> dict:
+    """
+    Measure the bytes per node of each page's HTMLNode tree and of the
+    TextNodes from inline-parsing its blocks.
+
+    Pages are measured one at a time and the counts summed, so only one
+    page's nodes are alive at once however large the corpus is.
+    """
+    html_nodes = tree_bytes = text_nodes = text_bytes = 0
+    for path in paths:
+        page = path.read_text(encoding='utf-8')
+        blocks = [block for block in markdown_to_blocks(page) if not block.startswith("```")]
+
+        tree, retained = retained_memory(lambda: markdown_to_html_node(page))
+        html_nodes += count_nodes(tree)
+        tree_bytes += retained
+        del tree
+
+        texts, retained = retained_memory(lambda: [text_to_textnodes(block) for block in blocks])
+        text_nodes += sum(len(nodes) for nodes in texts)
+        text_bytes += retained
+        del texts
+
+    return {
+        "html_nodes": {"count": html_nodes, "bytes": tree_bytes, "bytes_per_node": tree_bytes / html_nodes},
+        "text_nodes": {"count": text_nodes, "bytes": text_bytes, "bytes_per_node": text_bytes / text_nodes},
+    }
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="site-bench-"))
+    try:
+        paths = generate_corpus(workdir / "content", args.pages, args.page_size, args.seed)
+        corpus_bytes = sum(path.stat().st_size for path in paths)
+
+        results = []
+        for name in args.bench or list(BENCHMARKS):
+            fn = BENCHMARKS[name]
+            extra = (args.jobs,) if name == "generate_pages_recursive" else ()
+            # Best of N: the fastest run has the least interference from the machine
+            seconds = min(fn(paths, workdir, *extra) for _ in range(args.repeat))
+            result = {
+                "name": name,
+                "seconds": seconds,
+                "bytes": corpus_bytes,
+                "pages": len(paths),
+                "mb_per_s": corpus_bytes / seconds / 1024 ** 2 if seconds else None,
+                "pages_per_s": len(paths) / seconds if seconds else None,
+            }
+            if not args.no_memory:
+                result["peak_memory_bytes"] = peak_memory(fn, paths, workdir, *extra)
+            results.append(result)
+            print(f"{name:<26} {seconds:>9.4f}s {result['mb_per_s'] or 0:>9.2f} MB/s "
+                  f"{result['pages_per_s'] or 0:>10.1f} pages/s", file=sys.stderr)
+
+        report = {
+            "meta": {
+                "revision": git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "pages": args.pages,
+                "page_size": args.page_size,
+                "repeat": args.repeat,
+                "jobs": args.jobs,
+            },
+            "results": results,
+        }
+        if not args.no_memory:
+            report["node_memory"] = node_memory(paths)
+            for kind, record in report["node_memory"].items():
+                print(f"{kind:<26} {record['count']:>10} nodes {record['bytes_per_node']:>8.1f} bytes/node",
+                      file=sys.stderr)
+        return report
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the site generator on a synthetic corpus.")
+    parser.add_argument("--pages", type=int, default=10, help="number of pages to generate (default: 10)")
+    parser.add_argument("--page-size", type=parse_size, default="1KB",
+                        help="approximate size of each page, e.g. 1KB or 10MB (default: 1KB)")
+    parser.add_argument("--seed", type=int, default=1, help="corpus RNG seed (default: 1)")
+    parser.add_argument("--bench", action="append", choices=sorted(BENCHMARKS),
+                        help="benchmark to run; repeatable (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best is kept (default: 3)")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for the full build (default: 1)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory and node-size runs")
+    parser.add_argument("--output", type=Path, help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
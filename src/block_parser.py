@@ -1,42 +1,178 @@
+import re
+from typing import Iterable, Iterator, List, NamedTuple
+from block_to_block import BlockType
+
+HEADING_REGEX = re.compile(r'#{1,6}\s')
+# The first line of a heading block with more lines after it: the marks may
+# stand alone, as block_to_block_type's \s matches the line break
+MULTILINE_HEADING_REGEX = re.compile(r'#{1,6}(\s|$)')
+ORDERED_ITEM_REGEX = re.compile(r'(\d+)\.\s')
+
+class Block(NamedTuple):
+    """
+    A classified markdown block and its lines.
+
+    The first line has its leading whitespace removed and the last line its
+    trailing whitespace, exactly as if the block had been strip()ped.
+    """
+    block_type: BlockType
+    lines: List[str]
+
+class _BlockClassifier:
+    """
+    Classifies a block one line at a time as the lines are collected.
+
+    Applies the same rules as block_to_block_type, in the same order of
+    precedence, without re-splitting or re-scanning the block afterwards.
+    """
+
+    def __init__(self, first_line: str):
+        self.first_line = first_line
+        self.code_start = first_line.startswith('```')
+        self.code = False
+        self.lines = 0
+        self.quote = True
+        self.unordered = True
+        # Next number an ordered list needs, or 0 once it can't be one
+        self.next_number = 1
+
+    def add(self, line: str):
+        stripped = line.strip()
+        self.lines += 1
+        self.code = self.code_start and line.rstrip().endswith('```')
+        self.quote = self.quote and line.startswith('>')
+        self.unordered = self.unordered and stripped.startswith(('* ', '- '))
+        if self.next_number:
+            match = ORDERED_ITEM_REGEX.match(stripped)
+            if match and int(match.group(1)) == self.next_number:
+                self.next_number += 1
+            else:
+                self.next_number = 0
+
+    def heading(self) -> bool:
+        # Matched against the block as strip() leaves it, so "# " alone isn't one
+        if self.lines == 1:
+            return HEADING_REGEX.match(self.first_line.rstrip()) is not None
+        return MULTILINE_HEADING_REGEX.match(self.first_line) is not None
+
+    def block_type(self) -> BlockType:
+        if self.code:
+            return BlockType.CODE
+        if self.heading():
+            return BlockType.HEADING
+        if self.quote:
+            return BlockType.QUOTE
+        if self.unordered:
+            return BlockType.UNORDERED_LIST
+        if self.next_number:
+            return BlockType.ORDERED_LIST
+        return BlockType.PARAGRAPH
+
+def _opens_fence(line: str) -> bool:
+    """
+    Check whether a block's first line starts a fenced code block, i.e.
+    starts with ``` and has no closing ``` of its own.
+    """
+    if not line.startswith('```'):
+        return False
+    line = line.rstrip()
+    return len(line) < 6 or not line.endswith('```')
+
+def iter_blocks(lines: Iterable[str], fences: bool = True) -> Iterator[Block]:
+    """
+    Split markdown lines into blocks and classify each one, in a single pass.
+
+    Blocks are separated by blank lines, except inside a fenced code block:
+    a block whose first line starts with ``` runs until a later line that is
+    just ```, blank lines included, so code lines may end in ``` themselves.
+    A first line that already ends with a closing ```, such as ```code```,
+    doesn't open a fence. A fence that is never closed is split at blank
+    lines and classified like any other text, as block_to_block_type does;
+    ```\ncode``` is still a code block that way.
+
+    Args:
+        lines (Iterable[str]): Markdown lines without their line endings
+        fences (bool): Recognise fenced code blocks
+
+    Yields:
+        Block: Each block as soon as its last line has been seen
+    """
+    current = []
+    classifier = None
+    fence = None
+
+    for line in lines:
+        if fence is not None:
+            fence.append(line)
+            if line.strip() == '```':
+                fence[-1] = fence[-1].strip()
+                yield Block(BlockType.CODE, fence)
+                fence = None
+            continue
+
+        if not line.strip():
+            # A blank line ends the current block
+            if current:
+                current[-1] = current[-1].rstrip()
+                yield Block(classifier.block_type(), current)
+                current = []
+            continue
+
+        if not current:
+            line = line.lstrip()
+            if fences and _opens_fence(line):
+                fence = [line]
+                continue
+            classifier = _BlockClassifier(line)
+
+        classifier.add(line)
+        current.append(line)
+
+    if fence is not None:
+        # Unclosed fence - split and classify its lines like any other text
+        yield from iter_blocks(fence, fences=False)
+    elif current:
+        current[-1] = current[-1].rstrip()
+        yield Block(classifier.block_type(), current)
+
+def iter_file_lines(f) -> Iterator[str]:
+    """
+    Yield the lines of an open text file without their line endings.
+    """
+    for line in f:
+        yield line.rstrip('\r\n')
+
+def parse_blocks(markdown: str) -> List[Block]:
+    """
+    Split a markdown document into classified blocks.
+
+    Args:
+        markdown (str): Complete markdown document
+
+    Returns:
+        List[Block]: The document's blocks in order
+
+    Example:
+        >>> parse_blocks("# Header\\n\\n* One\\n* Two")
+        [Block(block_type=<BlockType.HEADING: 'heading'>, lines=['# Header']),
+         Block(block_type=<BlockType.UNORDERED_LIST: 'unordered_list'>, lines=['* One', '* Two'])]
+    """
+    return list(iter_blocks(markdown.split('\n')))
+
 def markdown_to_blocks(markdown):
     """
     Split markdown text into blocks based on blank lines.
     A block is a piece of text separated by blank lines.
-    
+
     Args:
         markdown (str): Complete markdown document
-        
+
     Returns:
         list: List of strings, each representing a markdown block
-        
+
     Example:
         >>> text = "# Header\\n\\nParagraph\\n\\n* List item"
         >>> markdown_to_blocks(text)
         ['# Header', 'Paragraph', '* List item']
     """
-    # First, split the text into lines and combine them into blocks
-    lines = markdown.split('\n')
-    blocks = []
-    current_block = []
-    
-    for line in lines:
-        # If we hit an empty line, start a new block
-        if line.strip() == '' and current_block:
-            # Join the lines in the current block and add to blocks
-            blocks.append('\n'.join(current_block))
-            current_block = []
-        # If it's not an empty line, add to current block
-        elif line.strip() != '':
-            current_block.append(line)
-    
-    # Add the last block if there is one
-    if current_block:
-        blocks.append('\n'.join(current_block))
-    
-    # Strip any whitespace from the blocks
-    blocks = [block.strip() for block in blocks]
-    
-    # Filter out any empty blocks
-    blocks = [block for block in blocks if block]
-    
-    return blocks
+    return ['\n'.join(block.lines) for block in iter_blocks(markdown.split('\n'))]
@@ -0,0 +1,403 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+
+# Bump whenever a generator change alters rendered output, so pages written
+# by an older generator are never mistaken for fresh ones.
+GENERATOR_VERSION = "6"
+
+# Layout version of the manifest file itself
+MANIFEST_FORMAT = 1
+
+def hash_bytes(data: bytes) -> str:
+    """
+    Return the hex digest used for every content hash in the manifest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path: Path) -> str:
+    """
+    Hash a file's contents in fixed-size chunks so large files stay cheap on memory.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def write_if_changed(path, data: bytes) -> bool:
+    """
+    Write data to path unless the file already holds exactly those bytes.
+
+    Leaving an identical file alone keeps its mtime, so rsync and other
+    mtime-based sync tools see it as unchanged. A changed file is written
+    next to path and renamed over it, so readers never see it half-written
+    and a hardlinked copy of the old file keeps the old content.
+
+    Returns:
+        bool: True if the file was written
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+def replace_if_changed(tmp_path, path, digest: str) -> bool:
+    """
+    Move a freshly written file over path, unless path already has its content.
+
+    The large-file counterpart of write_if_changed, for outputs streamed to
+    a temporary file: tmp_path is removed either way.
+
+    Args:
+        tmp_path: File just written, next to path
+        path: Final location of the output
+        digest (str): Hash of tmp_path's content
+
+    Returns:
+        bool: True if path was replaced
+    """
+    try:
+        if os.path.getsize(path) == os.path.getsize(tmp_path) and hash_file(Path(path)) == digest:
+            os.unlink(tmp_path)
+            return False
+    except FileNotFoundError:
+        pass
+    os.replace(tmp_path, path)
+    return True
+
+class HashingWriter:
+    """
+    File wrapper that UTF-8 encodes and hashes text fragments as they are written.
+
+    Lets a page be streamed to disk while still producing the output hash
+    the manifest records, without holding the whole page in memory.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def write(self, text: str):
+        data = text.encode('utf-8')
+        self.digest.update(data)
+        self.f.write(data)
+
+    def hexdigest(self) -> str:
+        return self.digest.hexdigest()
+
+class BuildManifest:
+    """
+    Persisted record of what the previous build produced, used to skip pages
+    whose inputs have not changed.
+
+    Each page record maps an output path to the hashes of every file it was
+    rendered from (its dependencies: the markdown source, its layout and any
+    partials the layout includes),
+    the basepath and generator version it was built with, and the hash of
+    the output it produced. A page is fresh only if all of those still match.
+
+    A separate file table caches (size, mtime, hash) per path, so an unchanged
+    file is hashed once and then only stat()ed on later builds.
+
+    The manifest also lists the outputs copied from static/ by the last build,
+    so the static sync can delete the copies of files that were removed, and
+    the hash of every output as of the last successful build, which the
+    next one diffs against to report what changed. ok says whether the
+    build that last saved it finished; a failed build saves its progress
+    with ok false, so a shard it left half done isn't merged.
+
+    All paths are stored relative to ``root`` so the manifest survives the
+    project being checked out somewhere else (e.g. restored from a CI cache).
+    """
+
+    def __init__(self, path: Path, root: Path, pages=None, files=None, static=None, outputs=None, ok: bool = True):
+        self.path = Path(path)
+        self.root = Path(root)
+        self.pages = pages or {}
+        self.files = files or {}
+        self.static = static or []
+        self.outputs = outputs or {}
+        self.ok = ok
+        # Outputs touched (rebuilt or confirmed fresh) during this build
+        self._seen = set()
+        # Hashes already computed during this build, so shared dependencies
+        # such as the template are stat()ed and hashed at most once
+        self._hashes = {}
+
+    def begin_build(self):
+        """
+        Start another build with this manifest, e.g. the next rebuild in watch mode.
+
+        Forgets which outputs the previous build touched and the hashes it
+        computed, so files edited since then are stat()ed and hashed again.
+        The manifest counts as failed until the build marks it ok.
+        """
+        self.ok = False
+        self._seen = set()
+        self._hashes = {}
+
+    @classmethod
+    def load(cls, path: Path, root: Path) -> "BuildManifest":
+        """
+        Load a manifest from disk, starting empty if it is missing or unreadable.
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls(path, root)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable build manifest {path}: {e}")
+            return cls(path, root)
+
+        if data.get("format") != MANIFEST_FORMAT:
+            logging.info(f"Build manifest {path} has an old format, rebuilding everything")
+            return cls(path, root)
+
+        return cls(path, root, data.get("pages", {}), data.get("files", {}), data.get("static", []),
+                   data.get("outputs", {}), data.get("ok", True))
+
+    def save(self):
+        """
+        Write the manifest atomically so an interrupted build never leaves it half-written.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "format": MANIFEST_FORMAT,
+            "pages": self.pages,
+            "files": self.files,
+            "static": self.static,
+            "outputs": self.outputs,
+            "ok": self.ok,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def move_outputs(self, old_dir, new_dir):
+        """
+        Re-key every record under old_dir to the same path under new_dir.
+
+        Used when the output directory is renamed, e.g. to build into a
+        staging copy of docs/ and then swap it in. The outputs of the last
+        successful build are left as they were published.
+        """
+        old_prefix = self._key(old_dir) + "/"
+        new_prefix = self._key(new_dir) + "/"
+
+        def move(key: str) -> str:
+            return new_prefix + key[len(old_prefix):] if key.startswith(old_prefix) else key
+
+        self.pages = {move(key): record for key, record in self.pages.items()}
+        self.files = {move(key): entry for key, entry in self.files.items()}
+        self.static = [move(key) for key in self.static]
+        self._seen = {move(key) for key in self._seen}
+        self._hashes = {move(key): digest for key, digest in self._hashes.items()}
+
+    def output_hashes(self) -> dict:
+        """
+        Map every output of the current build, pages and static copies, to its content hash.
+        """
+        hashes = {key: record["output_hash"] for key, record in self.pages.items()}
+        for key in self.static:
+            digest = self.file_hash(self.root / key)
+            if digest is not None:
+                hashes[key] = digest
+        return dict(sorted(hashes.items()))
+
+    def _key(self, path) -> str:
+        """
+        Convert a path into the root-relative posix string used as a manifest key.
+        """
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            # Outside the project root - fall back to the absolute path
+            return path.resolve().as_posix()
+
+    def file_hash(self, path) -> str | None:
+        """
+        Return the content hash of a file, or None if it does not exist.
+
+        The hash is reused from the file table when size and mtime are unchanged
+        since it was last recorded.
+        """
+        key = self._key(path)
+        if key in self._hashes:
+            return self._hashes[key]
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._hashes[key] = None
+            return None
+
+        cached = self.files.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            digest = cached["hash"]
+        else:
+            digest = hash_file(Path(path))
+            self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+
+        self._hashes[key] = digest
+        return digest
+
+    def record_copy(self, src, dest):
+        """
+        Note that dest was just copied from src, so its hash is known without reading it.
+        """
+        key = self._key(dest)
+        digest = self.file_hash(src)
+        stat = os.stat(dest)
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+        self._hashes[key] = digest
+
+    def dependency_hashes(self, deps) -> dict:
+        """
+        Map each dependency path to its current content hash.
+        """
+        return {self._key(dep): self.file_hash(dep) for dep in deps}
+
+    def is_fresh(self, dest_path, source_path, basepath) -> bool:
+        """
+        Check whether an output is up to date with its dependencies.
+
+        The dependencies recorded last time are re-checked rather than
+        recomputed: a page can only switch layouts by editing its source,
+        and that changes the source hash.
+
+        Args:
+            dest_path (Path): Output file the page renders to
+            source_path (Path): Markdown source of the page
+            basepath (str): Basepath the page would be rendered with
+
+        Returns:
+            bool: True if the existing output can be kept as-is
+        """
+        key = self._key(dest_path)
+        self._seen.add(key)
+
+        record = self.pages.get(key)
+        if record is None or record["source"] != self._key(source_path):
+            return False
+        if record["generator"] != GENERATOR_VERSION or record["basepath"] != str(basepath):
+            return False
+        if any(self.file_hash(self.root / dep) != digest for dep, digest in record["deps"].items()):
+            return False
+
+        # The output must still be exactly what we wrote last time
+        return record["output_hash"] is not None and self.file_hash(dest_path) == record["output_hash"]
+
+    def record(self, source_path, dest_path, deps, basepath, output_hash: str):
+        """
+        Record a freshly rendered page.
+
+        Args:
+            source_path (Path): Markdown source of the page
+            dest_path (Path): Output file that was written
+            deps (list[Path]): Every file the page was rendered from
+            basepath (str): Basepath the page was rendered with
+            output_hash (str): Hash of the bytes written to dest_path
+        """
+        key = self._key(dest_path)
+        self._seen.add(key)
+        self.pages[key] = {
+            "source": self._key(source_path),
+            "deps": self.dependency_hashes(deps),
+            "basepath": str(basepath),
+            "generator": GENERATOR_VERSION,
+            "output_hash": output_hash,
+        }
+
+        # Remember the output's stat so the next build can verify it without re-reading it
+        stat = os.stat(dest_path)
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": output_hash}
+        self._hashes[key] = output_hash
+
+    def adopt(self, dest_path, record: dict, files: dict = None):
+        """
+        Record a page that was rendered elsewhere and copied to dest_path.
+
+        Used to merge shard builds, whose manifests share this one's root.
+
+        Args:
+            dest_path (Path): Where the page's output now is
+            record (dict): The page's record from the manifest that built it
+            files (dict): That manifest's file table; the page's dependency
+                entries are carried over so they aren't hashed again
+        """
+        key = self._key(dest_path)
+        self._seen.add(key)
+        self.pages[key] = dict(record)
+        for dep in record["deps"]:
+            if files and dep in files:
+                self.files[dep] = files[dep]
+
+        stat = os.stat(dest_path)
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": record["output_hash"]}
+        self._hashes[key] = record["output_hash"]
+
+    def dependents(self, path) -> list:
+        """
+        List the sources of every recorded page that was rendered from path.
+
+        Args:
+            path (Path): A dependency such as a layout or partial
+
+        Returns:
+            list[Path]: Markdown sources of the pages depending on it
+        """
+        key = self._key(path)
+        return sorted(self.root / record["source"] for record in self.pages.values() if key in record["deps"])
+
+    def remove_source(self, source_path) -> list:
+        """
+        Delete and forget the outputs rendered from a source that was removed.
+
+        Returns:
+            list[str]: Manifest keys of the outputs that were removed
+        """
+        source = self._key(source_path)
+        removed = []
+        for key in sorted(key for key, record in self.pages.items() if record["source"] == source):
+            output = self.root / key
+            if output.exists():
+                logging.info(f"Removing stale {key}")
+                output.unlink()
+            del self.pages[key]
+            self.files.pop(key, None)
+            removed.append(key)
+        return removed
+
+    def prune(self) -> list:
+        """
+        Delete outputs of pages that no longer have a source and forget them.
+
+        Returns:
+            list[str]: Manifest keys of the outputs that were removed
+        """
+        removed = []
+        for key in sorted(set(self.pages) - self._seen):
+            output = self.root / key
+            if output.exists():
+                logging.info(f"Removing stale {key}")
+                output.unlink()
+            del self.pages[key]
+            self.files.pop(key, None)
+            removed.append(key)
+        return removed
@@ -0,0 +1,343 @@
+import shutil
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, NamedTuple, Set, Tuple
+from compiler import StaticCopier, copy_static
+from generate_page import BuildError, generate_pages_recursive
+from build_manifest import BuildManifest
+from changes import OutputChanges, diff_outputs, write_changes
+from fragment_cache import DEFAULT_MAX_BYTES, FragmentCache
+from template import TemplateCache
+from shards import check_shard, merge_shard, shard_dir, shard_sources
+from staging import LivePathFilter, stage_directory, staging_dir, swap_in
+
+class RebuildPlan(NamedTuple):
+    """
+    The work needed to bring the site up to date after some files changed.
+
+    static is set when static/ must be re-synced, sources lists the pages
+    to re-render and removed the sources whose outputs must be deleted.
+    full asks for an ordinary incremental build instead, for changes whose
+    effect can't be traced through the manifest (e.g. a brand new layout).
+    """
+    static: bool
+    sources: Set[Path]
+    removed: Set[Path]
+    full: bool
+
+    def is_empty(self) -> bool:
+        return not (self.static or self.sources or self.removed or self.full)
+
+def is_within(path: Path, directory: Path) -> bool:
+    try:
+        path.resolve().relative_to(directory.resolve())
+        return True
+    except ValueError:
+        return False
+
+def plan_rebuild(changed: Iterable[Path], manifest: BuildManifest, content_dir: Path, static_dir: Path) -> RebuildPlan:
+    """
+    Work out the smallest set of outputs affected by a set of changed files.
+
+    Markdown sources map to their own page. Any other file (the template, a
+    layout or a partial) maps to the pages the manifest recorded it as a
+    dependency of.
+
+    Args:
+        changed (Iterable[Path]): Files that were added, modified or deleted
+        manifest (BuildManifest): Manifest of the build being updated
+        content_dir (Path): Directory holding the markdown sources
+        static_dir (Path): Directory holding the static files
+
+    Returns:
+        RebuildPlan: What to re-sync, re-render and delete
+    """
+    static = full = False
+    sources, removed = set(), set()
+
+    for path in changed:
+        path = Path(path)
+        if is_within(path, static_dir):
+            static = True
+        elif is_within(path, content_dir):
+            if path.suffix != '.md':
+                continue
+            if path.exists():
+                sources.add(path)
+            else:
+                removed.add(path)
+        else:
+            dependents = manifest.dependents(path)
+            if dependents:
+                sources.update(dependents)
+            else:
+                # Nothing recorded depends on it yet - let the freshness check decide
+                full = True
+
+    return RebuildPlan(static, sources, removed, full)
+
+class SiteBuilder:
+    """
+    Builds one project, keeping its manifest, compiled templates and fragment
+    cache between builds.
+
+    A single instance can run many builds - an initial full build and then
+    rebuilds of just the pages affected by each edit - without reloading
+    anything from disk that hasn't changed.
+
+    An atomic builder builds docs/ in a staging copy next to it and swaps
+    that in with a rename once the build has succeeded, so docs/ is never
+    served half-built and a failed build leaves it untouched. Rebuilds of a
+    few pages after an edit still update docs/ in place.
+
+    A builder given a shard (i, N) builds only the pages assigned to shard i
+    of N, into its own directory and manifest under .build/shards/; a
+    builder without one merges the N shards with merge_shards.
+
+    Example:
+        >>> builder = SiteBuilder(Path("."), basepath="/site-generator/")
+        >>> builder.build()
+        >>> builder.rebuild([Path("content/index.md")])
+    """
+
+    def __init__(self, project_root: Path, basepath: str = "/", workers: int = 1, use_hash: bool = False,
+                 fragment_cache_bytes: int = DEFAULT_MAX_BYTES, pipelined: bool = False,
+                 shard: Tuple[int, int] = None, atomic: bool = False, copy_strategy: str = "auto"):
+        self.root = Path(project_root)
+        self.basepath = basepath
+        self.workers = workers
+        self.use_hash = use_hash
+        # How static files (and merged shard pages) are put into docs/
+        self.copier = StaticCopier(copy_strategy)
+        self.pipelined = pipelined
+        self.shard = shard
+        # Shards aren't served, so they are always built in place
+        self.atomic = atomic and shard is None
+
+        self.content_dir = self.root / "content"
+        self.static_dir = self.root / "static"
+        self.template_path = self.root / "template.html"
+        self.public_dir = self.root / "docs"
+        self.manifest_path = self.root / ".build" / "manifest.json"
+        if shard is not None:
+            # A shard renders into its own directory, to be merged into docs/ later
+            self.public_dir = shard_dir(self.root, *shard) / "docs"
+            self.manifest_path = shard_dir(self.root, *shard) / "manifest.json"
+        # What the last successful build added, changed and removed, for deploys
+        self.changes_path = self.manifest_path.with_name("changes.json")
+
+        self.manifest = BuildManifest.load(self.manifest_path, self.root)
+        # Rendered blocks are reused across pages and builds unless disabled
+        self.fragments = None
+        if fragment_cache_bytes > 0:
+            self.fragments = FragmentCache(self.root / ".build" / "fragments.sqlite", fragment_cache_bytes)
+        # Compiled templates are reused until a file they were compiled from changes
+        self.templates = TemplateCache(self.template_path, self.basepath)
+
+    def build(self, clean: bool = False):
+        """
+        Sync static files and regenerate every page that is out of date.
+
+        Args:
+            clean (bool): Empty docs/ and the caches and rebuild everything
+
+        Raises:
+            BuildError: If any page failed; the manifest still records the rest
+        """
+        # A clean build starts from an empty manifest so nothing is skipped
+        if clean:
+            self.manifest = BuildManifest(self.manifest_path, self.root, outputs=self.manifest.outputs)
+            if self.fragments is not None:
+                self.fragments.clear()
+        self.manifest.begin_build()
+
+        with self._staged(clean):
+            if self.shard is None:
+                # Sync static files (a clean build also empties the public
+                # directory, unless staging already started from an empty one)
+                copy_static(clean=clean and not self.atomic, manifest=self.manifest, use_hash=self.use_hash,
+                            project_root=self.root, public_dir=self.public_dir, copier=self.copier)
+                sources = None
+            else:
+                # Static files are copied once, by the merge
+                if clean and self.public_dir.exists():
+                    shutil.rmtree(self.public_dir)
+                self.public_dir.mkdir(parents=True, exist_ok=True)
+                sources = shard_sources(self.content_dir, *self.shard)
+
+            # Generate pages recursively, skipping those unchanged since the last build
+            self._generate(sources)
+
+            # Drop outputs whose source was deleted
+            self.manifest.prune()
+
+        # Persist for the next build
+        self.record_changes()
+        self.manifest.save()
+
+    def rebuild(self, changed: Iterable[Path]) -> RebuildPlan:
+        """
+        Bring the site up to date after the given files changed.
+
+        Only the affected outputs are touched; everything else is assumed to
+        be as the last build left it.
+
+        Args:
+            changed (Iterable[Path]): Files that were added, modified or deleted
+
+        Returns:
+            RebuildPlan: The work that was done
+
+        Raises:
+            BuildError: If any re-rendered page failed
+        """
+        plan = plan_rebuild(changed, self.manifest, self.content_dir, self.static_dir)
+        if plan.full:
+            self.build()
+            return plan
+
+        self.manifest.begin_build()
+        if plan.static:
+            copy_static(clean=False, manifest=self.manifest, use_hash=self.use_hash, project_root=self.root,
+                        copier=self.copier)
+        for source in sorted(plan.removed):
+            self.manifest.remove_source(source)
+        if plan.sources:
+            self._generate(plan.sources)
+        self.record_changes()
+        self.manifest.save()
+        return plan
+
+    def merge_shards(self, count: int, clean: bool = False):
+        """
+        Combine the output of shard builds 1/count to count/count into docs/.
+
+        Static files are synced and each shard's pages copied over, skipping
+        pages already identical in docs/; pages no shard produced are removed.
+
+        Args:
+            count (int): Number of shards the site was built in
+            clean (bool): Empty docs/ first and copy every page
+
+        Raises:
+            BuildError: If a shard has not been built, its build failed or it
+                was built with another basepath or generator version
+        """
+        if clean:
+            self.manifest = BuildManifest(self.manifest_path, self.root, outputs=self.manifest.outputs)
+        self.manifest.begin_build()
+        with self._staged(clean):
+            copy_static(clean=clean and not self.atomic, manifest=self.manifest, use_hash=self.use_hash,
+                        project_root=self.root, public_dir=self.public_dir, copier=self.copier)
+
+            # Every shard is checked before any page is copied, so a bad one merges nothing
+            shards = []
+            for index in range(1, count + 1):
+                directory = shard_dir(self.root, index, count)
+                if not (directory / "manifest.json").exists():
+                    raise BuildError(f"Shard {index}/{count} has not been built: {directory / 'manifest.json'} is missing")
+                shard = BuildManifest.load(directory / "manifest.json", self.root)
+                check_shard(shard, self.basepath)
+                shards.append((directory, shard))
+            for directory, shard in shards:
+                merge_shard(self.manifest, shard, directory / "docs", self.public_dir, self.copier)
+
+            self.manifest.prune()
+        self.record_changes()
+        self.manifest.save()
+
+    @contextmanager
+    def _staged(self, clean: bool):
+        """
+        Point the build at a staging copy of docs/ and swap it in if the build succeeds.
+
+        The staging copy starts as hardlinks to every file in docs/, or
+        empty for a clean build. While staged, log messages name the live
+        paths, not the staging directory that disappears with the swap.
+        Does nothing for a builder that isn't atomic.
+        """
+        if not self.atomic:
+            yield
+            return
+
+        live, staging = self.public_dir, staging_dir(self.public_dir)
+        static = list(self.manifest.static)
+        linked = stage_directory(live, staging, link=not clean)
+        logging.debug(f"Staging the build in {staging.relative_to(self.root)}, {linked} files linked")
+        self.manifest.move_outputs(live, staging)
+        self.public_dir = staging
+        log_filter = LivePathFilter(staging, live)
+        logging.getLogger().addFilter(log_filter)
+        try:
+            yield
+        except BaseException:
+            # docs/ is left as it was; the pages this build did record no
+            # longer match it, so the next build renders them again
+            self.public_dir = live
+            self.manifest.move_outputs(staging, live)
+            self.manifest.static = static
+            self.manifest.save()
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        finally:
+            logging.getLogger().removeFilter(log_filter)
+
+        self.public_dir = live
+        swap_in(staging, live)
+        self.manifest.move_outputs(staging, live)
+
+    def record_changes(self) -> OutputChanges:
+        """
+        Write the change manifest for the build that just succeeded, and
+        mark the build manifest as coming from a finished build.
+
+        Outputs are compared by content hash with those of the previous
+        successful build, so a failed build in between loses nothing and a
+        clean build only reports pages whose bytes differ.
+
+        Returns:
+            OutputChanges: What was added, changed and removed
+        """
+        current = self.manifest.output_hashes()
+        changes = diff_outputs(self.manifest.outputs, current)
+        write_changes(self.changes_path, changes, self.public_dir.relative_to(self.root).as_posix())
+        self.manifest.outputs = current
+        self.manifest.ok = True
+        if not changes.is_empty():
+            logging.debug(f"Outputs: {len(changes.added)} added, {len(changes.changed)} changed, "
+                         f"{len(changes.removed)} removed (see {self.changes_path.relative_to(self.root)})")
+        return changes
+
+    def _generate(self, sources=None):
+        # A cache is bound to one basepath; the basepath may change between builds
+        if self.templates.basepath != str(self.basepath):
+            self.templates = TemplateCache(self.template_path, self.basepath)
+        else:
+            self.templates.refresh()
+        try:
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, self.basepath,
+                                     self.manifest, self.workers, self.fragments, sources, self.templates,
+                                     self.pipelined)
+        except BuildError:
+            # Keep the pages that did succeed so the next build only retries the failures
+            self.manifest.save()
+            raise
+
+    def watched_paths(self) -> Set[Path]:
+        """
+        Every file or directory whose changes can affect the site.
+        """
+        paths = {self.content_dir, self.static_dir, self.template_path, self.template_path.parent / "layouts"}
+        # Partials are only known from the pages that include them
+        for record in self.manifest.pages.values():
+            paths.update(self.root / dep for dep in record["deps"])
+        return {path for path in paths if not is_within(path, self.content_dir) or path == self.content_dir}
+
+    def close(self):
+        """
+        Keep the fragment cache within its size bound and release it.
+        """
+        if self.fragments is not None:
+            self.fragments.evict()
+            self.fragments.close()
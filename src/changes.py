@@ -0,0 +1,71 @@
+import os
+import json
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+# Layout version of the change manifest
+CHANGES_FORMAT = 1
+
+class OutputChanges(NamedTuple):
+    """
+    How a build changed the published site, by output path.
+
+    added and changed map each path to the hash of its new content.
+    """
+    added: Dict[str, str]
+    changed: Dict[str, str]
+    removed: List[str]
+
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+def diff_outputs(previous: Dict[str, str], current: Dict[str, str]) -> OutputChanges:
+    """
+    Compare two maps of output path to content hash.
+
+    Args:
+        previous (Dict[str, str]): Outputs of the last successful build
+        current (Dict[str, str]): Outputs of this build
+
+    Returns:
+        OutputChanges: Paths added, changed and removed, each sorted
+    """
+    added = {path: digest for path, digest in sorted(current.items()) if path not in previous}
+    changed = {
+        path: digest for path, digest in sorted(current.items())
+        if path in previous and previous[path] != digest
+    }
+    removed = sorted(path for path in previous if path not in current)
+    return OutputChanges(added, changed, removed)
+
+def write_changes(path: Path, changes: OutputChanges, public_prefix: str):
+    """
+    Write a change manifest for a deploy step to upload and purge from.
+
+    Paths are made relative to the public directory, so they map straight
+    onto URLs below the basepath.
+
+    Args:
+        path (Path): File to write, replaced atomically
+        changes (OutputChanges): Changes to list
+        public_prefix (str): Root-relative posix path of the public
+            directory, e.g. "docs"; stripped from every output path
+    """
+    prefix = public_prefix.rstrip("/") + "/"
+
+    def relative(key: str) -> str:
+        return key[len(prefix):] if key.startswith(prefix) else key
+
+    data = {
+        "format": CHANGES_FORMAT,
+        "public_dir": public_prefix,
+        "added": {relative(key): digest for key, digest in changes.added.items()},
+        "changed": {relative(key): digest for key, digest in changes.changed.items()},
+        "removed": [relative(key) for key in changes.removed],
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,106 @@
+import sys
+import json
+import socket
+import argparse
+import logging
+from pathlib import Path
+from typing import Optional
+
+# Where a build daemon listens, relative to the project root
+DEFAULT_SOCKET = Path(".build") / "daemon.sock"
+
+def send_message(sock: socket.socket, message: dict):
+    """
+    Send one message as a line of JSON.
+    """
+    sock.sendall(json.dumps(message).encode('utf-8') + b"\n")
+
+def receive_message(f) -> Optional[dict]:
+    """
+    Read one line of JSON from a binary file, or None if the peer hung up.
+    """
+    line = f.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+def request(socket_path: Path, message: dict, timeout: float = None) -> dict:
+    """
+    Send a request to a build daemon and wait for its response.
+
+    Args:
+        socket_path (Path): Unix socket the daemon listens on
+        message (dict): Request, e.g. {"command": "build", "clean": False}
+        timeout (float): Seconds to wait for the connection and the response;
+            None waits for as long as the build takes
+
+    Returns:
+        dict: The daemon's response
+
+    Raises:
+        OSError: If no daemon is listening or the connection fails
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(socket_path))
+        send_message(sock, message)
+        with sock.makefile("rb") as f:
+            response = receive_message(f)
+    if response is None:
+        raise ConnectionError("Build daemon closed the connection without answering")
+    return response
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    Mirrors main.py where it can, so a daemon build is asked for the same
+    way as an ordinary one.
+    """
+    parser = argparse.ArgumentParser(description="Ask a running build daemon (main.py --daemon) to build the site.")
+    parser.add_argument("basepath", nargs="?", default=None,
+                        help="URL prefix for root-relative links (default: the daemon's current basepath)")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete docs/ and rebuild every page, ignoring the build manifest")
+    parser.add_argument("--changed", nargs="+", default=None, metavar="PATH",
+                        help="only rebuild what depends on these added, modified or deleted files")
+    parser.add_argument("--stop", action="store_true",
+                        help="stop the daemon instead of building")
+    parser.add_argument("--socket", default=None, metavar="PATH",
+                        help="socket the daemon listens on (default: .build/daemon.sock)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(message)s'
+    )
+
+    args = parse_args(argv)
+    project_root = Path(__file__).parent.parent
+    socket_path = Path(args.socket) if args.socket else project_root / DEFAULT_SOCKET
+
+    if args.stop:
+        message = {"command": "stop"}
+    else:
+        message = {"command": "build", "clean": args.clean, "basepath": args.basepath}
+        if args.changed:
+            # The daemon may run from another directory
+            message["paths"] = [str(Path(path).resolve()) for path in args.changed]
+
+    try:
+        response = request(socket_path, message)
+    except (FileNotFoundError, ConnectionRefusedError):
+        logging.error(f"No build daemon is listening on {socket_path}; start one with: python3 src/main.py --daemon")
+        sys.exit(2)
+
+    for line in response.get("log", []):
+        logging.info(line)
+    if not response.get("ok"):
+        logging.error(response.get("error") or "Build failed")
+        sys.exit(1)
+    if "seconds" in response:
+        logging.info(f"Built in {response['seconds'] * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
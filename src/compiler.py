@@ -1,7 +1,16 @@
 import os
+import errno
 import shutil
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+try:
+    import fcntl
+except ImportError:
+    # Windows: no reflinks
+    fcntl = None
+from build_manifest import BuildManifest, hash_file
 
 def should_copy_file(file_path: Path) -> bool:
     """
@@ -9,63 +18,345 @@ def should_copy_file(file_path: Path) -> bool:
     """
     return not file_path.name.startswith('.')
 
-def copy_static_recursive(src: Path, dest: Path, root: Path):
+def needs_copy(src: Path, dest: Path, use_hash: bool = False, manifest: BuildManifest = None) -> bool:
     """
-    Recursively copy files with detailed logging of nested structures.
-    
+    Decide whether a static file has to be (re)copied to its destination.
+
+    copy2 preserves mtimes, so an unchanged source has the same size and mtime
+    as its previous copy. With use_hash, files of equal size are compared by
+    content instead, which also catches edits that keep size and mtime and
+    avoids recopying files that were merely touched.
+
+    Given a manifest, the hashes come from its stat-cached file table, as in
+    BuildManifest.is_fresh, so files unchanged since they were last hashed
+    are never read again.
+
+    Args:
+        src (Path): Source file
+        dest (Path): Previously copied file, which may not exist
+        use_hash (bool): Compare content hashes instead of mtimes
+        manifest (BuildManifest): Optional manifest to look hashes up in
+
+    Returns:
+        bool: True if dest is missing or out of date
+    """
+    try:
+        dest_stat = dest.stat()
+    except FileNotFoundError:
+        return True
+
+    src_stat = src.stat()
+    if src_stat.st_size != dest_stat.st_size:
+        return True
+    if use_hash and manifest is not None:
+        return manifest.file_hash(src) != manifest.file_hash(dest)
+    if use_hash:
+        return hash_file(src) != hash_file(dest)
+    return src_stat.st_mtime_ns != dest_stat.st_mtime_ns
+
+# Ways a static file can be put into the output. "auto" tries the zero-copy
+# ones first and falls back to a plain copy
+COPY_STRATEGIES = ("auto", "hardlink", "reflink", "copy_file_range", "sendfile", "copy")
+
+# Tried in this order by "auto". Hardlinks are opt-in: a link shares the
+# file with static/, so anything editing the output in place edits the source
+_FALLBACK_ORDER = ("reflink", "copy_file_range", "sendfile", "copy")
+
+# Threads copying static files at once; the copies are I/O-bound
+COPY_WORKERS = 8
+
+# Linux ioctl sharing a file's blocks copy-on-write (btrfs, XFS, ...)
+_FICLONE = 0x40049409
+
+# Errors meaning a strategy can't work here at all, as opposed to failing
+# for one file (a permission, a full disk, a file that vanished)
+_UNSUPPORTED_ERRNOS = {errno.ENOTSUP, errno.EOPNOTSUPP, errno.EXDEV, errno.ENOSYS, errno.EINVAL}
+
+def _hardlink(src: Path, dest: Path):
+    os.link(src, dest)
+
+def _reflink(src: Path, dest: Path):
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "reflinks need fcntl")
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+        fcntl.ioctl(fdest.fileno(), _FICLONE, fsrc.fileno())
+
+def _copy_file_range(src: Path, dest: Path):
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdest.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+def _sendfile(src: Path, dest: Path):
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(fdest.fileno(), fsrc.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+
+def _copy(src: Path, dest: Path):
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+        shutil.copyfileobj(fsrc, fdest, 1 << 20)
+
+_COPY_FUNCTIONS = {
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "copy_file_range": _copy_file_range,
+    "sendfile": _sendfile,
+    "copy": _copy,
+}
+
+class StaticCopier:
+    """
+    Puts static files into the output with the cheapest strategy that works.
+
+    A strategy the platform or filesystem doesn't support (e.g. a hardlink
+    across filesystems, or copy_file_range on macOS) fails on the first
+    file, is dropped for the rest of the build and the next one is tried,
+    down to a plain copy. Any other error is raised. Copies keep the
+    source's mtime like shutil.copy2, which needs_copy relies on. A copier
+    may be shared by several copying threads.
+
+    Example:
+        >>> copier = StaticCopier("hardlink")
+        >>> copier.copy(Path("static/index.css"), Path("docs/index.css"))
+        'hardlink'
+    """
+
+    def __init__(self, strategy: str = "auto"):
+        if strategy not in COPY_STRATEGIES:
+            raise ValueError(f"Unknown copy strategy {strategy!r}, expected one of {', '.join(COPY_STRATEGIES)}")
+        self.strategy = strategy
+        if strategy == "auto":
+            self.order = _FALLBACK_ORDER
+        elif strategy == "hardlink":
+            self.order = ("hardlink",) + _FALLBACK_ORDER
+        else:
+            self.order = _FALLBACK_ORDER[_FALLBACK_ORDER.index(strategy):]
+        self._unsupported = set()
+        self._lock = threading.Lock()
+
+    def copy(self, src: Path, dest: Path) -> str:
+        """
+        Copy src to dest by way of a temporary file renamed over dest.
+
+        Never writes into an existing dest, which may be hardlinked into the
+        tree being served.
+
+        Returns:
+            str: Name of the strategy that was used
+
+        Raises:
+            OSError: If copying failed other than for lack of support
+        """
+        tmp_path = dest.with_name(dest.name + ".tmp")
+        for name in self.order:
+            with self._lock:
+                if name in self._unsupported:
+                    continue
+            try:
+                _COPY_FUNCTIONS[name](src, tmp_path)
+            except (OSError, AttributeError) as e:
+                # AttributeError: this platform's os module lacks the call
+                tmp_path.unlink(missing_ok=True)
+                if name == self.order[-1] or (isinstance(e, OSError) and e.errno not in _UNSUPPORTED_ERRNOS):
+                    raise
+                logging.debug(f"Can't {name} {src} ({e}), falling back")
+                with self._lock:
+                    self._unsupported.add(name)
+                continue
+            if name != "hardlink":
+                shutil.copystat(src, tmp_path)
+            os.replace(tmp_path, dest)
+            return name
+
+# Used where no copier is given
+_default_copier = StaticCopier()
+
+def replace_with_copy(src: Path, dest: Path, copier: StaticCopier = None):
+    """
+    Copy src over dest with copier, by default the "auto" strategy.
+    """
+    (copier or _default_copier).copy(src, dest)
+
+def copy_files(pairs, copier: StaticCopier = None, workers: int = COPY_WORKERS):
+    """
+    Copy (src, dest) pairs, on a thread pool when there are several.
+
+    Raises:
+        OSError: The first copy that failed, once every copy has finished
+    """
+    copier = copier or _default_copier
+    if workers <= 1 or len(pairs) <= 1:
+        for src, dest in pairs:
+            copier.copy(src, dest)
+        return
+    with ThreadPoolExecutor(max_workers=min(workers, len(pairs))) as executor:
+        futures = [executor.submit(copier.copy, src, dest) for src, dest in pairs]
+    for future in futures:
+        future.result()
+
+def collect_static_copies(src: Path, dest: Path, root: Path, synced: set = None, use_hash: bool = False,
+                          copies: list = None, manifest: BuildManifest = None) -> list:
+    """
+    Walk src and list the (source, destination) files that need copying.
+
+    Destination directories are created on the way, and each copy is logged
+    in walk order, so the log stays the same however the copies are run.
+
     Args:
         src (Path): Source directory path
         dest (Path): Destination directory path
         root (Path): Project root path for relative path logging
-        
-    Example structure:
-        static/
-        └── images/
-            └── hero/
-                └── banner.png
-    Will log:
-        Copying static/images/hero/banner.png -> public/images/hero/banner.png
+        synced (set): Optional set collecting every destination file that
+            mirrors a source file, copied or not
+        use_hash (bool): Compare content hashes instead of mtimes
+        copies (list): List to append to, for the recursion
+        manifest (BuildManifest): Optional manifest caching the hashes
+
+    Returns:
+        list: The (source, destination) pairs to copy
     """
+    if copies is None:
+        copies = []
+
     # Create destination if it doesn't exist
     dest.mkdir(exist_ok=True)
-    
-    for item in src.iterdir():
+
+    # Sorted, so every build copies and logs in the same order
+    for item in sorted(src.iterdir()):
         if not should_copy_file(item):
             logging.debug(f"Skipping {item.relative_to(root)}")
             continue
-            
+
         dest_path = dest / item.name
-        
+
         if item.is_file():
+            if synced is not None:
+                synced.add(dest_path)
             # Log relative paths for clearer output
             rel_src = item.relative_to(root)
             rel_dest = dest_path.relative_to(root)
+            if not needs_copy(item, dest_path, use_hash, manifest):
+                logging.debug(f"Unchanged {rel_src}")
+                continue
             logging.info(f"Copying {rel_src} -> {rel_dest}")
-            shutil.copy2(item, dest_path)
+            copies.append((item, dest_path))
         else:
-            # Recursively copy subdirectories
-            copy_static_recursive(item, dest_path, root)
+            # Recursively collect subdirectories
+            collect_static_copies(item, dest_path, root, synced, use_hash, copies, manifest)
+    return copies
+
+def copy_static_recursive(src: Path, dest: Path, root: Path, synced: set = None, use_hash: bool = False,
+                          copier: StaticCopier = None, workers: int = COPY_WORKERS, manifest: BuildManifest = None):
+    """
+    Recursively sync files with detailed logging of nested structures.
+
+    Only files that are new or changed (see needs_copy) are copied; everything
+    else already in dest is left untouched. The copies run in parallel.
+
+    Args:
+        src (Path): Source directory path
+        dest (Path): Destination directory path
+        root (Path): Project root path for relative path logging
+        synced (set): Optional set collecting every destination file that
+            mirrors a source file, copied or not
+        use_hash (bool): Compare content hashes instead of mtimes
+        copier (StaticCopier): How files are copied; "auto" if omitted
+        workers (int): Number of threads copying files
+        manifest (BuildManifest): Optional manifest caching the hashes
+            compared with use_hash; each copy is recorded in it
 
-def copy_static():
+    Example structure:
+        static/
+        └── images/
+            └── hero/
+                └── banner.png
+    Will log:
+        Copying static/images/hero/banner.png -> public/images/hero/banner.png
+    """
+    copies = collect_static_copies(src, dest, root, synced, use_hash, manifest=manifest)
+    copy_files(copies, copier, workers)
+    if manifest is not None:
+        # The copies' hashes are their sources', so the next build needn't read them
+        for src_path, dest_path in copies:
+            manifest.record_copy(src_path, dest_path)
+
+def remove_stale_static(previous, current, public_dir: Path, root: Path):
+    """
+    Delete outputs copied from static files that no longer exist.
+
+    Only paths recorded as static outputs by the previous build are candidates,
+    so generated pages are never touched here.
+
+    Args:
+        previous (list[str]): Root-relative static outputs of the previous build
+        current (list[str]): Root-relative static outputs of this build
+        public_dir (Path): Output directory, never removed itself
+        root (Path): Project root the paths are relative to
+    """
+    for key in sorted(set(previous) - set(current)):
+        stale = root / key
+        if not stale.exists():
+            continue
+        logging.info(f"Removing stale {key}")
+        stale.unlink()
+
+        # Clean up directories the removal left empty
+        parent = stale.parent
+        while parent != public_dir and public_dir in parent.parents and not any(parent.iterdir()):
+            parent.rmdir()
+            parent = parent.parent
+
+def copy_static(clean: bool = True, manifest: BuildManifest = None, use_hash: bool = False, project_root: Path = None,
+                public_dir: Path = None, copier: StaticCopier = None, workers: int = COPY_WORKERS):
     """
     Initialize the static file copy process from project root.
+
+    Args:
+        clean (bool): Delete the public directory first. Incremental builds pass
+            False so previously generated pages survive and can be skipped.
+        manifest (BuildManifest): Optional manifest of the previous build, used
+            to find and delete outputs of removed static files and, with
+            use_hash, to look up file hashes without re-reading the files
+        use_hash (bool): Compare content hashes instead of mtimes
+        project_root (Path): Project whose static/ is copied into docs/;
+            defaults to the checkout this module lives in
+        public_dir (Path): Directory to copy into instead of docs/, e.g. a
+            staging directory
+        copier (StaticCopier): How files are copied; "auto" if omitted
+        workers (int): Number of threads copying files
     """
     # Get project root and define paths
-    current_dir = Path(__file__).parent
-    project_root = current_dir.parent
+    if project_root is None:
+        project_root = Path(__file__).parent.parent
     static_dir = project_root / "static"
-    public_dir = project_root / "docs"
+    if public_dir is None:
+        public_dir = project_root / "docs"
 
     if not static_dir.exists():
         raise FileNotFoundError(f"Static directory not found at {static_dir}")
 
     # Clean existing public directory
-    if public_dir.exists():
+    if clean and public_dir.exists():
         logging.info(f"Cleaning {public_dir.relative_to(project_root)}")
         shutil.rmtree(public_dir)
 
     # Create fresh public directory
     public_dir.mkdir(exist_ok=True)
 
-    # Start recursive copy
-    copy_static_recursive(static_dir, public_dir, project_root)
+    # Start recursive sync
+    synced = set()
+    copy_static_recursive(static_dir, public_dir, project_root, synced, use_hash, copier, workers,
+                          manifest if use_hash else None)
+
+    if manifest is not None:
+        current = sorted(path.relative_to(project_root).as_posix() for path in synced)
+        remove_stale_static(manifest.static, current, public_dir, project_root)
+        manifest.static = current
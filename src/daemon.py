@@ -0,0 +1,145 @@
+import os
+import time
+import logging
+import traceback
+import socketserver
+from pathlib import Path
+from client import receive_message, request, send_message
+from generate_page import BuildError
+
+class _CollectingHandler(logging.Handler):
+    """
+    Keeps the messages logged during one build, to hand back to the client.
+    """
+
+    def __init__(self):
+        super().__init__(logging.INFO)
+        self.setFormatter(logging.Formatter('%(message)s'))
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+class BuildDaemon:
+    """
+    Answers build requests with one long-lived SiteBuilder.
+
+    Everything a fresh process would have to rebuild stays warm between
+    requests: the imported modules, the compiled templates, the manifest
+    with its stat-cached file hashes and the fragment cache connection.
+
+    Requests are dicts with a "command" of:
+
+    - "build": a full incremental build, or a clean one if "clean" is set,
+      or a rebuild of what depends on "paths" (files added, modified or
+      deleted); "basepath" switches the basepath first if given
+    - "ping": check the daemon is alive
+    - "stop": shut the daemon down after answering
+
+    Example:
+        >>> daemon = BuildDaemon(SiteBuilder(Path(".")))
+        >>> daemon.handle({"command": "build", "basepath": "/site-generator/"})["ok"]
+        True
+    """
+
+    def __init__(self, builder):
+        self.builder = builder
+        self.stopping = False
+
+    def handle(self, message: dict) -> dict:
+        command = message.get("command")
+        if command == "build":
+            return self.build(message)
+        if command == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if command == "stop":
+            self.stopping = True
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown command: {command!r}"}
+
+    def build(self, message: dict) -> dict:
+        """
+        Run one build and report how it went, with everything it logged.
+        """
+        collector = _CollectingHandler()
+        logging.getLogger().addHandler(collector)
+        start = time.perf_counter()
+        error = None
+        try:
+            basepath = message.get("basepath")
+            # Pages rendered for another basepath are stale, which only a full build sees
+            full = message.get("clean") or not message.get("paths") or (basepath and basepath != self.builder.basepath)
+            if basepath:
+                self.builder.basepath = basepath
+            if full:
+                self.builder.build(clean=bool(message.get("clean")))
+            else:
+                self.builder.rebuild([Path(path) for path in message["paths"]])
+        except BuildError as e:
+            error = str(e)
+        except Exception:
+            # Keep serving; the next request may well succeed
+            error = traceback.format_exc()
+        finally:
+            logging.getLogger().removeHandler(collector)
+            # Keep the fragment cache within its size bound between builds
+            if self.builder.fragments is not None:
+                self.builder.fragments.evict()
+
+        seconds = time.perf_counter() - start
+        if error is None:
+            logging.info(f"Built in {seconds * 1000:.0f} ms")
+        else:
+            logging.error(error)
+        return {"ok": error is None, "seconds": seconds, "log": collector.lines, "error": error}
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Reads one request per connection and writes back the daemon's response.
+    """
+
+    def handle(self):
+        try:
+            message = receive_message(self.rfile)
+        except ValueError as e:
+            send_message(self.connection, {"ok": False, "error": f"Malformed request: {e}"})
+            return
+        if message is None:
+            return
+        send_message(self.connection, self.server.daemon.handle(message))
+
+def serve_daemon(daemon: BuildDaemon, socket_path: Path):
+    """
+    Answer requests on a Unix socket until stopped or interrupted.
+
+    Requests are handled one at a time, so builds never overlap.
+
+    Args:
+        daemon (BuildDaemon): Daemon answering the requests
+        socket_path (Path): Socket to listen on; removed again on exit
+
+    Raises:
+        RuntimeError: If another daemon is already listening on socket_path
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        try:
+            request(socket_path, {"command": "ping"}, timeout=1)
+        except OSError:
+            # Left behind by a daemon that didn't shut down cleanly
+            socket_path.unlink()
+        else:
+            raise RuntimeError(f"A build daemon is already listening on {socket_path}")
+
+    server = socketserver.UnixStreamServer(str(socket_path), DaemonRequestHandler)
+    server.daemon = daemon
+    logging.info(f"Build daemon listening on {socket_path}, press Ctrl+C to stop")
+    try:
+        while not daemon.stopping:
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        socket_path.unlink(missing_ok=True)
@@ -0,0 +1,264 @@
+import io
+import time
+import logging
+import mimetypes
+import threading
+import traceback
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+from build_manifest import HashingWriter
+from fragment_cache import FragmentCache
+from generate_page import prepare_page
+from template import TemplateCache
+from watch import LIVE_RELOAD_PATH, LiveReload, LiveReloadMixin, Watcher, inject_live_reload, start_server
+
+class CachedPage(NamedTuple):
+    """
+    A page rendered in memory, with the files it was rendered from.
+    """
+    body: bytes
+    etag: str
+    deps: Tuple[Path, ...]
+
+class Response(NamedTuple):
+    """
+    What the dev server answers for a URL.
+
+    Rendered pages carry their body; static files carry the path to read,
+    so a conditional request can be answered from a stat() alone.
+    """
+    status: int
+    content_type: str = "text/plain; charset=utf-8"
+    etag: Optional[str] = None
+    body: Optional[bytes] = None
+    file: Optional[Path] = None
+    location: Optional[str] = None
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag, using weak comparison.
+    """
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+class DevSite:
+    """
+    Serves a project straight from its sources, rendering pages on request.
+
+    Pages are rendered through the same pipeline as a disk build
+    (prepare_page) on their first request and then kept in memory, keyed by
+    URL, until a file they were rendered from changes. Static files are read
+    from static/ as they are. Nothing is written to docs/.
+
+    Example:
+        >>> site = DevSite(Path("."))
+        >>> site.get("/blog/tom/").status
+        200
+    """
+
+    def __init__(self, project_root: Path, basepath: str = "/", fragments: FragmentCache = None):
+        self.root = Path(project_root)
+        self.basepath = basepath if basepath.endswith("/") else basepath + "/"
+        self.fragments = fragments
+
+        self.content_dir = self.root / "content"
+        self.static_dir = self.root / "static"
+        self.template_path = self.root / "template.html"
+
+        self.templates = TemplateCache(self.template_path, self.basepath)
+        # URL path -> CachedPage
+        self.pages = {}
+        # Renders share the template and fragment caches, so take turns
+        self._lock = threading.Lock()
+
+    def get(self, url_path: str) -> Response:
+        """
+        Answer a request for url_path (without query string).
+        """
+        if not url_path.startswith(self.basepath):
+            # The basepath itself, requested without its trailing slash
+            if url_path + "/" == self.basepath:
+                return Response(301, location=self.basepath)
+            return Response(404, body=b"Not found")
+        relative = unquote(url_path[len(self.basepath):])
+
+        # Pages are generated after static files are copied, so they win
+        source = self.source_for(relative)
+        if source is not None:
+            return self.page_response(url_path, source)
+
+        static = self.safe_path(self.static_dir, relative)
+        if static is not None and static.is_file():
+            stat = static.stat()
+            content_type = mimetypes.guess_type(static.name)[0] or "application/octet-stream"
+            return Response(200, content_type, f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', file=static)
+
+        # A directory requested without its trailing slash
+        content = self.safe_path(self.content_dir, relative)
+        if relative and ((content and content.is_dir()) or (static and static.is_dir())):
+            return Response(301, location=url_path + "/")
+        return Response(404, body=b"Not found")
+
+    def source_for(self, relative: str) -> Optional[Path]:
+        """
+        Map a URL path below the basepath to the markdown source rendering it.
+        """
+        if relative == "" or relative.endswith("/"):
+            name = relative + "index.md"
+        elif relative.endswith(".html"):
+            name = relative[:-len(".html")] + ".md"
+        else:
+            return None
+        source = self.safe_path(self.content_dir, name)
+        return source if source is not None and source.is_file() else None
+
+    @staticmethod
+    def safe_path(directory: Path, relative: str) -> Optional[Path]:
+        """
+        Join relative onto directory, refusing paths that escape it.
+        """
+        path = (directory / relative).resolve()
+        try:
+            path.relative_to(directory.resolve())
+        except ValueError:
+            return None
+        return path
+
+    def page_response(self, url_path: str, source: Path) -> Response:
+        with self._lock:
+            page = self.pages.get(url_path)
+            if page is None:
+                page = self.render(source)
+                self.pages[url_path] = page
+        return Response(200, "text/html; charset=utf-8", page.etag, body=page.body)
+
+    def render(self, source: Path) -> CachedPage:
+        """
+        Render one page into memory.
+        """
+        start = time.perf_counter()
+        buffer = io.BytesIO()
+        with ExitStack() as stack:
+            page = prepare_page(str(source), self.basepath, self.templates, stack, fragments=self.fragments)
+            writer = HashingWriter(buffer)
+            page.render_into(writer.write)
+        if self.fragments is not None:
+            self.fragments.flush()
+        logging.info(f"Rendered {source.relative_to(self.root)} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return CachedPage(buffer.getvalue(), f'"{writer.hexdigest()}"', page.deps)
+
+    def invalidate(self, changed: Iterable[Path]):
+        """
+        Forget every page rendered from a changed file.
+
+        A changed file that isn't a markdown source may be a template,
+        layout or partial, so the compiled templates are dropped too.
+        """
+        changed = {Path(path).resolve() for path in changed}
+        with self._lock:
+            if any(path.suffix != ".md" and not path.is_relative_to(self.static_dir.resolve()) for path in changed):
+                self.templates = TemplateCache(self.template_path, self.basepath)
+            self.pages = {
+                url: page for url, page in self.pages.items()
+                if not any(Path(dep).resolve() in changed for dep in page.deps)
+            }
+
+    def watched_paths(self) -> Set[Path]:
+        """
+        Every file or directory whose changes can affect what is served.
+        """
+        paths = {self.content_dir, self.static_dir, self.template_path, self.template_path.parent / "layouts"}
+        with self._lock:
+            for page in self.pages.values():
+                paths.update(Path(dep) for dep in page.deps[1:])
+        return paths
+
+class DevServerHandler(LiveReloadMixin, BaseHTTPRequestHandler):
+    """
+    Answers requests from a DevSite, with ETag revalidation and live reload.
+    """
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body: bool):
+        url_path = urlsplit(self.path).path
+        if url_path == LIVE_RELOAD_PATH and send_body:
+            self.send_event_stream()
+            return
+
+        try:
+            response = self.server.site.get(url_path)
+        except Exception:
+            # Show the failure in the browser; the next edit may well fix it
+            error = traceback.format_exc()
+            logging.error(f"Failed to render {url_path}:\n{error}")
+            response = Response(500, body=error.encode('utf-8'))
+
+        if response.etag is not None and etag_matches(self.headers.get("If-None-Match"), response.etag):
+            self.send_response(304)
+            self.send_header("ETag", response.etag)
+            self.end_headers()
+            return
+
+        body = response.body
+        if response.file is not None:
+            body = response.file.read_bytes()
+        elif response.content_type.startswith("text/html"):
+            body = inject_live_reload(body)
+
+        self.send_response(response.status)
+        if response.location is not None:
+            self.send_header("Location", response.location)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(body or b"")))
+        if response.etag is not None:
+            self.send_header("ETag", response.etag)
+            # Always revalidate; an unchanged page costs a 304 and no body
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+def serve(site: DevSite, port: int = 8888, interval: float = 0.1):
+    """
+    Serve a DevSite and reload open pages when their sources change.
+
+    Runs until interrupted.
+
+    Args:
+        site (DevSite): Site to serve
+        port (int): Port to listen on, on localhost
+        interval (float): Seconds between polls for changes
+    """
+    live_reload = LiveReload()
+    server = start_server(DevServerHandler, port, live_reload, site=site)
+    watcher = Watcher(site.watched_paths())
+    logging.info("Rendering pages on request, press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(interval)
+            # Pages rendered since the last poll may have brought in new partials
+            paths = site.watched_paths()
+            if paths != watcher.paths:
+                watcher.watch(paths)
+            changed = watcher.poll()
+            if changed:
+                site.invalidate(changed)
+                live_reload.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
@@ -0,0 +1,77 @@
+import re
+from typing import Dict, List, NamedTuple
+from htmlnode import HTMLNode
+
+# Characters dropped from heading text when building an anchor
+ANCHOR_STRIP_REGEX = re.compile(r'[^\w\s-]')
+ANCHOR_SPACE_REGEX = re.compile(r'[\s-]+')
+
+class Heading(NamedTuple):
+    """
+    A heading found while parsing a document.
+
+    markdown is the heading's source after its '#' marks, text the same
+    with inline markup removed, and anchor a slug unique within the page.
+    """
+    level: int
+    markdown: str
+    text: str
+    anchor: str
+
+class Document(NamedTuple):
+    """
+    A parsed markdown page: its HTML tree plus the metadata gathered while
+    parsing it, so nothing needs to scan the source a second time.
+    """
+    front_matter: Dict[str, str]
+    root: HTMLNode
+    headings: List[Heading]
+
+    @property
+    def title(self) -> str:
+        """
+        The first line of the first h1, by the same rule as title_from_blocks
+        in markdown_to_html, which finds it for streamed pages.
+
+        Raises:
+            ValueError: If the document has no h1
+        """
+        for heading in self.headings:
+            if heading.level == 1:
+                # A heading block may run on over several lines; the title is its first
+                return heading.markdown.partition('\n')[0].strip()
+        raise ValueError("No h1 header found in markdown")
+
+    def toc(self, max_level: int = 6) -> List[Heading]:
+        """
+        Headings up to max_level, in document order, for building a table of contents.
+        """
+        return [heading for heading in self.headings if heading.level <= max_level]
+
+def slugify(text: str) -> str:
+    """
+    Turn heading text into an anchor: lowercase words joined by hyphens.
+
+    Example:
+        >>> slugify("Hello, World!")
+        'hello-world'
+    """
+    slug = ANCHOR_STRIP_REGEX.sub('', text.lower())
+    return ANCHOR_SPACE_REGEX.sub('-', slug).strip('-') or "section"
+
+def unique_anchor(text: str, seen: Dict[str, int]) -> str:
+    """
+    Return the slug for text, numbered if an earlier heading already used it.
+
+    Args:
+        text (str): Plain heading text
+        seen (Dict[str, int]): Slugs used so far on the page and their counts;
+            updated in place
+
+    Returns:
+        str: "slug", then "slug-1", "slug-2" and so on for repeats
+    """
+    slug = slugify(text)
+    count = seen.get(slug, 0)
+    seen[slug] = count + 1
+    return slug if count == 0 else f"{slug}-{count}"
@@ -0,0 +1,213 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Iterable
+from block_parser import Block
+from build_manifest import GENERATOR_VERSION
+
+# Default upper bound on the total size of cached fragments
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Buffered fragments are written out early once they reach this size, so a
+# very large streamed page doesn't hold all of its HTML until the end
+_FLUSH_BYTES = 4 * 1024 * 1024
+
+# SQLite limits the number of bound parameters per statement; stay well under it
+_LOOKUP_BATCH = 500
+
+def fragment_key(block: Block, basepath: str) -> str:
+    """
+    Return the cache key for a block's rendered HTML.
+
+    The key covers everything the fragment depends on: the block's text and
+    type, the basepath its URLs were rebased to, and the generator version,
+    so identical blocks on different pages share one entry and a generator
+    upgrade never serves stale HTML.
+    """
+    digest = hashlib.sha256()
+    for part in (GENERATOR_VERSION, block.block_type.value, basepath):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for line in block.lines:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+class FragmentCache:
+    """
+    Persistent, size-bounded cache of rendered block HTML, stored in SQLite.
+
+    Lookups are batched per page. New fragments and the last-used times of
+    hits are buffered in memory and written in one transaction by flush(),
+    and evict() trims the least recently used fragments once the total
+    exceeds max_bytes.
+
+    Each process opens its own connection on first use, so a cache can be
+    handed to pool workers; the database copes with concurrent writers. That
+    holds for a cache inherited through fork() too: a process that finds
+    another's connection or buffers drops them rather than sharing them.
+
+    Example:
+        >>> cache = FragmentCache(Path(".build/fragments.sqlite"))
+        >>> html = markdown_to_html_node(markdown, "/", cache).to_html()
+        >>> cache.flush()
+    """
+
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        # key -> html for fragments rendered since the last flush
+        self._pending = {}
+        self._pending_bytes = 0
+        # keys served from the cache since the last flush
+        self._touched = set()
+        self._last_flush = 0
+        # Process the connection and buffers belong to
+        self._pid = os.getpid()
+
+    def __getstate__(self):
+        # Connections and unflushed work stay with the process that owns them
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_bytes"])
+
+    def _claim(self):
+        """
+        Forget the connection and buffers of the process this one was forked from.
+        """
+        if self._pid != os.getpid():
+            # The parent's connection is still the parent's; using or closing it here could corrupt the database
+            self._connection = None
+            self._pending = {}
+            self._pending_bytes = 0
+            self._touched = set()
+            self._pid = os.getpid()
+
+    def _connect(self) -> sqlite3.Connection:
+        self._claim()
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Callers serialise access themselves (e.g. the dev server's render
+            # lock), so the connection may be used from whichever thread renders
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # Write-ahead logging lets readers carry on while a worker flushes
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            # A lost fragment is only a cache miss, so commits needn't wait on fsync
+            self._connection.execute("PRAGMA synchronous=OFF")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS fragments ("
+                "key TEXT PRIMARY KEY, html TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_used INTEGER NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS fragments_last_used ON fragments (last_used)")
+            self._connection.commit()
+        return self._connection
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up several fragments at once.
+
+        Args:
+            keys (Iterable[str]): Keys from fragment_key
+
+        Returns:
+            Dict[str, str]: HTML for every key that was found
+        """
+        self._claim()
+        keys = list(dict.fromkeys(keys))
+        found = {key: self._pending[key] for key in keys if key in self._pending}
+        missing = [key for key in keys if key not in found]
+
+        connection = self._connect()
+        for start in range(0, len(missing), _LOOKUP_BATCH):
+            batch = missing[start:start + _LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(connection.execute(
+                f"SELECT key, html FROM fragments WHERE key IN ({placeholders})", batch))
+
+        self._touched.update(found)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, html: str):
+        """
+        Buffer a freshly rendered fragment until the next flush.
+        """
+        self._claim()
+        self._pending[key] = html
+        self._pending_bytes += len(html)
+        if self._pending_bytes >= _FLUSH_BYTES:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered fragments and refresh the last-used time of every hit.
+        """
+        self._claim()
+        if not self._pending and not self._touched:
+            return
+        # Strictly increasing, so recency is well ordered even on a coarse clock
+        now = self._last_flush = max(time.time_ns(), self._last_flush + 1)
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO fragments (key, html, size, last_used) VALUES (?, ?, ?, ?)",
+                [(key, html, len(html.encode('utf-8')), now) for key, html in self._pending.items()],
+            )
+            connection.executemany(
+                "UPDATE fragments SET last_used = ? WHERE key = ?",
+                [(now, key) for key in self._touched - self._pending.keys()],
+            )
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._touched.clear()
+
+    def evict(self) -> int:
+        """
+        Drop the least recently used fragments until the cache fits in max_bytes.
+
+        Returns:
+            int: Number of fragments removed
+        """
+        self.flush()
+        connection = self._connect()
+        total = 0
+        doomed = []
+        for key, size in connection.execute("SELECT key, size FROM fragments ORDER BY last_used DESC"):
+            total += size
+            if total > self.max_bytes:
+                doomed.append((key,))
+        if doomed:
+            with connection:
+                connection.executemany("DELETE FROM fragments WHERE key = ?", doomed)
+            logging.info(f"Evicted {len(doomed)} cached fragment(s)")
+        return len(doomed)
+
+    def clear(self):
+        """
+        Forget every cached fragment.
+        """
+        self._claim()
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._touched.clear()
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM fragments")
+
+    def close(self):
+        """
+        Flush outstanding work and close this process's connection.
+        """
+        self.flush()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
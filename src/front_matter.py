@@ -0,0 +1,89 @@
+def is_front_matter_fence(line):
+    """
+    Check whether a line is a front matter ``---`` delimiter.
+
+    The rule is shared by the in-memory and streamed readers, so a page
+    parses the same whatever its size. Trailing whitespace is allowed,
+    leading whitespace isn't.
+    """
+    return line.rstrip() == "---"
+
+def read_front_matter(lines):
+    """
+    Consume a leading front matter block from an iterator of markdown lines.
+
+    Front matter is a block of ``key: value`` lines fenced by ``---`` lines at
+    the very start of the document. Values are plain strings; matching
+    surrounding quotes are removed. A leading ``---`` that is never closed
+    isn't front matter, e.g. a page opening with a thematic break, and the
+    whole document is handed back as body.
+
+    Args:
+        lines (Iterator[str]): Markdown lines without their line endings
+
+    Returns:
+        tuple: (dict of front matter values, iterator over the remaining lines)
+
+    Raises:
+        ValueError: If the front matter has a malformed line
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return {}, iter(())
+    if not is_front_matter_fence(first):
+        # No front matter - hand the first line back with the rest
+        return {}, _prepend(first, lines)
+
+    block = []
+    for line in lines:
+        if is_front_matter_fence(line):
+            return _parse_entries(block), lines
+        block.append(line)
+
+    # Never closed - everything read so far is body
+    return {}, iter([first] + block)
+
+def _parse_entries(block):
+    values = {}
+    for number, line in enumerate(block, start=2):
+        # Blank lines and comments are allowed between entries
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+
+        key, separator, value = line.partition(':')
+        if not separator or not key.strip():
+            raise ValueError(f"Malformed front matter line {number}: {line!r}")
+
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        values[key.strip()] = value
+    return values
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
+
+def split_front_matter(markdown):
+    """
+    Separate a leading front matter block from a markdown document.
+
+    Args:
+        markdown (str): Complete markdown document
+
+    Returns:
+        tuple: (dict of front matter values, remaining markdown)
+
+    Raises:
+        ValueError: If the front matter has a malformed line
+
+    Example:
+        >>> split_front_matter("---\\nlayout: post\\n---\\n# Title")
+        ({'layout': 'post'}, '# Title')
+    """
+    if not is_front_matter_fence(markdown.partition('\n')[0]):
+        return {}, markdown
+
+    values, rest = read_front_matter(markdown.split('\n'))
+    return values, '\n'.join(rest)
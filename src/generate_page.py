@@ -1,51 +1,421 @@
+import io
 import os
+import queue
 import logging
+import threading
+import traceback
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from extract_title import extract_title
-from markdown_to_html import markdown_to_html_node
-from compiler import copy_static
+from typing import Dict, List, NamedTuple, Tuple
+from contextlib import ExitStack
+from front_matter import read_front_matter
+from markdown_to_html import StreamedMarkdown, markdown_to_document, title_from_blocks
+from block_parser import iter_blocks, iter_file_lines
+from template import CompiledTemplate, TemplateCache
+import profiling
+from fragment_cache import FragmentCache
+from build_manifest import BuildManifest, HashingWriter, replace_if_changed, write_if_changed
 
-def generate_page(from_path, template_path, dest_path, basepath):
+# Sources at least this large are rendered block by block straight from the
+# file, so their memory use is bounded by the largest block, not the page
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+# Pages a pipelined build holds between stages: sources read ahead of the
+# renderer, and rendered pages waiting for a writer
+PIPELINE_DEPTH = 16
+
+# Threads flushing rendered pages to disk in a pipelined build
+PIPELINE_WRITERS = 4
+
+class RenderedPage(NamedTuple):
+    """
+    What generate_page produced: the output hash and every file it was rendered from.
+    """
+    output_hash: str
+    deps: Tuple[Path, ...]
+
+def read_markdown(path) -> str:
+    """
+    Read a markdown source file.
+    """
+    with open(path, 'r') as f:
+        return f.read()
+
+class PreparedPage(NamedTuple):
+    """
+    A page parsed and matched to its template, ready to be rendered anywhere.
+    """
+    template: CompiledTemplate
+    values: Dict[str, object]
+    deps: Tuple[Path, ...]
+
+    def render_into(self, write):
+        """
+        Pass the filled template to write fragment by fragment, rendering
+        the body into its slot as it goes.
+
+        Where the fragments end up is the caller's choice: generate_page
+        collects ordinary pages in memory, so an unchanged output can be
+        left alone, and only streams large pages to a temporary file.
+        """
+        self.template.render_into(write, self.values)
+
+def prepare_page(from_path, basepath, templates: TemplateCache, stack: ExitStack, streaming: bool = None, fragments: FragmentCache = None, markdown: str = None) -> PreparedPage:
+    """
+    Parse a markdown source and pick its template, without writing anything.
+
+    The page's front matter may select a layout (``layout: post``) and its
+    other entries become template variables alongside Title and Content.
+
+    Large sources are streamed: the file is read only up to its title first,
+    then re-read and rendered one block at a time as the page is written.
+
+    Args:
+        from_path (str): Path to source markdown file
+        basepath (str): URL prefix substituted for root-relative links
+        templates (TemplateCache): Compiled templates, for the same basepath
+        stack (ExitStack): Keeps a streamed source open until the page is rendered
+        streaming (bool): Force streaming on or off; by default sources of at
+            least STREAMING_THRESHOLD bytes are streamed
+        fragments (FragmentCache): Optional cache of rendered blocks, so only
+            blocks that changed since they were last seen are parsed
+        markdown (str): The source's text if it was already read, e.g.
+            prefetched by another thread; from_path is read otherwise
+
+    Returns:
+        PreparedPage: The template, its values and the page's dependencies
+    """
+    if markdown is not None:
+        streaming = False
+    elif streaming is None:
+        streaming = os.path.getsize(from_path) >= STREAMING_THRESHOLD
+
+    if streaming:
+        source = stack.enter_context(open(from_path, 'r'))
+        # The title is needed before the body is written, so find it first...
+        front_matter, lines = read_front_matter(iter_file_lines(source))
+        title = title_from_blocks(iter_blocks(lines))
+        # ...then start over and render the body lazily from the file
+        source.seek(0)
+        front_matter, lines = read_front_matter(iter_file_lines(source))
+        content = StreamedMarkdown(lines, basepath, fragments)
+    else:
+        # One parse yields the HTML tree, front matter and title together;
+        # link and image URLs are rebased as their nodes are built
+        if markdown is None:
+            markdown = read_markdown(from_path)
+        document = markdown_to_document(markdown, basepath, fragments)
+        front_matter, title, content = document.front_matter, document.title, document.root
+
+    # Front matter may pick a layout other than the default template
+    template = templates.layout(front_matter.get("layout"))
+    values = {**front_matter, "Title": title, "Content": content}
+    return PreparedPage(template, values, (Path(from_path),) + template.deps)
+
+def generate_page(from_path, template_path, dest_path, basepath, templates: TemplateCache = None, streaming: bool = None, fragments: FragmentCache = None) -> RenderedPage:
     """
     Generate an HTML page from a markdown file using a template.
-    
+
     Args:
         from_path (str): Path to source markdown file
-        template_path (str): Path to HTML template file
+        template_path (str): Path to the default HTML template file
         dest_path (str): Destination path for generated HTML
+        basepath (str): URL prefix substituted for root-relative links
+        templates (TemplateCache): Compiled templates shared across the build,
+            compiled for the same basepath; a private cache is used if omitted
+        streaming (bool): Force streaming on or off; see prepare_page
+        fragments (FragmentCache): Optional cache of rendered blocks
+
+    Returns:
+        RenderedPage: Hash of the bytes written and the page's dependencies
     """
-    logging.info(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    
-    # Read markdown content
-    with open(from_path, 'r') as f:
-        markdown_content = f.read()
-    
-    # Read template content
-    with open(template_path, 'r') as f:
-        template_content = f.read()
-    
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
-    
-    # Extract title
-    title = extract_title(markdown_content)
-    
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
-    final_html = final_html.replace("href=\"/", f'href="{basepath}')
-    final_html = final_html.replace("src=\"/", f'src="{basepath}')
-    
-    # Ensure destination directory exists
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    
-    # Write final HTML to destination
-    with open(dest_path, 'w') as f:
-        f.write(final_html)
+    if templates is None:
+        templates = TemplateCache(template_path, basepath)
+    if streaming is None:
+        streaming = os.path.getsize(from_path) >= STREAMING_THRESHOLD
+
+    with ExitStack() as stack:
+        page = prepare_page(from_path, basepath, templates, stack, streaming, fragments)
+
+        logging.info(f"Generating page from {from_path} to {dest_path} using {page.template.deps[0]}")
+
+        # Ensure destination directory exists
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
 
+        # An output whose bytes didn't change is left untouched, keeping its
+        # mtime, so deploys and syncs only see pages that really changed
+        if streaming:
+            # Too large to hold: stream next to the output, hashing on the way
+            tmp_path = f"{dest_path}.tmp"
+            with open(tmp_path, 'wb', buffering=1 << 16) as f:
+                writer = HashingWriter(f)
+                page.render_into(writer.write)
+            replace_if_changed(tmp_path, dest_path, writer.hexdigest())
+        else:
+            buffer = io.BytesIO()
+            writer = HashingWriter(buffer)
+            page.render_into(writer.write)
+            write_if_changed(dest_path, buffer.getvalue())
+
+    return RenderedPage(writer.hexdigest(), page.deps)
+
+class BuildError(Exception):
+    """
+    Raised after a build in which one or more pages failed to generate.
+    """
+
+class PageJob(NamedTuple):
+    """
+    A single markdown source and the HTML file it renders to.
+    """
+    source: Path
+    dest: Path
 
-def generate_pages_recursive(dir_path_content: Path, template_path: Path, dest_dir_path: Path, basepath: Path):
+class PageResult(NamedTuple):
+    """
+    Outcome of rendering a PageJob. Exactly one of page and error is set;
+    stats holds the page's stage timings when profiling is enabled.
+    """
+    job: PageJob
+    page: RenderedPage | None
+    error: str | None
+    stats: dict | None = None
+
+def collect_page_jobs(dir_path_content: Path, dest_dir_path: Path) -> List[PageJob]:
+    """
+    Walk the content tree and list every page that could be generated.
+
+    Args:
+        dir_path_content (Path): Source directory containing markdown files
+        dest_dir_path (Path): Destination directory for generated HTML files
+
+    Returns:
+        List[PageJob]: Jobs sorted by source path, so builds are reproducible
+    """
+    jobs = []
+
+    # Iterate through all files and directories
+    for entry in sorted(dir_path_content.iterdir()):
+        if entry.is_file() and entry.suffix == '.md':
+            # Convert .md extension to .html, keeping the directory structure
+            jobs.append(PageJob(entry, dest_dir_path / entry.with_suffix('.html').name))
+        elif entry.is_dir():
+            # Recursively process subdirectories
+            jobs.extend(collect_page_jobs(entry, dest_dir_path / entry.name))
+
+    return sorted(jobs)
+
+# Template and fragment caches handed to each pool worker once, rather than
+# pickled with every chunk
+_worker_templates = None
+_worker_fragments = None
+
+def render_page_job(job: PageJob, template_path: Path, basepath: str, templates: TemplateCache = None, fragments: FragmentCache = None) -> PageResult:
+    """
+    Render one job, capturing any failure instead of raising.
+
+    This is the unit of work sent to pool workers, so one broken page
+    cannot abort the pages rendered alongside it.
+    """
+    fragments = fragments or _worker_fragments
+    profiling.begin_page()
+    try:
+        # Ensure destination subdirectories exist
+        job.dest.parent.mkdir(parents=True, exist_ok=True)
+        page = generate_page(str(job.source), str(template_path), str(job.dest), str(basepath),
+                             templates or _worker_templates, fragments=fragments)
+        if fragments is not None:
+            # One short transaction per page keeps concurrent workers from blocking each other
+            fragments.flush()
+        return PageResult(job, page, None, profiling.end_page())
+    except Exception:
+        return PageResult(job, None, traceback.format_exc(), profiling.end_page())
+
+def _init_worker(templates: TemplateCache, profile: bool, fragments: FragmentCache = None):
+    """
+    Install the parent's compiled templates and fragment cache and silence
+    per-page logging in pool workers; the parent logs results in job order.
+    Workers time their own pages when the parent is profiling. A forked
+    worker inherits the fragment cache unpickled, connection and all; the
+    cache notices the new process and opens its own connection.
+    """
+    global _worker_templates, _worker_fragments
+    _worker_templates = templates
+    _worker_fragments = fragments
+    logging.getLogger().setLevel(logging.WARNING)
+    if profile:
+        profiling.enable()
+
+def render_pages(jobs: List[PageJob], template_path: Path, basepath: str, workers: int = 1, templates: TemplateCache = None, fragments: FragmentCache = None, pipelined: bool = False) -> List[PageResult]:
+    """
+    Render jobs either in-process or across a pool of worker processes.
+
+    Jobs are submitted in chunks so small pages don't pay the inter-process
+    round trip individually. Results always come back in job order.
+
+    Args:
+        jobs (List[PageJob]): Pages to render
+        template_path (Path): Path to HTML template file
+        basepath (str): URL prefix substituted for root-relative links
+        workers (int): Number of worker processes; 1 renders in-process
+        templates (TemplateCache): Compiled templates shared by every page
+        fragments (FragmentCache): Optional cache of rendered blocks
+        pipelined (bool): When rendering in-process, overlap reads and
+            writes with rendering; see render_pages_pipelined
+
+    Returns:
+        List[PageResult]: One result per job, in the same order
+    """
+    if templates is None:
+        templates = TemplateCache(template_path, basepath)
+
+    # A pool only pays off when there is more than one page to spread out
+    if workers <= 1 or len(jobs) <= 1:
+        if pipelined and len(jobs) > 1:
+            return render_pages_pipelined(jobs, template_path, basepath, templates, fragments)
+        return [render_page_job(job, template_path, basepath, templates, fragments) for job in jobs]
+
+    # Compile every layout once here so workers start with a warm cache
+    templates.preload()
+    render = partial(render_page_job, template_path=template_path, basepath=basepath)
+
+    workers = min(workers, len(jobs))
+    # Aim for a few chunks per worker so load still balances across uneven pages
+    chunksize = max(1, len(jobs) // (workers * 4))
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(templates, profiling.active() is not None, fragments)) as executor:
+        for result in executor.map(render, jobs, chunksize=chunksize):
+            if result.error is None:
+                logging.info(f"Generating page from {result.job.source} to {result.job.dest} using {result.page.deps[1]}")
+            results.append(result)
+    return results
+
+# Marks the end of a pipeline queue
+_DONE = object()
+
+def _read_sources(jobs: List[PageJob], sources: queue.Queue):
+    """
+    Reader stage: read sources ahead of the renderer, in job order.
+
+    A source that is large enough to be streamed, or that can't be read, is
+    passed on as None; the renderer then opens it itself, and reports the
+    error in the latter case.
+    """
+    for index, job in enumerate(jobs):
+        text = None
+        try:
+            if os.path.getsize(job.source) < STREAMING_THRESHOLD:
+                with open(job.source, 'r') as f:
+                    text = f.read()
+        except OSError:
+            pass
+        sources.put((index, job, text))
+    sources.put(_DONE)
+
+def _write_outputs(outputs: queue.Queue, results: List[PageResult], write=write_if_changed):
+    """
+    Writer stage: flush rendered pages to disk until the queue is closed.
+
+    A failed write turns the page's result into an error. write is bound
+    when this module is imported, so the profiler's hooks, which aren't
+    thread-safe, never run on writer threads.
+    """
+    for index, dest, data in iter(outputs.get, _DONE):
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            write(dest, data)
+        except Exception:
+            result = results[index]
+            results[index] = PageResult(result.job, None, traceback.format_exc(), result.stats)
+
+def render_prefetched_job(job: PageJob, markdown: str, basepath: str, templates: TemplateCache, fragments: FragmentCache = None) -> Tuple[PageResult, bytes | None]:
+    """
+    Render stage: render an already read source into memory.
+
+    Returns:
+        Tuple[PageResult, bytes | None]: The result and the page's bytes,
+            which are None if rendering failed
+    """
+    profiling.begin_page()
+    try:
+        buffer = io.BytesIO()
+        with ExitStack() as stack:
+            page = prepare_page(str(job.source), basepath, templates, stack, fragments=fragments, markdown=markdown)
+            logging.info(f"Generating page from {job.source} to {job.dest} using {page.template.deps[0]}")
+            writer = HashingWriter(buffer)
+            page.render_into(writer.write)
+        if fragments is not None:
+            fragments.flush()
+        rendered = RenderedPage(writer.hexdigest(), page.deps)
+        return PageResult(job, rendered, None, profiling.end_page()), buffer.getvalue()
+    except Exception:
+        return PageResult(job, None, traceback.format_exc(), profiling.end_page()), None
+
+def render_pages_pipelined(jobs: List[PageJob], template_path: Path, basepath: str, templates: TemplateCache = None, fragments: FragmentCache = None, depth: int = PIPELINE_DEPTH, writers: int = PIPELINE_WRITERS) -> List[PageResult]:
+    """
+    Render jobs in-process, overlapping file I/O with rendering.
+
+    A reader thread prefetches sources, the calling thread renders them
+    into memory and a pool of writer threads flushes the pages to disk.
+    The stages are joined by queues holding at most depth pages each, so
+    memory stays bounded however many pages there are. Reads and writes
+    release the GIL, which pays off where opening or writing a file is
+    slow, e.g. on network filesystems and CI disks.
+
+    Sources of at least STREAMING_THRESHOLD bytes skip the reader and
+    writers and are streamed as usual. When profiling, reads and writes
+    happen off the render thread and aren't charged to any page.
+
+    Args:
+        jobs (List[PageJob]): Pages to render
+        template_path (Path): Path to HTML template file
+        basepath (str): URL prefix substituted for root-relative links
+        templates (TemplateCache): Compiled templates shared by every page
+        fragments (FragmentCache): Optional cache of rendered blocks
+        depth (int): Maximum pages queued between two stages
+        writers (int): Number of writer threads
+
+    Returns:
+        List[PageResult]: One result per job, in the same order, once every
+            page has been written
+    """
+    if templates is None:
+        templates = TemplateCache(template_path, basepath)
+
+    results = [None] * len(jobs)
+    sources = queue.Queue(maxsize=depth)
+    outputs = queue.Queue(maxsize=depth)
+
+    # Daemon threads, so an interrupted build doesn't hang on a full queue
+    reader = threading.Thread(target=_read_sources, args=(jobs, sources), daemon=True)
+    writer_threads = [threading.Thread(target=_write_outputs, args=(outputs, results), daemon=True)
+                      for _ in range(max(1, writers))]
+    reader.start()
+    for thread in writer_threads:
+        thread.start()
+
+    try:
+        for index, job, text in iter(sources.get, _DONE):
+            if text is None:
+                # Too large to hold in memory, or unreadable: render it the usual way
+                results[index] = render_page_job(job, template_path, basepath, templates, fragments)
+                continue
+            result, data = render_prefetched_job(job, text, basepath, templates, fragments)
+            # Record the result before its page is queued; a failed write replaces it
+            results[index] = result
+            if data is not None:
+                outputs.put((index, job.dest, data))
+    finally:
+        for _ in writer_threads:
+            outputs.put(_DONE)
+        for thread in writer_threads:
+            thread.join()
+    return results
+
+def generate_pages_recursive(dir_path_content: Path, template_path: Path, dest_dir_path: Path, basepath: Path, manifest: BuildManifest = None, workers: int = 1, fragments: FragmentCache = None, sources=None, templates: TemplateCache = None, pipelined: bool = False):
     """
     Recursively generate HTML pages from markdown files while preserving directory structure.
     
@@ -53,7 +423,22 @@ def generate_pages_recursive(dir_path_content: Path, template_path: Path, dest_d
         dir_path_content (Path): Source directory containing markdown files
         template_path (Path): Path to HTML template file
         dest_dir_path (Path): Destination directory for generated HTML files
+        basepath (str): URL prefix substituted for root-relative links
+        manifest (BuildManifest): Optional manifest from the previous build;
+            pages whose source, template and output are unchanged are skipped
+        workers (int): Number of processes to render pages with
+        fragments (FragmentCache): Optional cache of rendered blocks shared
+            across pages and builds
+        sources (Iterable[Path]): Only consider these markdown sources, e.g.
+            the pages affected by an edit; every other output is left alone
+        templates (TemplateCache): Compiled templates to reuse, e.g. kept warm
+            between builds; a fresh cache is compiled if omitted
+        pipelined (bool): With a single worker, overlap reading sources and
+            writing pages with rendering
         
+    Raises:
+        BuildError: If any page failed; every other page is still generated
+
     Example:
         If content/ has structure:
             content/
@@ -69,19 +454,34 @@ def generate_pages_recursive(dir_path_content: Path, template_path: Path, dest_d
     """
     # Ensure the destination directory exists
     dest_dir_path.mkdir(exist_ok=True)
-    
-    # Iterate through all files and directories
-    for entry in dir_path_content.iterdir():
-        if entry.is_file() and entry.suffix == '.md':
-            # Calculate relative path to maintain directory structure
-            rel_path = entry.relative_to(dir_path_content)
-            # Convert .md extension to .html
-            dest_file = dest_dir_path / rel_path.with_suffix('.html')
-            # Ensure destination subdirectories exist
-            dest_file.parent.mkdir(parents=True, exist_ok=True)
-            # Generate the HTML page
-            generate_page(str(entry), str(template_path), str(dest_file), str(basepath))
-        elif entry.is_dir():
-            # Recursively process subdirectories
-            generate_pages_recursive(entry, template_path, dest_dir_path / entry.name, basepath)
 
+    # Collect every page first, then skip those unchanged since the last build
+    if sources is not None:
+        sources = {Path(source).resolve() for source in sources}
+
+    jobs = []
+    for job in collect_page_jobs(dir_path_content, dest_dir_path):
+        if sources is not None and job.source.resolve() not in sources:
+            continue
+        if manifest is not None and manifest.is_fresh(job.dest, job.source, basepath):
+            logging.debug(f"Skipping unchanged {job.source}")
+            continue
+        jobs.append(job)
+
+    # One template cache per build, so each layout and partial is read and compiled once
+    if templates is None:
+        templates = TemplateCache(template_path, basepath)
+
+    profiler = profiling.active()
+    failures = []
+    for result in render_pages(jobs, template_path, basepath, workers, templates, fragments, pipelined):
+        if profiler is not None:
+            profiler.add_page(str(result.job.source), result.stats)
+        if result.error is not None:
+            logging.error(f"Failed to generate {result.job.source}:\n{result.error}")
+            failures.append(result.job.source)
+        elif manifest is not None:
+            manifest.record(result.job.source, result.job.dest, result.page.deps, basepath, result.page.output_hash)
+
+    if failures:
+        raise BuildError(f"{len(failures)} page(s) failed to generate: " + ", ".join(str(path) for path in failures))
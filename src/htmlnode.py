@@ -1,11 +1,67 @@
+class _FrozenList(list):
+    """
+    An empty list that refuses to change, shared by every childless node.
+    Compares and prints like [] so node equality and repr are unaffected.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Shared empty children list cannot be modified")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _immutable
+
+    def __reduce__(self):
+        return "EMPTY_CHILDREN"
+
+class _FrozenDict(dict):
+    """
+    An empty dict that refuses to change, shared by every node without props.
+    """
+    __slots__ = ()
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Shared empty props dict cannot be modified")
+
+    pop = popitem = clear = update = setdefault = _immutable
+    __setitem__ = __delitem__ = __ior__ = _immutable
+
+    def __reduce__(self):
+        return "EMPTY_PROPS"
+
+# Millions of leaves have no children or props; they all point at these
+# two objects instead of allocating an empty list and dict each
+EMPTY_CHILDREN = _FrozenList()
+EMPTY_PROPS = _FrozenDict()
+
 class HTMLNode:
+    # Slots instead of a per-instance __dict__ keep each node small
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
-        self.children = children or []  # Initialize as empty list if None
-        self.props = props or {}        # Initialize as empty dict if None
+        # Only a missing argument gets the shared frozen object; a caller's
+        # own empty list or dict stays theirs to fill in later
+        self.children = EMPTY_CHILDREN if children is None else children
+        self.props = EMPTY_PROPS if props is None else props
 
     def to_html(self):
+        """
+        Render the node to a single string.
+        """
+        parts = []
+        self.render_into(parts.append)
+        return "".join(parts)
+
+    def render_into(self, write):
+        """
+        Stream the node's HTML as a sequence of fragments.
+
+        Args:
+            write (callable): Receives each fragment in document order, e.g.
+                list.append, io.StringIO.write or an open file's write
+        """
         raise NotImplementedError("Child classes must implement this method")
 
     def props_to_html(self):
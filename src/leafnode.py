@@ -1,13 +1,14 @@
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         if value is None:
             raise ValueError("LeafNode must have a value")
-        # We pass None as children since LeafNodes cannot have children
+        # We pass None as children since LeafNodes cannot have children; the
+        # shared empty children list can't be modified
         super().__init__(tag=tag, value=value, children=None, props=props)
-        # Ensure children remains an empty list and can't be modified
-        self.children = []
     
     def to_html(self):
         if self.value is None:
@@ -20,3 +21,17 @@ class LeafNode(HTMLNode):
         # Generate the HTML with tag and props
         props_html = self.props_to_html()
         return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
+
+    def render_into(self, write):
+        if self.value is None:
+            raise ValueError("LeafNode must have a value")
+
+        # If there's no tag, emit the raw text value
+        if self.tag is None:
+            write(self.value)
+            return
+
+        # Emit the value on its own so large text (e.g. code blocks) isn't copied
+        write(f"<{self.tag}{self.props_to_html()}>")
+        write(self.value)
+        write(f"</{self.tag}>")
@@ -1,32 +1,136 @@
+import os
 import sys
+import argparse
 import logging
 from pathlib import Path
-from compiler import copy_static
-from generate_page import generate_pages_recursive
+from builder import SiteBuilder
+from client import DEFAULT_SOCKET
+from compiler import COPY_STRATEGIES
+from daemon import BuildDaemon, serve_daemon
+from devserver import DevSite, serve
+from generate_page import BuildError
+from shards import parse_shard
+import profiling
+import watch
 
-def main():
+def shard_argument(spec: str):
+    try:
+        return parse_shard(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def parse_args(argv=None):
+    """
+    Parse command line arguments.
+
+    The basepath stays positional so existing invocations such as
+    ``python3 src/main.py "/site-generator/"`` keep working.
+    """
+    parser = argparse.ArgumentParser(description="Build the site from content/ and static/ into docs/.")
+    parser.add_argument("basepath", nargs="?", default="/",
+                        help="URL prefix for root-relative links (default: /)")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete docs/ and rebuild every page, ignoring the build manifest")
+    parser.add_argument("--in-place", action="store_true",
+                        help="write straight into docs/ instead of building a staging copy "
+                             "and swapping it in once the build succeeds")
+    parser.add_argument("--copy-strategy", choices=COPY_STRATEGIES, default="auto",
+                        help="how static files are put into docs/: auto tries reflink, copy_file_range and "
+                             "sendfile before a plain copy; hardlink shares the files with static/, so never "
+                             "edit docs/ in place with it (default: auto)")
+    parser.add_argument("--hash-static", action="store_true",
+                        help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("-j", "--jobs", type=int, default=1, metavar="N",
+                        help="render pages with N worker processes (0 = one per CPU, default: 1)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="with -j 1, read sources ahead and write pages on background threads "
+                             "while rendering, for slow or network disks")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each build stage per page and report the totals and slowest pages")
+    parser.add_argument("--profile-output", default=".build/profile.json", metavar="PATH",
+                        help="where --profile writes its JSON report (default: .build/profile.json)")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to list in the profile summary (default: 10)")
+    parser.add_argument("--fragment-cache-size", type=int, default=64, metavar="MB",
+                        help="keep up to MB megabytes of rendered blocks in .build/ for reuse "
+                             "across pages and builds (0 disables, default: 64)")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, serve docs/ and rebuild affected pages on every change, "
+                             "reloading open browser tabs")
+    parser.add_argument("--serve", action="store_true",
+                        help="serve the site from memory, rendering pages on request, without writing docs/")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port --watch and --serve listen on (default: 8888)")
+    parser.add_argument("--poll-interval", type=float, default=0.1, metavar="SECONDS",
+                        help="how often --watch and --serve check for changes (default: 0.1)")
+    parser.add_argument("--shard", type=shard_argument, default=None, metavar="i/N",
+                        help="build only the pages of shard i of N into .build/shards/, e.g. on one of N "
+                             "CI runners; combine them with --merge-shards N")
+    parser.add_argument("--merge-shards", type=int, default=None, metavar="N",
+                        help="combine the output of shards 1/N to N/N into docs/ and copy static/")
+    parser.add_argument("--daemon", action="store_true",
+                        help="after building, stay running and build on request from src/client.py, "
+                             "keeping templates and caches warm")
+    parser.add_argument("--socket", default=None, metavar="PATH",
+                        help="Unix socket --daemon listens on (default: .build/daemon.sock)")
+    args = parser.parse_args(argv)
+    if (args.shard or args.merge_shards) and (args.watch or args.serve or args.daemon):
+        parser.error("--shard and --merge-shards can't be combined with --watch, --serve or --daemon")
+    if args.shard and args.merge_shards:
+        parser.error("--shard and --merge-shards are separate steps")
+    if args.merge_shards is not None and args.merge_shards < 1:
+        parser.error("--merge-shards needs at least one shard")
+    return args
+
+def main(argv=None):
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
         format='%(message)s'
     )
-    
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    else:
-        basepath = "/"
 
-    # Get project root and define paths
+    args = parse_args(argv)
+    workers = args.jobs or os.cpu_count() or 1
+
+    # Get project root; the builder knows the layout beneath it
     project_root = Path(__file__).parent.parent
-    content_dir = project_root / "content"
-    template_path = project_root / "template.html"
-    public_dir = project_root / "docs"
-    
-    # Copy static files (this also cleans public directory)
-    copy_static()
-    
-    # Generate all pages recursively
-    generate_pages_recursive(content_dir, template_path, public_dir, basepath)
+    builder = SiteBuilder(project_root, args.basepath, workers, args.hash_static,
+                          args.fragment_cache_size * 1024 * 1024, args.pipeline, args.shard,
+                          atomic=not args.in_place, copy_strategy=args.copy_strategy)
+
+    # Previews render straight from the sources; nothing is built to disk
+    if args.serve:
+        try:
+            serve(DevSite(project_root, args.basepath, builder.fragments), args.port, args.poll_interval)
+        finally:
+            builder.close()
+        return
+
+    # Timing hooks are only installed when asked for
+    profiler = profiling.enable() if args.profile else None
+
+    try:
+        # Sync static files and generate pages, skipping those unchanged since the last build
+        try:
+            if args.merge_shards:
+                builder.merge_shards(args.merge_shards, clean=args.clean)
+            else:
+                builder.build(clean=args.clean)
+        except BuildError as e:
+            logging.error(str(e))
+            if not (args.watch or args.daemon):
+                sys.exit(1)
+        finally:
+            if profiler is not None:
+                profiling.log_report(profiler, project_root / args.profile_output, args.profile_top)
+
+        if args.watch:
+            watch.watch(builder, args.port, args.poll_interval)
+        elif args.daemon:
+            socket_path = Path(args.socket) if args.socket else project_root / DEFAULT_SOCKET
+            serve_daemon(BuildDaemon(builder), socket_path)
+    finally:
+        builder.close()
 
 if __name__ == "__main__":
     main()
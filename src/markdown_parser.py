@@ -1,40 +1,72 @@
 import re
+from typing import NamedTuple
+
+# Images and links in one pattern: group 1 is "!" for an image, group 2 the
+# alt/anchor text and group 3 the URL
+MARKDOWN_LINK_PATTERN = r"(!?)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+MARKDOWN_LINK_REGEX = re.compile(MARKDOWN_LINK_PATTERN)
+
+class MarkdownSpan(NamedTuple):
+    """
+    An image or link found in a text, with its position in that text.
+    """
+    is_image: bool
+    text: str
+    url: str
+    start: int
+    end: int
+
+def extract_markdown_spans(text):
+    """
+    Find every markdown image and link in a single scan.
+
+    Args:
+        text (str): Markdown text to parse
+
+    Returns:
+        list[MarkdownSpan]: Images and links in order of appearance, with
+            the [start, end) offsets of their full markup
+
+    Example:
+        >>> extract_markdown_spans("See ![pic](a.png) and [site](b.com)")
+        [MarkdownSpan(is_image=True, text='pic', url='a.png', start=4, end=17),
+         MarkdownSpan(is_image=False, text='site', url='b.com', start=22, end=35)]
+    """
+    return [
+        MarkdownSpan(bool(match.group(1)), match.group(2), match.group(3), match.start(), match.end())
+        for match in MARKDOWN_LINK_REGEX.finditer(text)
+    ]
 
 def extract_markdown_images(text):
     """
     Extract all markdown images from text and return list of (alt_text, url) tuples.
-    
+
     Args:
         text (str): Markdown text to parse
-        
+
     Returns:
         list[tuple]: List of tuples containing (alt_text, url)
-        
+
     Example:
         >>> text = "![alt](url.jpg) ![other](pic.png)"
         >>> extract_markdown_images(text)
         [('alt', 'url.jpg'), ('other', 'pic.png')]
     """
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return [(span.text, span.url) for span in extract_markdown_spans(text) if span.is_image]
 
 def extract_markdown_links(text):
     """
     Extract all markdown links from text and return list of (anchor_text, url) tuples.
-    
+
     Args:
         text (str): Markdown text to parse
-        
+
     Returns:
         list[tuple]: List of tuples containing (anchor_text, url)
-        
+
     Example:
         >>> text = "[Link](url.com) [Other](site.com)"
         >>> extract_markdown_links(text)
         [('Link', 'url.com'), ('Other', 'site.com')]
     """
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
-
+    return [(span.text, span.url) for span in extract_markdown_spans(text) if not span.is_image]
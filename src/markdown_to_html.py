@@ -1,61 +1,68 @@
-from typing import List
-from textnode import TextNode, text_node_to_html_node
+from typing import List, Tuple
+from textnode import TextNode, text_node_to_html, text_node_to_html_node
 from text_to_textnodes import text_to_textnodes
-from block_parser import markdown_to_blocks
-from block_to_block import block_to_block_type, BlockType
+from block_parser import Block, iter_blocks, parse_blocks
+from block_to_block import BlockType
+from fragment_cache import fragment_key
+from front_matter import split_front_matter
+from document import Document, Heading, unique_anchor
 from htmlnode import HTMLNode
 from parentnode import ParentNode
 from leafnode import LeafNode
 
-def text_to_children(text: str) -> List[HTMLNode]:
+def text_to_children(text: str, basepath: str = "/") -> List[HTMLNode]:
     """
     Convert a text string with inline markdown to a list of HTMLNode objects.
     
     Args:
         text (str): The text to convert
+        basepath (str): Prefix for root-relative link and image URLs
         
     Returns:
         List[HTMLNode]: List of HTML nodes representing the text
     """
     nodes = text_to_textnodes(text)
-    return [text_node_to_html_node(node) for node in nodes]
+    return [text_node_to_html_node(node, basepath) for node in nodes]
 
-def paragraph_to_html_node(text: str) -> HTMLNode:
+def paragraph_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert a paragraph block to an HTMLNode.
     
     Args:
         text (str): The paragraph text
+        basepath (str): Prefix for root-relative link and image URLs
         
     Returns:
         HTMLNode: A paragraph node with child nodes for inline markdown
     """
-    children = text_to_children(text)
+    children = text_to_children(text, basepath)
     return ParentNode("p", children)
 
-def heading_to_html_node(text: str) -> HTMLNode:
+def split_heading(text: str) -> Tuple[int, str]:
+    """
+    Split heading text into its level and its content after the '#' marks.
+    """
+    # Count the number of # characters at the start
+    level = len(text) - len(text.lstrip("#"))
+
+    # Remove the # characters and any following spaces
+    return level, text[level:].strip()
+
+def heading_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert a heading block to an HTMLNode.
     
     Args:
         text (str): The heading text including '#' characters
+        basepath (str): Prefix for root-relative link and image URLs
         
     Returns:
         HTMLNode: A heading node with the appropriate heading level
     """
-    # Count the number of # characters at the start
-    level = 0
-    for char in text:
-        if char == "#":
-            level += 1
-        else:
-            break
-            
-    # Remove the # characters and any following spaces
-    content = text[level:].strip()
+    level, content = split_heading(text)
     
     # Create heading node with appropriate h1-h6 tag
-    children = text_to_children(content)
+    children = text_to_children(content, basepath)
     return ParentNode(f"h{level}", children)
 
 def code_to_html_node(text: str) -> HTMLNode:
@@ -68,63 +75,106 @@ def code_to_html_node(text: str) -> HTMLNode:
     Returns:
         HTMLNode: A pre node containing a code node
     """
-    # Remove the ``` delimiters and any language specification
-    content = text.split("\n", 1)[1].rsplit("\n", 1)[0]
+    return code_lines_to_html_node(text.split("\n"))
+
+def code_content(lines: List[str]) -> str:
+    """
+    Return a code block's text without its fence lines.
+    """
+    if len(lines) == 1:
+        # ```code``` on one line: the code is between the fences
+        return lines[0][3:-3]
+    # Remove the opening ``` line and any language specification
+    body = lines[1:-1]
+    last = lines[-1].rstrip()
+    if last != '```':
+        # Code running up to the closing fence, as in ```\ncode```
+        body = body + [last[:-3]]
+    return "\n".join(body)
+
+def code_lines_to_html_node(lines: List[str]) -> HTMLNode:
+    """
+    Convert the lines of a code block, fences included, to pre and code HTMLNodes.
+    """
+    content = code_content(lines)
     
     # Create the nested structure: <pre><code>content</code></pre>
     code_node = ParentNode("code", [LeafNode(None, content)])
     return ParentNode("pre", [code_node])
 
-def quote_to_html_node(text: str) -> HTMLNode:
+def quote_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert a quote block to an HTMLNode.
     
     Args:
         text (str): The quote text with > characters
+        basepath (str): Prefix for root-relative link and image URLs
         
     Returns:
         HTMLNode: A blockquote node
     """
+    return quote_lines_to_html_node(text.split("\n"), basepath)
+
+def quote_content(lines: List[str]) -> str:
+    """
+    Join a quote block's lines into one line of text without the > markers.
+    """
     # Remove the > characters and any following spaces
-    lines = [line.lstrip("> ").strip() for line in text.split("\n")]
-    content = " ".join(lines)
-    
-    children = text_to_children(content)
+    return " ".join(line.lstrip("> ").strip() for line in lines)
+
+def quote_lines_to_html_node(lines: List[str], basepath: str = "/") -> HTMLNode:
+    """
+    Convert the lines of a quote block to a blockquote HTMLNode.
+    """
+    content = quote_content(lines)
+    children = text_to_children(content, basepath)
     return ParentNode("blockquote", children)
 
-def list_item_to_html_node(text: str) -> HTMLNode:
+def list_item_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert a single list item to an HTMLNode.
     Expects text without list markers.
     """
     # No need to strip markers - they're already removed
-    children = text_to_children(text.strip())
+    children = text_to_children(text.strip(), basepath)
     return ParentNode("li", children)
 
-def unordered_list_to_html_node(text: str) -> HTMLNode:
+def unordered_list_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert an unordered list block to an HTMLNode.
     Preprocesses list markers before passing to item processor.
     """
+    return unordered_list_lines_to_html_node(text.split("\n"), basepath)
+
+def unordered_list_items(lines: List[str]) -> List[str]:
+    """
+    Return the text of each unordered list item, markers removed.
+    """
     items = []
-    for line in text.split("\n"):
+    for line in lines:
         line = line.strip()
         # Remove marker here, so list_item_to_html_node gets clean text
         if line.startswith(('* ', '- ')):
             items.append(line[2:])
         else:
             items.append(line)
-            
-    children = [list_item_to_html_node(item) for item in items]
+    return items
+
+def unordered_list_lines_to_html_node(lines: List[str], basepath: str = "/") -> HTMLNode:
+    """
+    Convert the lines of an unordered list block to a ul HTMLNode.
+    """
+    children = [list_item_to_html_node(item, basepath) for item in unordered_list_items(lines)]
     return ParentNode("ul", children)
 
-def ordered_list_to_html_node(text: str) -> HTMLNode:
+def ordered_list_to_html_node(text: str, basepath: str = "/") -> HTMLNode:
     """
     Convert an ordered list block to an HTMLNode.
     Properly preprocesses number markers for list items.
     
     Args:
         text (str): The full list text with number markers (e.g., "1. First\n2. Second")
+        basepath (str): Prefix for root-relative link and image URLs
         
     Returns:
         HTMLNode: An ol node containing li nodes
@@ -135,8 +185,14 @@ def ordered_list_to_html_node(text: str) -> HTMLNode:
         >>> node.to_html()
         '<ol><li>First item</li><li>Second item</li></ol>'
     """
+    return ordered_list_lines_to_html_node(text.split("\n"), basepath)
+
+def ordered_list_items(lines: List[str]) -> List[str]:
+    """
+    Return the text of each ordered list item, number markers removed.
+    """
     items = []
-    for line in text.split("\n"):
+    for line in lines:
         line = line.strip()
         # Match any number followed by period and space
         if line and line[0].isdigit():
@@ -148,37 +204,274 @@ def ordered_list_to_html_node(text: str) -> HTMLNode:
                 items.append(line)
         else:
             items.append(line)
-            
-    children = [list_item_to_html_node(item) for item in items]
+    return items
+
+def ordered_list_lines_to_html_node(lines: List[str], basepath: str = "/") -> HTMLNode:
+    """
+    Convert the lines of an ordered list block to an ol HTMLNode.
+    """
+    children = [list_item_to_html_node(item, basepath) for item in ordered_list_items(lines)]
     return ParentNode("ol", children)
 
-def markdown_to_html_node(markdown: str) -> HTMLNode:
+def block_to_html_node(block: Block, basepath: str = "/") -> HTMLNode:
+    """
+    Convert a classified block to its HTMLNode, working from the block's lines.
+
+    Args:
+        block (Block): A block produced by the block parser
+        basepath (str): Prefix for root-relative link and image URLs
+
+    Returns:
+        HTMLNode: The node for the block
+    """
+    match block.block_type:
+        case BlockType.PARAGRAPH:
+            return paragraph_to_html_node("\n".join(block.lines), basepath)
+        case BlockType.HEADING:
+            return heading_to_html_node("\n".join(block.lines), basepath)
+        case BlockType.CODE:
+            return code_lines_to_html_node(block.lines)
+        case BlockType.QUOTE:
+            return quote_lines_to_html_node(block.lines, basepath)
+        case BlockType.UNORDERED_LIST:
+            return unordered_list_lines_to_html_node(block.lines, basepath)
+        case BlockType.ORDERED_LIST:
+            return ordered_list_lines_to_html_node(block.lines, basepath)
+        case _:
+            raise ValueError(f"Invalid block type: {block.block_type}")
+
+def text_to_html(text: str, basepath: str = "/") -> str:
+    """
+    Render a text string with inline markdown straight to HTML.
+
+    The string counterpart of text_to_children: each inline token is
+    emitted as it is parsed, without building a LeafNode for it.
+    """
+    return "".join([text_node_to_html(node, basepath) for node in text_to_textnodes(text)])
+
+def block_to_html(block: Block, basepath: str = "/") -> str:
+    """
+    Render a classified block straight to its HTML string.
+
+    Produces exactly block_to_html_node(block).to_html(), without building
+    the intermediate node tree; used wherever only the markup is needed.
+
+    Args:
+        block (Block): A block produced by the block parser
+        basepath (str): Prefix for root-relative link and image URLs
+
+    Returns:
+        str: The block's HTML
+    """
+    match block.block_type:
+        case BlockType.PARAGRAPH:
+            text = "\n".join(block.lines)
+            return f"<p>{text_to_html(text, basepath)}</p>"
+        case BlockType.HEADING:
+            level, content = split_heading("\n".join(block.lines))
+            return f"<h{level}>{text_to_html(content, basepath)}</h{level}>"
+        case BlockType.CODE:
+            return f"<pre><code>{code_content(block.lines)}</code></pre>"
+        case BlockType.QUOTE:
+            return f"<blockquote>{text_to_html(quote_content(block.lines), basepath)}</blockquote>"
+        case BlockType.UNORDERED_LIST:
+            items = "".join([f"<li>{text_to_html(item.strip(), basepath)}</li>" for item in unordered_list_items(block.lines)])
+            return f"<ul>{items}</ul>"
+        case BlockType.ORDERED_LIST:
+            items = "".join([f"<li>{text_to_html(item.strip(), basepath)}</li>" for item in ordered_list_items(block.lines)])
+            return f"<ol>{items}</ol>"
+        case _:
+            raise ValueError(f"Invalid block type: {block.block_type}")
+
+def blocks_to_html(blocks: List[Block], basepath: str = "/", fragments=None) -> List[str]:
+    """
+    Render blocks to HTML strings, reusing a fragment cache when one is given.
+
+    With a cache, every block is looked up in one batch; only the misses are
+    parsed, and their HTML is handed back to the cache.
+
+    Args:
+        blocks (List[Block]): Blocks produced by the block parser
+        basepath (str): Prefix for root-relative link and image URLs
+        fragments (FragmentCache): Optional cache of rendered blocks
+
+    Returns:
+        List[str]: One HTML string per block, in order
+    """
+    if fragments is None:
+        return [block_to_html(block, basepath) for block in blocks]
+
+    keys = [fragment_key(block, basepath) for block in blocks]
+    cached = fragments.get_many(keys)
+
+    fragments_html = []
+    for key, block in zip(keys, blocks):
+        html = cached.get(key)
+        if html is None:
+            html = block_to_html(block, basepath)
+            fragments.put(key, html)
+            # A block repeated within the page is only rendered once
+            cached[key] = html
+        fragments_html.append(html)
+    return fragments_html
+
+def markdown_to_html_node(markdown: str, basepath: str = "/", fragments=None) -> HTMLNode:
     """
     Convert a full markdown document to a single HTML node.
+
+    This is the tree API: without a fragment cache, every block, inline
+    element and text run becomes its own node. With one, each block is a
+    single raw HTML leaf.
     
     Args:
         markdown (str): The complete markdown document
+        basepath (str): Prefix for root-relative link and image URLs
+        fragments (FragmentCache): Optional cache of rendered blocks; when
+            given, only blocks missing from it are parsed
         
     Returns:
         HTMLNode: A div node containing all converted content
     """
-    blocks = markdown_to_blocks(markdown)
+    # Blocks arrive already split and classified from one pass over the lines
+    blocks = parse_blocks(markdown)
+    if fragments is not None:
+        return ParentNode("div", [LeafNode(None, html) for html in blocks_to_html(blocks, basepath, fragments)])
+    return ParentNode("div", [block_to_html_node(block, basepath) for block in blocks])
+
+def markdown_to_html(markdown: str, basepath: str = "/", fragments=None) -> str:
+    """
+    Render a full markdown document straight to an HTML string.
+
+    Same output as markdown_to_html_node(...).to_html(), without building
+    the node tree in between.
+    """
+    return "<div>" + "".join(blocks_to_html(parse_blocks(markdown), basepath, fragments)) + "</div>"
+
+def heading_from_block(block: Block, seen_anchors: dict) -> Tuple[Heading, List[TextNode]]:
+    """
+    Describe a heading block for the document's metadata.
+
+    Args:
+        block (Block): A block classified as a heading
+        seen_anchors (dict): Anchors already used on the page, updated in place
+
+    Returns:
+        tuple: The Heading (level, source, plain text and anchor) and the
+            heading's inline text nodes, so they needn't be parsed again
+    """
+    level, content = split_heading("\n".join(block.lines))
+    nodes = text_to_textnodes(content)
+    plain = "".join(node.text for node in nodes)
+    return Heading(level, content, plain, unique_anchor(plain, seen_anchors)), nodes
+
+def title_from_blocks(blocks) -> str:
+    """
+    Find a page's title by the same rule as Document.title: the first line
+    of its first h1 block.
+
+    Blocks are consumed lazily and only up to the title, so a streamed
+    source is read no further than it needs to be. A '# ' line inside a
+    code block is not a heading and so never the title.
+
+    Args:
+        blocks (Iterable[Block]): The page's blocks, e.g. from iter_blocks
+
+    Raises:
+        ValueError: If there is no h1
+    """
+    for block in blocks:
+        if block.block_type is BlockType.HEADING:
+            level, content = split_heading("\n".join(block.lines))
+            if level == 1:
+                return content.partition('\n')[0].strip()
+    raise ValueError("No h1 header found in markdown")
+
+def heading_to_html(heading: Heading, nodes: List[TextNode], basepath: str = "/") -> str:
+    """
+    Render a heading with its anchor as the id, so a table of contents can link to it.
+
+    Args:
+        heading (Heading): The heading's metadata, from heading_from_block
+        nodes (List[TextNode]): Its inline text nodes, from the same call
+        basepath (str): Prefix for root-relative link and image URLs
+    """
+    html = "".join([text_node_to_html(node, basepath) for node in nodes])
+    return f'<h{heading.level} id="{heading.anchor}">{html}</h{heading.level}>'
+
+def markdown_to_document(markdown: str, basepath: str = "/", fragments=None) -> Document:
+    """
+    Parse a markdown page, front matter included, into a Document.
+
+    The blocks are split and classified once; the page's HTML and the
+    heading list are both built from that single pass, so the title and
+    table of contents come for free instead of from another scan. Block
+    HTML is emitted straight from the inline tokens, so the root holds one
+    raw HTML leaf per block; use markdown_to_html_node for a full tree.
+    Headings carry their anchor as their id. Their anchors depend on the
+    headings before them, so they are never taken from the fragment cache.
+
+    Args:
+        markdown (str): The complete page, optionally starting with front matter
+        basepath (str): Prefix for root-relative link and image URLs
+        fragments (FragmentCache): Optional cache of rendered blocks
+
+    Returns:
+        Document: The page's HTML, front matter and headings
+
+    Raises:
+        ValueError: If the front matter or inline markup is malformed
+
+    Example:
+        >>> document = markdown_to_document("---\\nlayout: post\\n---\\n# Hi\\n\\n## Part one")
+        >>> document.title, document.front_matter
+        ('Hi', {'layout': 'post'})
+        >>> [heading.anchor for heading in document.headings]
+        ['hi', 'part-one']
+    """
+    front_matter, body = split_front_matter(markdown)
+    blocks = parse_blocks(body)
+
+    # Every other block is rendered in one batch, so a cache is queried once
+    others = [block for block in blocks if block.block_type is not BlockType.HEADING]
+    others_html = iter(blocks_to_html(others, basepath, fragments))
+
+    seen_anchors = {}
+    headings = []
     children = []
-    
     for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH.value:
-            children.append(paragraph_to_html_node(block))
-        elif block_type == BlockType.HEADING.value:
-            children.append(heading_to_html_node(block))
-        elif block_type == BlockType.CODE.value:
-            children.append(code_to_html_node(block))
-        elif block_type == BlockType.QUOTE.value:
-            children.append(quote_to_html_node(block))
-        elif block_type == BlockType.UNORDERED_LIST.value:
-            children.append(unordered_list_to_html_node(block))
-        elif block_type == BlockType.ORDERED_LIST.value:
-            children.append(ordered_list_to_html_node(block))
-            
-    return ParentNode("div", children)
+        if block.block_type is BlockType.HEADING:
+            heading, nodes = heading_from_block(block, seen_anchors)
+            headings.append(heading)
+            # Reuse the inline nodes parsed for the metadata
+            children.append(LeafNode(None, heading_to_html(heading, nodes, basepath)))
+        else:
+            children.append(LeafNode(None, next(others_html)))
+    return Document(front_matter, ParentNode("div", children), headings)
+
+class StreamedMarkdown:
+    """
+    Markdown rendered lazily, one block at a time, from an iterator of lines.
+
+    Has the same render_into interface as an HTMLNode, so it can fill a
+    template slot directly. Each block is parsed, rendered and released as
+    soon as its last line has been read, so memory stays proportional to
+    the largest block instead of the whole document. The output is the same
+    as markdown_to_document(...).root.to_html(), heading ids included.
+    """
+
+    def __init__(self, lines, basepath: str = "/", fragments=None):
+        self.lines = lines
+        self.basepath = basepath
+        self.fragments = fragments
+
+    def render_into(self, write):
+        seen_anchors = {}
+        write("<div>")
+        for block in iter_blocks(self.lines):
+            if block.block_type is BlockType.HEADING:
+                heading, nodes = heading_from_block(block, seen_anchors)
+                write(heading_to_html(heading, nodes, self.basepath))
+            else:
+                html, = blocks_to_html([block], self.basepath, self.fragments)
+                write(html)
+        write("</div>")
@@ -1,6 +1,9 @@
 from htmlnode import HTMLNode
+from leafnode import LeafNode
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         if tag is None:
             raise ValueError("ParentNode must have a tag")
@@ -11,16 +14,42 @@ class ParentNode(HTMLNode):
             
         super().__init__(tag=tag, value=None, children=children, props=props)
         
-    def to_html(self):
-        # Generate opening tag with props
-        props_html = self.props_to_html()
-        html = f"<{self.tag}{props_html}>"
-        
-        # Recursively render all children
-        for child in self.children:
-            html += child.to_html()
-            
-        # Add closing tag
-        html += f"</{self.tag}>"
-        
-        return html
+    def render_into(self, write):
+        """
+        Stream the tree's HTML without recursing into nested ParentNodes.
+
+        An explicit stack of (tag, remaining children) stands in for the call
+        stack, so arbitrarily deep trees render without hitting Python's
+        recursion limit. Plain LeafNodes are written inline to save a method
+        call per leaf; any other node type renders itself.
+        """
+        # Emit opening tag with props
+        write(f"<{self.tag}{self.props_to_html()}>")
+        stack = [(self.tag, iter(self.children))]
+        # Local names keep the per-child type checks cheap
+        leaf_node, parent_node = LeafNode, ParentNode
+
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                kind = type(child)
+                if kind is leaf_node and child.value is not None:
+                    child_tag = child.tag
+                    if child_tag is None:
+                        write(child.value)
+                    else:
+                        # Value written on its own so large text isn't copied
+                        write(f"<{child_tag}{child.props_to_html()}>" if child.props else f"<{child_tag}>")
+                        write(child.value)
+                        write(f"</{child_tag}>")
+                elif kind is parent_node:
+                    # Descend: open the child and finish its subtree before our remaining children
+                    write(f"<{child.tag}{child.props_to_html()}>")
+                    stack.append((child.tag, iter(child.children)))
+                    break
+                else:
+                    child.render_into(write)
+            else:
+                # Every child written - close this element and resume its parent
+                stack.pop()
+                write(f"</{tag}>")
@@ -0,0 +1,210 @@
+import json
+import logging
+import importlib
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+# Functions timed when profiling is enabled, as (module, attribute, stage).
+# An attribute may be "Class.method". Hooks are installed by patching these
+# names at enable() time, so a build without --profile runs the original
+# functions untouched and pays nothing.
+INSTRUMENTED = [
+    ("generate_page", "read_markdown", "read"),
+    ("generate_page", "title_from_blocks", "extract_title"),
+    ("markdown_to_html", "parse_blocks", "parse_blocks"),
+    ("markdown_to_html", "text_to_textnodes", "text_to_textnodes"),
+    ("markdown_to_html", "heading_from_block", "metadata"),
+    ("markdown_to_html", "text_node_to_html_node", "html_nodes"),
+    ("markdown_to_html", "paragraph_to_html_node", "html_nodes"),
+    ("markdown_to_html", "heading_to_html_node", "html_nodes"),
+    ("markdown_to_html", "code_lines_to_html_node", "html_nodes"),
+    ("markdown_to_html", "quote_lines_to_html_node", "html_nodes"),
+    ("markdown_to_html", "list_item_to_html_node", "html_nodes"),
+    ("markdown_to_html", "unordered_list_lines_to_html_node", "html_nodes"),
+    ("markdown_to_html", "ordered_list_lines_to_html_node", "html_nodes"),
+    # Block HTML emitted directly, without nodes, is charged to the same stage
+    ("markdown_to_html", "block_to_html", "html_nodes"),
+    ("fragment_cache", "FragmentCache.get_many", "fragments"),
+    ("fragment_cache", "FragmentCache.flush", "fragments"),
+    ("parentnode", "ParentNode.render_into", "to_html"),
+    ("template", "CompiledTemplate.render_into", "template"),
+    # Hashing a page happens as it is rendered, so it counts towards to_html
+    # and template; write is only the comparison with and replacing of the file
+    ("generate_page", "write_if_changed", "write"),
+    ("generate_page", "replace_if_changed", "write"),
+]
+
+class Profiler:
+    """
+    Collects wall time and call counts per build stage, per page.
+
+    Times are exclusive: when a timed function calls another timed function,
+    the inner call's time is charged to its own stage only, so the stages of
+    a page add up to (roughly) its total time.
+    """
+
+    def __init__(self):
+        # source path -> {stage: {"seconds": float, "calls": int}}
+        self.pages = {}
+        self._current = {}
+        self._page_start = None
+        # Time spent in nested timed calls, one accumulator per active call
+        self._stack = []
+
+    def timed(self, stage: str, fn):
+        """
+        Wrap fn so each call is charged to stage.
+        """
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            self._stack.append(0.0)
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = perf_counter() - start
+                nested = self._stack.pop()
+                if self._stack:
+                    self._stack[-1] += elapsed
+                record = self._current.setdefault(stage, {"seconds": 0.0, "calls": 0})
+                record["seconds"] += elapsed - nested
+                record["calls"] += 1
+        return wrapper
+
+    def begin_page(self):
+        self._current = {}
+        self._page_start = perf_counter()
+
+    def end_page(self) -> dict:
+        """
+        Finish the current page and return its stage timings.
+        """
+        stats = self._current
+        stats["total"] = {"seconds": perf_counter() - self._page_start, "calls": 1}
+        self._current = {}
+        return stats
+
+    def add_page(self, name: str, stats: dict):
+        """
+        Store a page's timings, which may have been measured in another process.
+        """
+        self.pages[name] = stats
+
+    def aggregate(self) -> dict:
+        """
+        Sum every page's timings per stage.
+        """
+        totals = {}
+        for stats in self.pages.values():
+            for stage, record in stats.items():
+                total = totals.setdefault(stage, {"seconds": 0.0, "calls": 0})
+                total["seconds"] += record["seconds"]
+                total["calls"] += record["calls"]
+        return totals
+
+    def slowest_pages(self, top: int = 10) -> list:
+        """
+        Return (name, stats) for the top pages by total time, slowest first.
+        """
+        ranked = sorted(self.pages.items(), key=lambda item: (-item[1]["total"]["seconds"], item[0]))
+        return ranked[:top]
+
+    def write_json(self, path: Path):
+        """
+        Write per-page and aggregate timings as JSON.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"aggregate": self.aggregate(), "pages": self.pages}, f, indent=1, sort_keys=True)
+
+    def format_report(self, top: int = 10) -> str:
+        """
+        Render the aggregate stage table and the slowest pages as plain text.
+        """
+        totals = self.aggregate()
+        build_total = totals.get("total", {"seconds": 0.0})["seconds"] or 1.0
+
+        lines = [f"{'stage':<20} {'seconds':>10} {'calls':>10} {'share':>7}"]
+        stages = sorted((stage for stage in totals if stage != "total"), key=lambda s: -totals[s]["seconds"])
+        for stage in stages:
+            record = totals[stage]
+            share = 100 * record["seconds"] / build_total
+            lines.append(f"{stage:<20} {record['seconds']:>10.4f} {record['calls']:>10} {share:>6.1f}%")
+        if "total" in totals:
+            lines.append(f"{'total':<20} {totals['total']['seconds']:>10.4f} {totals['total']['calls']:>10}")
+
+        lines.append("")
+        lines.append(f"Slowest {top} pages:")
+        for name, stats in self.slowest_pages(top):
+            stage_times = {stage: record["seconds"] for stage, record in stats.items() if stage != "total"}
+            hottest = max(stage_times, key=stage_times.get) if stage_times else "-"
+            lines.append(f"{stats['total']['seconds']:>10.4f}s  {name}  (mostly {hottest})")
+        return "\n".join(lines)
+
+# Profiler the hooks report to, and the originals they replaced
+_active = None
+_originals = []
+
+def _resolve(module_name: str, attribute: str):
+    """
+    Return (owner, name) for a dotted attribute such as "Class.method".
+    """
+    owner = importlib.import_module(module_name)
+    *parents, name = attribute.split(".")
+    for parent in parents:
+        owner = getattr(owner, parent)
+    return owner, name
+
+def enable() -> Profiler:
+    """
+    Install timing hooks on every instrumented function and return the profiler.
+    """
+    global _active
+    if _active is not None:
+        return _active
+
+    _active = Profiler()
+    for module_name, attribute, stage in INSTRUMENTED:
+        owner, name = _resolve(module_name, attribute)
+        original = getattr(owner, name)
+        _originals.append((owner, name, original))
+        setattr(owner, name, _active.timed(stage, original))
+    return _active
+
+def disable():
+    """
+    Restore the original functions.
+    """
+    global _active
+    while _originals:
+        owner, name, original = _originals.pop()
+        setattr(owner, name, original)
+    _active = None
+
+def active() -> Profiler | None:
+    return _active
+
+def begin_page():
+    """
+    Start timing a page; a no-op unless profiling is enabled.
+    """
+    if _active is not None:
+        _active.begin_page()
+
+def end_page() -> dict | None:
+    """
+    Finish timing a page and return its stage timings, or None when profiling is off.
+    """
+    if _active is not None:
+        return _active.end_page()
+    return None
+
+def log_report(profiler: Profiler, json_path: Path, top: int = 10):
+    """
+    Write the JSON report and log the human-readable summary.
+    """
+    profiler.write_json(json_path)
+    logging.info(profiler.format_report(top))
+    logging.info(f"Profile written to {json_path}")
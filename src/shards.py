@@ -0,0 +1,101 @@
+import hashlib
+import logging
+from pathlib import Path
+from typing import Set, Tuple
+from build_manifest import GENERATOR_VERSION, BuildManifest
+from compiler import StaticCopier, replace_with_copy
+from generate_page import BuildError, collect_page_jobs
+
+# Where shard builds put their output and partial manifest, relative to the project root
+SHARDS_DIR = Path(".build") / "shards"
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard given as "i/N", counting shards from 1.
+
+    Raises:
+        ValueError: If spec isn't of that form or i is out of range
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard {spec!r}, expected i/N such as 1/4")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard {spec!r}, i must be between 1 and N")
+    return index, count
+
+def shard_of(relative_source: str, count: int) -> int:
+    """
+    Assign a page to one of count shards by a stable hash of its source path.
+
+    The path is taken relative to content/ in posix form, so every machine
+    assigns every page to the same shard.
+
+    Returns:
+        int: Shard index, from 1 to count
+    """
+    digest = hashlib.sha256(relative_source.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+def shard_dir(project_root: Path, index: int, count: int) -> Path:
+    """
+    Directory holding shard i of N's output (docs/) and manifest.
+    """
+    return Path(project_root) / SHARDS_DIR / f"{index}-of-{count}"
+
+def shard_sources(content_dir: Path, index: int, count: int) -> Set[Path]:
+    """
+    List the markdown sources assigned to a shard.
+    """
+    return {
+        job.source for job in collect_page_jobs(content_dir, content_dir)
+        if shard_of(job.source.relative_to(content_dir).as_posix(), count) == index
+    }
+
+def check_shard(shard: BuildManifest, basepath: str):
+    """
+    Make sure a shard's pages can be merged into a site built with basepath.
+
+    Raises:
+        BuildError: If the shard's build failed, or any of its pages was
+            rendered with another basepath or generator version
+    """
+    name = shard.path.parent.name
+    if not shard.ok:
+        raise BuildError(f"Shard {name} did not build successfully; rebuild it before merging")
+    for key, record in sorted(shard.pages.items()):
+        if record["basepath"] != str(basepath):
+            raise BuildError(f"Shard {name} rendered {key} with basepath {record['basepath']!r}, not {basepath!r}")
+        if record["generator"] != GENERATOR_VERSION:
+            raise BuildError(f"Shard {name} rendered {key} with generator version {record['generator']}, "
+                             f"not {GENERATOR_VERSION}")
+
+def merge_shard(manifest: BuildManifest, shard: BuildManifest, shard_public: Path, public_dir: Path,
+                copier: StaticCopier = None) -> int:
+    """
+    Copy one shard's pages into the public directory and record them.
+
+    Pages already identical in public_dir, e.g. from the previous merge, are
+    not copied again. Check the shard with check_shard first.
+
+    Args:
+        manifest (BuildManifest): Manifest of the merged site
+        shard (BuildManifest): Partial manifest written by the shard's build
+        shard_public (Path): Directory the shard rendered its pages into
+        public_dir (Path): Directory of the merged site
+        copier (StaticCopier): How pages are copied; "auto" if omitted
+
+    Returns:
+        int: Number of pages copied
+    """
+    copied = 0
+    for key, record in sorted(shard.pages.items()):
+        output = shard.root / key
+        dest = public_dir / output.relative_to(shard_public)
+        if manifest.file_hash(dest) != record["output_hash"]:
+            logging.info(f"Merging {key} -> {dest.relative_to(manifest.root)}")
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            replace_with_copy(output, dest, copier)
+            copied += 1
+        manifest.adopt(dest, record, shard.files)
+    return copied
@@ -0,0 +1,118 @@
+import os
+import ctypes
+import logging
+import shutil
+from pathlib import Path
+
+# renameat2() arguments for swapping two paths in one step (Linux 3.15+)
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+def staging_dir(live: Path) -> Path:
+    """
+    Sibling directory a build of live is staged in; the same filesystem, so it can be renamed into place.
+    """
+    return live.with_name(f".{live.name}.staging")
+
+def retired_dir(live: Path) -> Path:
+    """
+    Sibling the previous live tree is moved to when it can't be swapped in one step.
+    """
+    return live.with_name(f".{live.name}.old")
+
+class LivePathFilter(logging.Filter):
+    """
+    Log filter naming the live directory wherever a message names its staging copy.
+
+    A staged build writes into the staging directory, which is gone once
+    it has been swapped in; with this filter on the logger, messages such as
+    "Generating page ... to .docs.staging/index.html" name the docs/ path
+    the file ends up at instead.
+    """
+
+    def __init__(self, staging: Path, live: Path):
+        super().__init__()
+        self.staging = staging.name
+        self.live = live.name
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        message = record.getMessage()
+        if self.staging in message:
+            record.msg, record.args = message.replace(self.staging, self.live), None
+        return True
+
+def stage_directory(live: Path, staging: Path, link: bool = True) -> int:
+    """
+    Start a staging directory for the next build of live.
+
+    Any staging directory left over by an interrupted build is discarded.
+    With link, every file of the live tree is hardlinked into the new one,
+    so unchanged outputs cost a link instead of a copy. The build must then
+    replace files rather than write into them, since a hardlinked file is
+    still shared with the live tree.
+
+    Args:
+        live (Path): Directory currently being served
+        staging (Path): Directory to build into
+        link (bool): Start from the live tree rather than empty
+
+    Returns:
+        int: Number of files linked or, where hardlinks aren't supported, copied
+    """
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir(parents=True)
+    if not link or not live.is_dir():
+        return 0
+
+    count = 0
+    for dirpath, dirnames, filenames in os.walk(live):
+        target = staging / Path(dirpath).relative_to(live)
+        for name in dirnames:
+            (target / name).mkdir()
+        for name in filenames:
+            try:
+                os.link(os.path.join(dirpath, name), target / name)
+            except OSError:
+                # Filesystems without hardlinks get a copy
+                shutil.copy2(os.path.join(dirpath, name), target / name)
+            count += 1
+    return count
+
+def exchange_directories(a: Path, b: Path) -> bool:
+    """
+    Atomically swap two paths with renameat2(RENAME_EXCHANGE).
+
+    Returns:
+        bool: False if the platform or filesystem doesn't support it
+    """
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        renameat2 = libc.renameat2
+    except (OSError, AttributeError):
+        return False
+    return renameat2(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE) == 0
+
+def swap_in(staging: Path, live: Path):
+    """
+    Replace live with the finished staging directory, then delete the old tree.
+
+    Where renameat2 is available the two trees are exchanged in one step;
+    elsewhere live is renamed aside first, leaving it missing for the span
+    of one rename. Either way the old tree is only deleted once the new one
+    is being served.
+    """
+    if not live.exists():
+        os.rename(staging, live)
+        return
+
+    if exchange_directories(staging, live):
+        old = staging
+    else:
+        old = retired_dir(live)
+        if old.exists():
+            shutil.rmtree(old)
+        os.rename(live, old)
+        os.rename(staging, live)
+    logging.debug(f"Swapped in {live.name}, removing the previous build")
+    shutil.rmtree(old)
@@ -0,0 +1,200 @@
+import os
+import re
+from pathlib import Path
+from typing import Dict, NamedTuple, Tuple
+from urls import rebase_html_attributes
+
+# {{ Name }} - a variable filled in per page
+VARIABLE_PATTERN = r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}"
+# {% include "partials/nav.html" %} - a partial inlined at compile time
+INCLUDE_PATTERN = r"\{%\s*include\s+[\"']([^\"']+)[\"']\s*%\}"
+
+TAG_REGEX = re.compile(f"{VARIABLE_PATTERN}|{INCLUDE_PATTERN}")
+
+class CompiledTemplate(NamedTuple):
+    """
+    A template parsed once into alternating literal text and variable slots.
+
+    ``literals`` always has one more entry than ``slots``: rendering emits
+    literals[0], the value of slots[0], literals[1], ... literals[-1].
+    ``deps`` lists the template file and every partial it includes, so a
+    change to any of them can invalidate the pages rendered with it.
+    """
+    literals: Tuple[str, ...]
+    slots: Tuple[str, ...]
+    deps: Tuple[Path, ...]
+
+    def render(self, values: Dict[str, str]) -> str:
+        """
+        Fill the slots with values in a single join.
+
+        Args:
+            values (dict): Variable name to replacement text; missing names render empty
+
+        Returns:
+            str: The rendered document
+        """
+        parts = []
+        self.render_into(parts.append, values)
+        return "".join(parts)
+
+    def render_into(self, write, values: Dict[str, str]):
+        """
+        Stream the rendered document as a sequence of fragments.
+
+        A value may also be an HTMLNode (anything with ``render_into``), which
+        is streamed straight into the slot without first becoming a string.
+
+        Args:
+            write (callable): Receives each fragment in document order
+            values (dict): Variable name to replacement text or node
+        """
+        write(self.literals[0])
+        for slot, literal in zip(self.slots, self.literals[1:]):
+            value = values.get(slot, "")
+            if isinstance(value, str):
+                write(value)
+            else:
+                value.render_into(write)
+            write(literal)
+
+def compile_template(path: Path, basepath: str = "/", _including=()) -> CompiledTemplate:
+    """
+    Read a template and compile it, inlining partials.
+
+    Include paths are resolved relative to the directory of the file that
+    contains the include. Root-relative href and src attributes in the
+    template's own markup are rebased here, once, rather than on every page.
+
+    Args:
+        path (Path): Template file
+        basepath (str): URL prefix the site is served under
+
+    Returns:
+        CompiledTemplate: The compiled template
+
+    Raises:
+        ValueError: If partials include each other in a cycle
+    """
+    path = Path(path).resolve()
+    if path in _including:
+        chain = " -> ".join(str(p) for p in _including + (path,))
+        raise ValueError(f"Template include cycle: {chain}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        text = rebase_html_attributes(f.read(), basepath)
+
+    literals = []
+    slots = []
+    deps = [path]
+    # Literal text gathered since the last slot; partials are merged into it
+    pending = []
+    position = 0
+
+    for match in TAG_REGEX.finditer(text):
+        pending.append(text[position:match.start()])
+        position = match.end()
+
+        variable, include = match.groups()
+        if variable is not None:
+            literals.append("".join(pending))
+            slots.append(variable)
+            pending = []
+            continue
+
+        # Splice the partial's own literals and slots into ours
+        partial = compile_template(path.parent / include, basepath, _including + (path,))
+        pending.append(partial.literals[0])
+        for slot, literal in zip(partial.slots, partial.literals[1:]):
+            literals.append("".join(pending))
+            slots.append(slot)
+            pending = [literal]
+        deps.extend(dep for dep in partial.deps if dep not in deps)
+
+    pending.append(text[position:])
+    literals.append("".join(pending))
+
+    return CompiledTemplate(tuple(literals), tuple(slots), tuple(deps))
+
+def file_stamps(paths) -> tuple:
+    """
+    Return (mtime_ns, size) for each path, or None for one that is missing.
+    """
+    stamps = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            stamps.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamps.append(None)
+    return tuple(stamps)
+
+class TemplateCache:
+    """
+    Compiles each template at most once per build.
+
+    Pages pick a layout by name through their front matter (``layout: post``),
+    which resolves to ``layouts/post.html`` next to the default template.
+    Compiled templates are plain tuples, so a warmed cache can be shipped to
+    worker processes as-is. A cache is bound to one basepath.
+    """
+
+    def __init__(self, default_path: Path, basepath: str = "/"):
+        self.default_path = Path(default_path)
+        self.basepath = str(basepath)
+        self.layouts_dir = self.default_path.parent / "layouts"
+        self._compiled = {}
+        # path -> (mtime_ns, size) of each file it was compiled from
+        self._stamps = {}
+
+    def get(self, path: Path) -> CompiledTemplate:
+        """
+        Return the compiled form of a template file, compiling it on first use.
+        """
+        path = Path(path).resolve()
+        if path not in self._compiled:
+            compiled = compile_template(path, self.basepath)
+            self._compiled[path] = compiled
+            self._stamps[path] = file_stamps(compiled.deps)
+        return self._compiled[path]
+
+    def refresh(self) -> int:
+        """
+        Forget compiled templates whose file or partials changed on disk.
+
+        Lets one cache serve many builds in a long-running process; each
+        check costs a stat() per file.
+
+        Returns:
+            int: Number of templates dropped
+        """
+        stale = [path for path, stamps in self._stamps.items() if file_stamps(self._compiled[path].deps) != stamps]
+        for path in stale:
+            del self._compiled[path]
+            del self._stamps[path]
+        return len(stale)
+
+    def layout(self, name: str = None) -> CompiledTemplate:
+        """
+        Return the compiled layout for a page, or the default template if name is empty.
+
+        Raises:
+            FileNotFoundError: If the named layout does not exist
+        """
+        if not name:
+            return self.get(self.default_path)
+
+        path = self.layouts_dir / f"{name}.html"
+        if not path.is_file():
+            raise FileNotFoundError(f"Layout '{name}' not found at {path}")
+        return self.get(path)
+
+    def preload(self):
+        """
+        Compile the default template and every layout up front.
+        """
+        self.get(self.default_path)
+        if self.layouts_dir.is_dir():
+            for path in sorted(self.layouts_dir.glob("*.html")):
+                self.get(path)
+        return self
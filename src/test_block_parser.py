@@ -1,5 +1,6 @@
 import unittest
-from block_parser import markdown_to_blocks
+from block_parser import Block, markdown_to_blocks, parse_blocks
+from block_to_block import BlockType, block_to_block_type
 
 class TestMarkdownToBlocks(unittest.TestCase):
     def test_single_block(self):
@@ -39,5 +40,97 @@ class TestMarkdownToBlocks(unittest.TestCase):
         self.assertEqual(markdown_to_blocks(""), [])
         self.assertEqual(markdown_to_blocks("\n\n  \n"), [])
 
+    def test_fenced_code_keeps_blank_lines(self):
+        """Test that blank lines inside a fenced code block don't split it"""
+        text = "Intro\n\n```python\ndef a():\n\n    return 1\n```\n\nOutro"
+        blocks = markdown_to_blocks(text)
+        self.assertEqual(blocks, ["Intro", "```python\ndef a():\n\n    return 1\n```", "Outro"])
+
+class TestParseBlocks(unittest.TestCase):
+    def test_blocks_are_classified(self):
+        text = "# Title\n\n> quote\n> more\n\n* a\n- b\n\n1. one\n2. two\n\n```\ncode\n```\n\nplain"
+        self.assertEqual(
+            [block.block_type for block in parse_blocks(text)],
+            [
+                BlockType.HEADING,
+                BlockType.QUOTE,
+                BlockType.UNORDERED_LIST,
+                BlockType.ORDERED_LIST,
+                BlockType.CODE,
+                BlockType.PARAGRAPH,
+            ]
+        )
+
+    def test_matches_block_to_block_type(self):
+        """Test that the fused classifier agrees with block_to_block_type"""
+        cases = [
+            "1. First\n3. Third",
+            "2. Wrong start",
+            "> Mixed\nNon-quote line",
+            "* Mixed\nNon-list line",
+            "#Missing space",
+            "####### Too many",
+            "  ## Indented heading  ",
+            "1.Missing space",
+            "#\nHeading text on the next line",
+            "##\nHeading",
+            "```one line```",
+            "```one line```\nand more",
+            "# ",
+            "#\t\nHeading",
+            "```\ncode```",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                [block] = parse_blocks(text)
+                self.assertEqual(block.block_type.value, block_to_block_type(text.strip()))
+
+    def test_lines_are_stripped_at_block_edges(self):
+        self.assertEqual(
+            parse_blocks("  * a  \n  * b  "),
+            [Block(BlockType.UNORDERED_LIST, ["* a  ", "  * b"])]
+        )
+
+    def test_code_closes_before_following_text(self):
+        blocks = parse_blocks("```\nx\n```\nafter")
+        self.assertEqual(blocks[0], Block(BlockType.CODE, ["```", "x", "```"]))
+        self.assertEqual(blocks[1], Block(BlockType.PARAGRAPH, ["after"]))
+
+    def test_unclosed_fence_is_plain_text(self):
+        blocks = parse_blocks("```\nUnclosed code block\n\nNext")
+        self.assertEqual(
+            blocks,
+            [
+                Block(BlockType.PARAGRAPH, ["```", "Unclosed code block"]),
+                Block(BlockType.PARAGRAPH, ["Next"]),
+            ]
+        )
+
+    def test_bare_heading_marks_take_the_next_line(self):
+        self.assertEqual(parse_blocks("#\nTitle"), [Block(BlockType.HEADING, ["#", "Title"])])
+        self.assertEqual(parse_blocks("#"), [Block(BlockType.PARAGRAPH, ["#"])])
+        self.assertEqual(parse_blocks("# "), [Block(BlockType.PARAGRAPH, ["#"])])
+
+    def test_fence_closes_only_on_a_fence_line(self):
+        blocks = parse_blocks("```sh\necho ```\n\nls\n  ```  \nafter")
+        self.assertEqual(
+            blocks,
+            [
+                Block(BlockType.CODE, ["```sh", "echo ```", "", "ls", "```"]),
+                Block(BlockType.PARAGRAPH, ["after"]),
+            ]
+        )
+
+    def test_one_line_code_does_not_open_a_fence(self):
+        blocks = parse_blocks("```one```\n\nText\n\n```\ncode\n```")
+        self.assertEqual(
+            blocks,
+            [
+                Block(BlockType.CODE, ["```one```"]),
+                Block(BlockType.PARAGRAPH, ["Text"]),
+                Block(BlockType.CODE, ["```", "code", "```"]),
+            ]
+        )
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+from pathlib import Path
+from build_manifest import BuildManifest, hash_file, replace_if_changed, write_if_changed
+from generate_page import generate_pages_recursive
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.public = self.root / "docs"
+        self.template = self.root / "template.html"
+        self.manifest_path = self.root / ".build" / "manifest.json"
+
+        (self.content / "blog").mkdir(parents=True)
+        (self.content / "index.md").write_text("# Home\n\nWelcome")
+        (self.content / "blog" / "index.md").write_text("# Blog\n\nPosts")
+        self.template.write_text(TEMPLATE)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, basepath="/"):
+        """Run one incremental build and return the pages that were rendered"""
+        manifest = BuildManifest.load(self.manifest_path, self.root)
+        # Every page is either generated or, at DEBUG, skipped, so there is always a record
+        with self.assertLogs(level="DEBUG") as logs:
+            generate_pages_recursive(self.content, self.template, self.public, basepath, manifest)
+            manifest.prune()
+            manifest.save()
+        return [line for line in logs.output if "Generating page" in line]
+
+    def test_first_build_renders_everything(self):
+        self.assertEqual(len(self.build()), 2)
+        self.assertTrue(self.manifest_path.exists())
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+    def test_edited_page_is_rebuilt(self):
+        self.build()
+        (self.content / "index.md").write_text("# Home\n\nEdited")
+        rendered = self.build()
+        self.assertEqual(len(rendered), 1)
+        self.assertIn("index.md", rendered[0])
+        self.assertIn("Edited", (self.public / "index.html").read_text())
+
+    def test_template_change_invalidates_every_page(self):
+        self.build()
+        self.template.write_text("<main>" + TEMPLATE + "</main>")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_basepath_change_invalidates_every_page(self):
+        self.build()
+        self.assertEqual(len(self.build("/site/")), 2)
+
+    def test_modified_output_is_rebuilt(self):
+        self.build()
+        (self.public / "index.html").write_text("tampered")
+        self.assertEqual(len(self.build()), 1)
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        (self.content / "blog" / "index.md").unlink()
+        self.build()
+        self.assertFalse((self.public / "blog" / "index.html").exists())
+
+    def test_layout_and_partial_changes_invalidate_their_pages(self):
+        (self.root / "layouts").mkdir()
+        (self.root / "partials").mkdir()
+        (self.root / "partials" / "nav.html").write_text("<nav></nav>")
+        (self.root / "layouts" / "post.html").write_text('{% include "../partials/nav.html" %}{{ Content }} by {{ author }}')
+        (self.content / "blog" / "index.md").write_text("---\nlayout: post\nauthor: Tom\n---\n# Blog\n\nPosts")
+        self.build()
+        self.assertIn("</p></div> by Tom", (self.public / "blog" / "index.html").read_text())
+
+        (self.root / "partials" / "nav.html").write_text("<nav>new</nav>")
+        rendered = self.build()
+        self.assertEqual(len(rendered), 1)
+        self.assertIn("blog", rendered[0])
+
+    def test_recorded_output_hash_matches_disk(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path, self.root)
+        record = manifest.pages["docs/index.html"]
+        self.assertEqual(record["output_hash"], hash_file(self.public / "index.html"))
+        self.assertEqual(sorted(record["deps"]), ["content/index.md", "template.html"])
+
+class TestWriteIfChanged(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "page.html"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_identical_bytes_are_not_rewritten(self):
+        self.assertTrue(write_if_changed(self.path, b"<p>one</p>"))
+        mtime = self.path.stat().st_mtime_ns
+        self.assertFalse(write_if_changed(self.path, b"<p>one</p>"))
+        self.assertEqual(self.path.stat().st_mtime_ns, mtime)
+        self.assertTrue(write_if_changed(self.path, b"<p>two</p>"))
+        self.assertEqual(self.path.read_bytes(), b"<p>two</p>")
+
+    def test_replace_if_changed(self):
+        tmp_path = self.path.with_name("page.html.tmp")
+        for data, replaced in [(b"one", True), (b"one", False), (b"two", True)]:
+            tmp_path.write_bytes(data)
+            self.assertEqual(replace_if_changed(tmp_path, self.path, hash_file(tmp_path)), replaced)
+            self.assertFalse(tmp_path.exists())
+            self.assertEqual(self.path.read_bytes(), data)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from builder import SiteBuilder, plan_rebuild
+from generate_page import BuildError
+
+class TestSiteBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "static").mkdir()
+        (self.root / "static" / "style.css").write_text("body {}")
+        (self.root / "template.html").write_text('<title>{{ Title }}</title>{% include "nav.html" %}{{ Content }}')
+        (self.root / "nav.html").write_text("<nav>v1</nav>")
+        (self.root / "layouts").mkdir()
+        (self.root / "layouts" / "post.html").write_text("<h1>{{ Title }}</h1>{{ Content }}")
+        for name, text in [("index", "# Home"), ("blog/a", "---\nlayout: post\n---\n# A")]:
+            page = self.root / "content" / f"{name}.md"
+            page.parent.mkdir(parents=True, exist_ok=True)
+            page.write_text(text)
+
+        self.builder = SiteBuilder(self.root, fragment_cache_bytes=0)
+        with self.assertLogs(level="INFO"):
+            self.builder.build()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_plan_follows_dependencies(self):
+        manifest = self.builder.manifest
+        content, static = self.root / "content", self.root / "static"
+
+        plan = plan_rebuild([self.root / "nav.html"], manifest, content, static)
+        self.assertEqual(plan.sources, {self.root / "content" / "index.md"})
+        self.assertFalse(plan.full)
+
+        plan = plan_rebuild([self.root / "layouts" / "post.html", static / "style.css"], manifest, content, static)
+        self.assertEqual(plan.sources, {self.root / "content" / "blog" / "a.md"})
+        self.assertTrue(plan.static)
+
+        plan = plan_rebuild([self.root / "layouts" / "new.html"], manifest, content, static)
+        self.assertTrue(plan.full)
+
+    def test_rebuild_only_touches_affected_pages(self):
+        index = self.root / "docs" / "index.html"
+        post = self.root / "docs" / "blog" / "a.html"
+        post_mtime = post.stat().st_mtime_ns
+
+        (self.root / "nav.html").write_text("<nav>v2</nav>")
+        with self.assertLogs(level="INFO") as logs:
+            self.builder.rebuild([self.root / "nav.html"])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("<nav>v2</nav>", index.read_text())
+        self.assertEqual(post.stat().st_mtime_ns, post_mtime)
+
+    def test_rebuild_removes_deleted_sources(self):
+        source = self.root / "content" / "blog" / "a.md"
+        source.unlink()
+        with self.assertLogs(level="INFO"):
+            self.builder.rebuild([source])
+        self.assertFalse((self.root / "docs" / "blog" / "a.html").exists())
+        self.assertNotIn("docs/blog/a.html", self.builder.manifest.pages)
+        self.assertTrue((self.root / "docs" / "index.html").exists())
+
+    def test_change_manifest(self):
+        def changes():
+            return json.loads((self.root / ".build" / "changes.json").read_text())
+
+        # The first build added everything
+        self.assertIn("index.html", changes()["added"])
+        self.assertIn("style.css", changes()["added"])
+
+        # A clean rebuild rewrites every file but changes no bytes
+        with self.assertLogs(level="INFO"):
+            self.builder.build(clean=True)
+        self.assertEqual(changes(), {"format": 1, "public_dir": "docs", "added": {}, "changed": {}, "removed": []})
+
+        (self.root / "content" / "blog" / "a.md").unlink()
+        (self.root / "nav.html").write_text("<nav>v2</nav>")
+        with self.assertLogs(level="INFO"):
+            self.builder.build()
+        self.assertEqual(list(changes()["changed"]), ["index.html"])
+        self.assertEqual(changes()["removed"], ["blog/a.html"])
+
+    def test_failed_build_keeps_changes_for_the_next(self):
+        (self.root / "content" / "index.md").write_text("# Home v2")
+        (self.root / "content" / "blog" / "a.md").write_text("no title")
+        with self.assertLogs(level="INFO"):
+            with self.assertRaises(BuildError):
+                self.builder.build()
+
+        (self.root / "content" / "blog" / "a.md").write_text("---\nlayout: post\n---\n# A v2")
+        with self.assertLogs(level="INFO"):
+            self.builder.build()
+        changed = json.loads((self.root / ".build" / "changes.json").read_text())["changed"]
+        self.assertEqual(sorted(changed), ["blog/a.html", "index.html"])
+
+    def test_atomic_build_swaps_in_a_staged_tree(self):
+        builder = SiteBuilder(self.root, fragment_cache_bytes=0, atomic=True)
+        index, post = self.root / "docs" / "index.html", self.root / "docs" / "blog" / "a.html"
+        post_inode = post.stat().st_ino
+
+        (self.root / "content" / "index.md").write_text("# Home v2")
+        with self.assertLogs(level="DEBUG") as logs:
+            builder.build()
+        self.assertIn("Home v2", index.read_text())
+        # Logs name the paths in docs/, not the staging directory that is gone now
+        generated = [line for line in logs.output if "Generating page" in line]
+        self.assertEqual(len(generated), 1)
+        self.assertIn(str(index), generated[0])
+        self.assertFalse(any(".docs.staging/" in line for line in logs.output))
+        # The unchanged page was carried over as a link, not rewritten
+        self.assertEqual(post.stat().st_ino, post_inode)
+        self.assertFalse((self.root / ".docs.staging").exists())
+        self.assertIn("docs/index.html", builder.manifest.pages)
+
+        # A failed build, even a clean one, leaves the live tree alone
+        (self.root / "content" / "index.md").write_text("# Home v3")
+        (self.root / "content" / "blog" / "a.md").write_text("no title")
+        with self.assertLogs(level="INFO"):
+            with self.assertRaises(BuildError):
+                builder.build(clean=True)
+        self.assertIn("Home v2", index.read_text())
+        self.assertTrue(post.exists())
+        self.assertFalse((self.root / ".docs.staging").exists())
+
+        # ...and the next build catches up with everything
+        (self.root / "content" / "blog" / "a.md").write_text("# A v3")
+        with self.assertLogs(level="INFO"):
+            builder.build()
+        self.assertIn("Home v3", index.read_text())
+        self.assertIn("A v3", post.read_text())
+        self.assertTrue((self.root / "docs" / "style.css").exists())
+
+    def test_watched_paths_include_partials(self):
+        paths = self.builder.watched_paths()
+        self.assertIn(self.root / "nav.html", paths)
+        self.assertIn(self.root / "content", paths)
+        self.assertNotIn(self.root / "content" / "index.md", paths)
+
+if __name__ == "__main__":
+    unittest.main()
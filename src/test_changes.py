@@ -0,0 +1,24 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from changes import OutputChanges, diff_outputs, write_changes
+
+class TestChanges(unittest.TestCase):
+    def test_diff_outputs(self):
+        previous = {"docs/a.html": "1", "docs/b.html": "2", "docs/c.css": "3"}
+        current = {"docs/a.html": "1", "docs/b.html": "22", "docs/d.png": "4"}
+        changes = diff_outputs(previous, current)
+        self.assertEqual(changes, OutputChanges({"docs/d.png": "4"}, {"docs/b.html": "22"}, ["docs/c.css"]))
+        self.assertTrue(diff_outputs(current, current).is_empty())
+
+    def test_paths_are_relative_to_public_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "changes.json"
+            write_changes(path, OutputChanges({"docs/blog/a.html": "1"}, {}, ["docs/old.html"]), "docs")
+            data = json.loads(path.read_text())
+        self.assertEqual(data["added"], {"blog/a.html": "1"})
+        self.assertEqual(data["removed"], ["old.html"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import errno
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+import compiler
+import build_manifest
+from build_manifest import BuildManifest
+from compiler import COPY_STRATEGIES, StaticCopier, copy_static_recursive, needs_copy, remove_stale_static
+
+class TestStaticSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.static = self.root / "static"
+        self.public = self.root / "docs"
+        (self.static / "images").mkdir(parents=True)
+        (self.static / "index.css").write_text("body {}")
+        (self.static / "images" / "logo.png").write_bytes(b"\x89PNG")
+        (self.static / ".hidden").write_text("secret")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def sync(self, use_hash=False):
+        """Sync static into public and return the logged copies"""
+        synced = set()
+        with self.assertLogs(level="DEBUG") as logs:
+            copy_static_recursive(self.static, self.public, self.root, synced, use_hash)
+        copies = [line for line in logs.output if "Copying" in line]
+        return copies, synced
+
+    def test_first_sync_copies_everything(self):
+        copies, synced = self.sync()
+        self.assertEqual(len(copies), 2)
+        self.assertEqual(synced, {self.public / "index.css", self.public / "images" / "logo.png"})
+        self.assertFalse((self.public / ".hidden").exists())
+
+    def test_noop_sync_copies_nothing(self):
+        self.sync()
+        copies, _ = self.sync()
+        self.assertEqual(copies, [])
+
+    def test_changed_file_is_recopied(self):
+        self.sync()
+        (self.static / "index.css").write_text("body { color: red }")
+        copies, _ = self.sync()
+        self.assertEqual(len(copies), 1)
+        self.assertEqual((self.public / "index.css").read_text(), "body { color: red }")
+
+    def test_generated_files_are_left_alone(self):
+        self.sync()
+        (self.public / "index.html").write_text("<p>page</p>")
+        self.sync()
+        self.assertTrue((self.public / "index.html").exists())
+
+    def test_hash_mode_ignores_touched_files(self):
+        self.sync()
+        css = self.static / "index.css"
+        os.utime(css, ns=(0, 0))
+        self.assertTrue(needs_copy(css, self.public / "index.css"))
+        self.assertFalse(needs_copy(css, self.public / "index.css", use_hash=True))
+
+    def test_hash_mode_catches_same_size_edits(self):
+        self.sync()
+        css = self.static / "index.css"
+        stat = css.stat()
+        css.write_text("body []")
+        os.utime(css, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertFalse(needs_copy(css, self.public / "index.css"))
+        self.assertTrue(needs_copy(css, self.public / "index.css", use_hash=True))
+
+    def test_hash_mode_reuses_manifest_hashes(self):
+        manifest = BuildManifest(self.root / ".build" / "manifest.json", self.root)
+        with self.assertLogs(level="INFO"):
+            copy_static_recursive(self.static, self.public, self.root, use_hash=True, manifest=manifest)
+
+        # Only sources are hashed on the first sync; the copies take their hashes
+        manifest.begin_build()
+        with mock.patch("build_manifest.hash_file", wraps=build_manifest.hash_file) as hashed:
+            with self.assertNoLogs(level="INFO"):
+                copy_static_recursive(self.static, self.public, self.root, use_hash=True, manifest=manifest)
+        hashed.assert_not_called()
+
+        (self.static / "index.css").write_text("body { color: red }")
+        manifest.begin_build()
+        with self.assertLogs(level="INFO") as logs:
+            copy_static_recursive(self.static, self.public, self.root, use_hash=True, manifest=manifest)
+        self.assertEqual(len([line for line in logs.output if "Copying" in line]), 1)
+        self.assertEqual(manifest.file_hash(self.public / "index.css"), manifest.file_hash(self.static / "index.css"))
+
+    def test_remove_stale_static(self):
+        self.sync()
+        (self.public / "index.html").write_text("<p>page</p>")
+        remove_stale_static(
+            ["docs/index.css", "docs/images/logo.png"],
+            ["docs/index.css"],
+            self.public,
+            self.root,
+        )
+        self.assertFalse((self.public / "images").exists())
+        self.assertTrue((self.public / "index.css").exists())
+        self.assertTrue((self.public / "index.html").exists())
+
+class TestStaticCopier(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.src = self.root / "logo.png"
+        self.src.write_bytes(os.urandom(200_000))
+        os.utime(self.src, ns=(1_000_000_000, 1_000_000_000))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_every_strategy_copies_content_and_mtime(self):
+        for strategy in COPY_STRATEGIES:
+            with self.subTest(strategy=strategy):
+                dest = self.root / f"{strategy}.png"
+                dest.write_bytes(b"previous")
+                StaticCopier(strategy).copy(self.src, dest)
+                self.assertEqual(dest.read_bytes(), self.src.read_bytes())
+                self.assertFalse(needs_copy(self.src, dest))
+                self.assertFalse(dest.with_name(dest.name + ".tmp").exists())
+
+    def test_hardlink_replaces_instead_of_writing_through(self):
+        dest = self.root / "out.png"
+        StaticCopier("hardlink").copy(self.src, dest)
+        self.assertTrue(os.path.samefile(self.src, dest))
+
+        # Recopying over a linked output must not touch the file it is linked to
+        other = self.root / "other.png"
+        other.write_bytes(b"other")
+        StaticCopier("copy").copy(other, dest)
+        self.assertEqual(dest.read_bytes(), b"other")
+        self.assertEqual(len(self.src.read_bytes()), 200_000)
+
+    def test_unsupported_strategy_falls_back_once(self):
+        failing = mock.Mock(side_effect=OSError(errno.EXDEV, "Invalid cross-device link"))
+        copier = StaticCopier("hardlink")
+        with mock.patch.dict(compiler._COPY_FUNCTIONS, {"hardlink": failing, "reflink": failing}):
+            self.assertEqual(copier.copy(self.src, self.root / "a.png"), "copy_file_range")
+            copier.copy(self.src, self.root / "b.png")
+        self.assertEqual(failing.call_count, 2)
+        self.assertEqual((self.root / "b.png").read_bytes(), self.src.read_bytes())
+
+    def test_other_errors_are_raised_without_dropping_the_strategy(self):
+        failing = mock.Mock(side_effect=OSError(errno.EACCES, "Permission denied"))
+        copier = StaticCopier("reflink")
+        with mock.patch.dict(compiler._COPY_FUNCTIONS, {"reflink": failing}):
+            with self.assertRaises(PermissionError):
+                copier.copy(self.src, self.root / "a.png")
+        self.assertFalse((self.root / "a.png.tmp").exists())
+        # The next file still tries the strategy
+        working = mock.Mock(side_effect=compiler._copy)
+        with mock.patch.dict(compiler._COPY_FUNCTIONS, {"reflink": working}):
+            self.assertEqual(copier.copy(self.src, self.root / "b.png"), "reflink")
+
+    def test_last_strategy_failure_is_raised(self):
+        with self.assertRaises(FileNotFoundError):
+            StaticCopier("copy").copy(self.root / "missing.png", self.root / "out.png")
+        with self.assertRaises(ValueError):
+            StaticCopier("teleport")
+
+if __name__ == "__main__":
+    unittest.main()
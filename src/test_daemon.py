@@ -0,0 +1,79 @@
+import unittest
+import tempfile
+import threading
+from pathlib import Path
+from builder import SiteBuilder
+from client import request
+from daemon import BuildDaemon, serve_daemon
+
+class TestBuildDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "static").mkdir()
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+        for name, text in [("index", "# Home\n\n[About](/about.html)"), ("about", "# About")]:
+            (self.root / "content").mkdir(exist_ok=True)
+            (self.root / "content" / f"{name}.md").write_text(text)
+        self.daemon = BuildDaemon(SiteBuilder(self.root, fragment_cache_bytes=0))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_build_reports_log(self):
+        with self.assertLogs(level="INFO"):
+            response = self.daemon.handle({"command": "build"})
+        self.assertTrue(response["ok"])
+        self.assertTrue(any("index.md" in line for line in response["log"]))
+        self.assertTrue((self.root / "docs" / "about.html").exists())
+
+        # Nothing changed, so nothing is regenerated
+        with self.assertLogs(level="INFO"):
+            response = self.daemon.handle({"command": "build"})
+        self.assertFalse(any("Generating" in line for line in response["log"]))
+
+    def test_changed_paths_rebuild_only_those_pages(self):
+        self.daemon.handle({"command": "build"})
+        source = self.root / "content" / "about.md"
+        source.write_text("# About us")
+        with self.assertLogs(level="INFO"):
+            response = self.daemon.handle({"command": "build", "paths": [str(source)]})
+        self.assertTrue(response["ok"])
+        generated = [line for line in response["log"] if "Generating" in line]
+        self.assertEqual(len(generated), 1)
+        self.assertIn("About us", (self.root / "docs" / "about.html").read_text())
+
+    def test_basepath_switch_rebuilds_everything(self):
+        self.daemon.handle({"command": "build"})
+        page = self.root / "content" / "about.md"
+        response = self.daemon.handle({"command": "build", "basepath": "/site/", "paths": [str(page)]})
+        self.assertTrue(response["ok"])
+        self.assertIn('href="/site/about.html"', (self.root / "docs" / "index.html").read_text())
+
+    def test_failure_is_reported(self):
+        (self.root / "content" / "about.md").write_text("no heading")
+        response = self.daemon.handle({"command": "build"})
+        self.assertFalse(response["ok"])
+        self.assertIn("about.md", response["error"])
+
+    def test_unknown_command(self):
+        self.assertFalse(self.daemon.handle({"command": "dance"})["ok"])
+
+    def test_socket_round_trip(self):
+        socket_path = self.root / ".build" / "daemon.sock"
+        thread = threading.Thread(target=serve_daemon, args=(self.daemon, socket_path), daemon=True)
+        with self.assertLogs(level="INFO"):
+            thread.start()
+            for _ in range(100):
+                if socket_path.exists():
+                    break
+                thread.join(0.01)
+
+            self.assertTrue(request(socket_path, {"command": "build"}, timeout=10)["ok"])
+            self.assertTrue(request(socket_path, {"command": "stop"}, timeout=10)["ok"])
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertFalse(socket_path.exists())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import tempfile
+from pathlib import Path
+from devserver import DevSite, etag_matches
+
+class TestDevSite(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "static" / "images").mkdir(parents=True)
+        (self.root / "static" / "index.css").write_text("body {}")
+        (self.root / "template.html").write_text('<title>{{ Title }}</title><a href="/">home</a>{{ Content }}')
+        (self.root / "content" / "blog").mkdir(parents=True)
+        (self.root / "content" / "index.md").write_text("# Home")
+        (self.root / "content" / "blog" / "index.md").write_text("# Blog")
+        (self.root / "content" / "about.md").write_text("# About")
+        self.site = DevSite(self.root, "/site/")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pages_render_in_memory(self):
+        with self.assertLogs(level="INFO"):
+            response = self.site.get("/site/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, b'<title>Home</title><a href="/site/">home</a><div><h1 id="home">Home</h1></div>')
+        with self.assertLogs(level="INFO"):
+            self.assertIn(b"About", self.site.get("/site/about.html").body)
+        self.assertFalse((self.root / "docs").exists())
+
+    def test_pages_are_cached_until_a_dependency_changes(self):
+        with self.assertLogs(level="INFO"):
+            first = self.site.get("/site/blog/")
+        # Served from memory: no render, no log
+        self.assertEqual(self.site.get("/site/blog/").etag, first.etag)
+
+        (self.root / "template.html").write_text("<h6>{{ Title }}</h6>{{ Content }}")
+        self.site.invalidate([self.root / "template.html"])
+        with self.assertLogs(level="INFO"):
+            second = self.site.get("/site/blog/")
+        self.assertNotEqual(second.etag, first.etag)
+        self.assertTrue(second.body.startswith(b"<h6>Blog</h6>"))
+
+    def test_static_redirects_and_missing(self):
+        response = self.site.get("/site/index.css")
+        self.assertEqual((response.status, response.content_type), (200, "text/css"))
+        self.assertEqual(response.file, (self.root / "static" / "index.css").resolve())
+
+        self.assertEqual(self.site.get("/site/blog").location, "/site/blog/")
+        self.assertEqual(self.site.get("/site").location, "/site/")
+        self.assertEqual(self.site.get("/site/nope.html").status, 404)
+        self.assertEqual(self.site.get("/elsewhere/").status, 404)
+        self.assertEqual(self.site.get("/site/../template.html").status, 404)
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"a", "b"', '"b"'))
+        self.assertTrue(etag_matches('W/"b"', '"b"'))
+        self.assertTrue(etag_matches('*', '"b"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+        self.assertFalse(etag_matches(None, '"b"'))
+
+if __name__ == "__main__":
+    unittest.main()
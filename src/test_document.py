@@ -0,0 +1,58 @@
+import unittest
+import tempfile
+from pathlib import Path
+from document import slugify, unique_anchor
+from fragment_cache import FragmentCache
+from markdown_to_html import StreamedMarkdown, markdown_to_document
+
+class TestDocument(unittest.TestCase):
+    def test_slugify(self):
+        self.assertEqual(slugify("Hello, World!"), "hello-world")
+        self.assertEqual(slugify("  Tolkien's   *Legacy* - part 2 "), "tolkiens-legacy-part-2")
+        self.assertEqual(slugify("!!!"), "section")
+
+    def test_unique_anchor(self):
+        seen = {}
+        self.assertEqual([unique_anchor("Notes", seen) for _ in range(3)], ["notes", "notes-1", "notes-2"])
+
+    def test_single_parse_metadata(self):
+        markdown = (
+            "---\nlayout: post\n---\n"
+            "## Before\n\n# The **Title**\n\nText\n\n### Notes\n\n```\n# not a heading\n```\n\n## Notes"
+        )
+        document = markdown_to_document(markdown, "/site/")
+
+        self.assertEqual(document.front_matter, {"layout": "post"})
+        self.assertEqual(document.title, "The **Title**")
+        self.assertEqual(
+            [(heading.level, heading.text, heading.anchor) for heading in document.headings],
+            [(2, "Before", "before"), (1, "The Title", "the-title"), (3, "Notes", "notes"), (2, "Notes", "notes-1")],
+        )
+        self.assertEqual([heading.text for heading in document.toc(2)], ["Before", "The Title", "Notes"])
+        self.assertEqual(
+            document.root.to_html(),
+            '<div><h2 id="before">Before</h2><h1 id="the-title">The <b>Title</b></h1><p>Text</p>'
+            '<h3 id="notes">Notes</h3><pre><code># not a heading</code></pre><h2 id="notes-1">Notes</h2></div>',
+        )
+
+    def test_headings_carry_their_anchor(self):
+        markdown = "# Hello World\n\nText\n\n## Hello World"
+        expected = '<div><h1 id="hello-world">Hello World</h1><p>Text</p><h2 id="hello-world-1">Hello World</h2></div>'
+        self.assertEqual(markdown_to_document(markdown).root.to_html(), expected)
+
+        # Streamed pages and pages rendered through the fragment cache agree
+        parts = []
+        StreamedMarkdown(iter(markdown.split("\n"))).render_into(parts.append)
+        self.assertEqual("".join(parts), expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            fragments = FragmentCache(Path(tmp) / "fragments.sqlite")
+            for _ in range(2):
+                self.assertEqual(markdown_to_document(markdown, fragments=fragments).root.to_html(), expected)
+            fragments.close()
+
+    def test_missing_title(self):
+        with self.assertRaises(ValueError):
+            markdown_to_document("## Only a subheading").title
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import pickle
+import unittest
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import generate_page
+from block_parser import Block
+from block_to_block import BlockType
+from fragment_cache import FragmentCache, fragment_key
+from markdown_to_html import markdown_to_html_node
+
+# Per worker process, the connection its cache held when the worker started
+_inherited = {}
+
+def _forked_worker_state(_):
+    """Run in a pool worker: use the inherited cache and report what it used"""
+    cache = generate_page._worker_fragments
+    inherited = _inherited.setdefault(os.getpid(), cache._connection)
+    found = cache.get_many(["parent"])
+    cache.put("child", "<p>child</p>")
+    cache.flush()
+    return inherited is not None and cache._connection is not inherited, found
+
+MARKDOWN = "# Title\n\nSome **bold** [link](/x)\n\n```\ncode\n```\n\nSome **bold** [link](/x)"
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "fragments.sqlite"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_key_depends_on_text_type_and_basepath(self):
+        block = Block(BlockType.PARAGRAPH, ["text"])
+        self.assertEqual(fragment_key(block, "/"), fragment_key(Block(BlockType.PARAGRAPH, ["text"]), "/"))
+        self.assertNotEqual(fragment_key(block, "/"), fragment_key(block, "/site/"))
+        self.assertNotEqual(fragment_key(block, "/"), fragment_key(Block(BlockType.HEADING, ["text"]), "/"))
+        self.assertNotEqual(fragment_key(block, "/"), fragment_key(Block(BlockType.PARAGRAPH, ["te", "xt"]), "/"))
+
+    def test_persists_across_instances(self):
+        cache = FragmentCache(self.path)
+        cache.put("k", "<p>hi</p>")
+        cache.close()
+
+        reopened = FragmentCache(self.path)
+        self.assertEqual(reopened.get_many(["k", "missing"]), {"k": "<p>hi</p>"})
+        self.assertEqual((reopened.hits, reopened.misses), (1, 1))
+        reopened.close()
+
+    def test_cached_output_matches_uncached(self):
+        expected = markdown_to_html_node(MARKDOWN, "/site/").to_html()
+
+        cache = FragmentCache(self.path)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/site/", cache).to_html(), expected)
+        # The repeated paragraph is rendered once
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        cache.close()
+
+        cache = FragmentCache(self.path)
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/site/", cache).to_html(), expected)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        cache.close()
+
+    def test_evicts_least_recently_used(self):
+        cache = FragmentCache(self.path, max_bytes=10)
+        cache.put("old", "aaaa")
+        cache.flush()
+        cache.put("new", "bbbb")
+        cache.flush()
+        # Touch "old" so "new" becomes the least recently used
+        cache.get_many(["old"])
+        cache.flush()
+        cache.put("newest", "cccc")
+
+        self.assertEqual(cache.evict(), 1)
+        self.assertEqual(set(cache.get_many(["old", "new", "newest"])), {"old", "newest"})
+        cache.close()
+
+    def test_pickles_without_connection(self):
+        cache = FragmentCache(self.path, max_bytes=123)
+        cache.put("k", "v")
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((copy.path, copy.max_bytes), (self.path, 123))
+        self.assertEqual(copy.get_many(["k"]), {})
+        cache.close()
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "needs fork()")
+    def test_forked_workers_open_their_own_connection(self):
+        cache = FragmentCache(self.path)
+        # As --clean does: the parent connects before the pool forks
+        cache.clear()
+        cache.put("parent", "<p>parent</p>")
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("fork"),
+                                 initializer=generate_page._init_worker, initargs=(None, False, cache)) as pool:
+            results = list(pool.map(_forked_worker_state, range(4)))
+        # Each worker reconnected and never saw the parent's unflushed fragment
+        self.assertEqual(results, [(True, {})] * 4)
+        self.assertEqual(cache.get_many(["parent", "child"]), {"parent": "<p>parent</p>", "child": "<p>child</p>"})
+        cache.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from front_matter import is_front_matter_fence, read_front_matter, split_front_matter
+
+class TestSplitFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        text = "# Title\n\nBody"
+        self.assertEqual(split_front_matter(text), ({}, text))
+
+    def test_front_matter(self):
+        text = "---\nlayout: post\nauthor: \"J. R. R. Tolkien\"\n---\n# Title"
+        values, body = split_front_matter(text)
+        self.assertEqual(values, {"layout": "post", "author": "J. R. R. Tolkien"})
+        self.assertEqual(body, "# Title")
+
+    def test_value_with_colon(self):
+        values, _ = split_front_matter("---\ndate: 2024-01-01T10:00\n---\n")
+        self.assertEqual(values, {"date": "2024-01-01T10:00"})
+
+    def test_blank_lines_and_comments(self):
+        values, _ = split_front_matter("---\n# a comment\n\nlayout: post\n---\n")
+        self.assertEqual(values, {"layout": "post"})
+
+    def test_unclosed_front_matter_is_body(self):
+        text = "---\nlayout: post\n# Title"
+        self.assertEqual(split_front_matter(text), ({}, text))
+
+    def test_malformed_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\njust text\n---\n")
+
+class TestFrontMatterFence(unittest.TestCase):
+    def test_fence(self):
+        self.assertTrue(is_front_matter_fence("---"))
+        self.assertTrue(is_front_matter_fence("---  "))
+        for line in ["----", "--- x", " ---", "--"]:
+            with self.subTest(line=line):
+                self.assertFalse(is_front_matter_fence(line))
+
+    def test_both_readers_agree(self):
+        cases = [
+            "---\nlayout: post\n---\n# Title",
+            "---  \nlayout: post\n---\n# Title",
+            "----\nlayout: post\n----\n# Title",
+            "--- x\nlayout: post\n---\n# Title",
+            " ---\nlayout: post\n---\n# Title",
+            "---\nlayout: post\n --- \n# Title",
+        ]
+        for text in cases:
+            with self.subTest(text=text):
+                values, rest = read_front_matter(iter(text.split("\n")))
+                self.assertEqual(split_front_matter(text), (values, "\n".join(rest)))
+
+class TestReadFrontMatter(unittest.TestCase):
+    def test_leaves_body_unread(self):
+        lines = iter(["---", "layout: post", "---", "# Title", "Body"])
+        values, rest = read_front_matter(lines)
+        self.assertEqual(values, {"layout": "post"})
+        self.assertEqual(next(rest), "# Title")
+        self.assertEqual(next(lines), "Body")
+
+    def test_unclosed_front_matter_keeps_every_line(self):
+        values, rest = read_front_matter(iter(["---", "Some text", "", "# Title"]))
+        self.assertEqual(values, {})
+        self.assertEqual(list(rest), ["---", "Some text", "", "# Title"])
+
+    def test_no_front_matter_keeps_first_line(self):
+        values, rest = read_front_matter(iter(["# Title", "Body"]))
+        self.assertEqual(values, {})
+        self.assertEqual(list(rest), ["# Title", "Body"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import tempfile
+from pathlib import Path
+from generate_page import (
+    BuildError,
+    PageJob,
+    collect_page_jobs,
+    generate_page,
+    generate_pages_recursive,
+    render_pages_pipelined,
+)
+
+TEMPLATE = "<title>{{ Title }}</title><article>{{ Content }}</article>"
+
+class TestGeneratePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.content = self.root / "content"
+        self.public = self.root / "docs"
+        self.template = self.root / "template.html"
+        self.template.write_text(TEMPLATE)
+
+        for name in ["b", "a", "c/d", "c/e"]:
+            page = self.content / name / "index.md"
+            page.parent.mkdir(parents=True, exist_ok=True)
+            page.write_text(f"# Page {name}\n\nSome **text**")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_collect_page_jobs_is_sorted(self):
+        jobs = collect_page_jobs(self.content, self.public)
+        self.assertEqual(
+            [job.source.relative_to(self.content).as_posix() for job in jobs],
+            ["a/index.md", "b/index.md", "c/d/index.md", "c/e/index.md"],
+        )
+        self.assertEqual(jobs[2], PageJob(self.content / "c/d/index.md", self.public / "c/d/index.html"))
+
+    def test_parallel_matches_serial(self):
+        generate_pages_recursive(self.content, self.template, self.public, "/")
+        serial = {path: path.read_text() for path in self.public.rglob("*.html")}
+
+        parallel_dir = self.root / "parallel"
+        with self.assertLogs(level="INFO") as logs:
+            generate_pages_recursive(self.content, self.template, parallel_dir, "/", workers=3)
+        parallel = {self.public / path.relative_to(parallel_dir): path.read_text()
+                    for path in parallel_dir.rglob("*.html")}
+
+        self.assertEqual(serial, parallel)
+        # Results are logged by the parent in job order
+        self.assertEqual(len(logs.output), 4)
+        self.assertIn("a/index.md", logs.output[0])
+        self.assertIn("c/e/index.md", logs.output[3])
+
+    def test_pipelined_matches_serial(self):
+        jobs = collect_page_jobs(self.content, self.public)
+        serial = [generate_page(job.source, self.template, job.dest, "/") for job in jobs]
+        expected = {path: path.read_text() for path in self.public.rglob("*.html")}
+
+        pipelined_dir = self.root / "pipelined"
+        jobs = collect_page_jobs(self.content, pipelined_dir)
+        with self.assertLogs(level="INFO") as logs:
+            results = render_pages_pipelined(jobs, self.template, "/", depth=1, writers=2)
+
+        self.assertEqual([result.page for result in results], serial)
+        self.assertEqual(expected, {self.public / path.relative_to(pipelined_dir): path.read_text()
+                                    for path in pipelined_dir.rglob("*.html")})
+        # Rendering, and so logging, happens in job order
+        self.assertIn("a/index.md", logs.output[0])
+        self.assertIn("c/e/index.md", logs.output[3])
+
+    def test_pipelined_write_failure_is_reported(self):
+        jobs = collect_page_jobs(self.content, self.public)
+        # A directory where the page should go can't be opened for writing
+        jobs[1].dest.mkdir(parents=True)
+        with self.assertLogs(level="INFO"):
+            results = render_pages_pipelined(jobs, self.template, "/")
+        self.assertEqual([result.error is None for result in results], [True, False, True, True])
+        self.assertIn("IsADirectoryError", results[1].error)
+
+    def test_failures_are_aggregated(self):
+        (self.content / "b" / "index.md").write_text("No title here")
+        (self.content / "c" / "d" / "index.md").write_text("Nor here")
+
+        for workers, pipelined in ((1, False), (1, True), (2, False)):
+            with self.subTest(workers=workers, pipelined=pipelined):
+                with self.assertLogs(level="ERROR"):
+                    with self.assertRaises(BuildError) as ctx:
+                        generate_pages_recursive(self.content, self.template, self.public, "/", workers=workers,
+                                                 pipelined=pipelined)
+                self.assertIn("2 page(s) failed", str(ctx.exception))
+                # The healthy pages are still generated
+                self.assertTrue((self.public / "a" / "index.html").exists())
+                self.assertTrue((self.public / "c" / "e" / "index.html").exists())
+
+    def test_streaming_matches_in_memory(self):
+        source = self.content / "big.md"
+        source.write_text(
+            "---\nauthor: me\n---\n\n# Big [page](/x)\n\n"
+            "```\ncode\n\nmore\n```\n\n> quote\n\n1. one\n2. two\n\nEnd *here*\n"
+        )
+        whole = generate_page(source, self.template, self.root / "whole.html", "/site/", streaming=False)
+        streamed = generate_page(source, self.template, self.root / "streamed.html", "/site/", streaming=True)
+
+        self.assertEqual((self.root / "whole.html").read_text(), (self.root / "streamed.html").read_text())
+        self.assertEqual(whole, streamed)
+
+    def test_streaming_does_not_change_the_title(self):
+        source = self.content / "fenced.md"
+        source.write_text("```\n# not a title\n```\n\n# Real\n\nText")
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                dest = self.root / f"{streaming}.html"
+                with self.assertLogs(level="INFO"):
+                    generate_page(source, self.template, dest, "/", streaming=streaming)
+                self.assertIn("<title>Real</title>", dest.read_text())
+
+    def test_streaming_does_not_change_front_matter(self):
+        source = self.content / "indented.md"
+        source.write_text(" ---\ntitle: not front matter\n---\n\n# Real")
+        outputs = []
+        for streaming in (False, True):
+            dest = self.root / f"{streaming}.html"
+            with self.assertLogs(level="INFO"):
+                generate_page(source, self.template, dest, "/", streaming=streaming)
+            outputs.append(dest.read_text())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertIn("not front matter", outputs[0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,8 @@
 import unittest
-from htmlnode import HTMLNode
+import pickle
+from htmlnode import EMPTY_CHILDREN, EMPTY_PROPS, HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_props_to_html_empty(self):
@@ -47,5 +50,34 @@ class TestHTMLNode(unittest.TestCase):
         expected = 'HTMLNode(tag=p, value=Hello, children=[], props={\'class\': \'greeting\'})'
         self.assertEqual(repr(node), expected)
 
+    def test_empty_children_and_props_are_shared(self):
+        # Childless nodes share one frozen list and dict instead of allocating their own
+        first, second = LeafNode("b", "one"), HTMLNode(tag="p")
+        self.assertIs(first.children, second.children)
+        self.assertIs(first.props, EMPTY_PROPS)
+        with self.assertRaises(TypeError):
+            first.children.append(second)
+        with self.assertRaises(TypeError):
+            first.props["class"] = "x"
+        self.assertEqual(EMPTY_CHILDREN, [])
+        self.assertEqual(EMPTY_PROPS, {})
+
+    def test_own_empty_children_and_props_stay_mutable(self):
+        node = ParentNode("ul", [])
+        node.children.append(LeafNode("li", "item"))
+        self.assertEqual(node.to_html(), "<ul><li>item</li></ul>")
+
+        node = HTMLNode(props={})
+        node.props["class"] = "x"
+        self.assertEqual(node.props_to_html(), ' class="x"')
+        self.assertEqual(EMPTY_CHILDREN, [])
+        self.assertEqual(EMPTY_PROPS, {})
+
+    def test_nodes_have_no_instance_dict(self):
+        node = HTMLNode(tag="p")
+        with self.assertRaises(AttributeError):
+            node.extra = 1
+        self.assertIs(pickle.loads(pickle.dumps(LeafNode("b", "x"))).children, EMPTY_CHILDREN)
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from markdown_parser import extract_markdown_images, extract_markdown_links
+from markdown_parser import MarkdownSpan, extract_markdown_images, extract_markdown_links, extract_markdown_spans
 
 class TestMarkdownParser(unittest.TestCase):
     def test_extract_markdown_images(self):
@@ -61,5 +61,17 @@ class TestMarkdownParser(unittest.TestCase):
         text = "![alt](img.jpg)"
         self.assertEqual(extract_markdown_links(text), [])
 
+    def test_extract_markdown_spans(self):
+        text = "See ![pic](a.png) and [site](b.com)"
+        self.assertEqual(
+            extract_markdown_spans(text),
+            [
+                MarkdownSpan(True, "pic", "a.png", 4, 17),
+                MarkdownSpan(False, "site", "b.com", 22, 35),
+            ]
+        )
+        for span in extract_markdown_spans(text):
+            self.assertTrue(text[span.start:span.end].endswith(f"({span.url})"))
+
 if __name__ == "__main__":
     unittest.main()
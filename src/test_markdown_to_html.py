@@ -1,5 +1,8 @@
 import unittest
 from markdown_to_html import (
+    block_to_html,
+    block_to_html_node,
+    markdown_to_html,
     markdown_to_html_node,
     text_to_children,
     paragraph_to_html_node,
@@ -11,6 +14,7 @@ from markdown_to_html import (
 )
 from htmlnode import HTMLNode
 from parentnode import ParentNode
+from block_parser import parse_blocks
 
 class TestMarkdownToHTML(unittest.TestCase):
     def test_text_to_children(self):
@@ -104,5 +108,53 @@ Code block
         self.assertIn("<blockquote>A quote block</blockquote>", html)
         self.assertIn("<pre><code>Code block</code></pre>", html)
 
+    def test_code_block_with_blank_lines(self):
+        markdown = "```\nfirst\n\nsecond\n```\n\nAfter"
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><pre><code>first\n\nsecond</code></pre><p>After</p></div>",
+        )
+
+    def test_one_line_code_block(self):
+        self.assertEqual(
+            markdown_to_html_node("```x = 1```\n\nAfter").to_html(),
+            "<div><pre><code>x = 1</code></pre><p>After</p></div>",
+        )
+
+    def test_code_on_the_closing_fence_line_is_kept(self):
+        self.assertEqual(
+            markdown_to_html_node("```\nprint('hi')```").to_html(),
+            "<div><pre><code>print('hi')</code></pre></div>",
+        )
+
+    def test_code_line_ending_in_backticks_does_not_close_the_fence(self):
+        markdown = "```sh\necho ok   # prints ```\nls *.md\n```"
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><pre><code>echo ok   # prints ```\nls *.md</code></pre></div>",
+        )
+
+    def test_basepath_rebases_links_and_images(self):
+        node = paragraph_to_html_node("[Home](/) and ![Tom](/images/tom.png)", "/site/")
+        self.assertEqual(
+            node.to_html(),
+            '<p><a href="/site/">Home</a> and <img src="/site/images/tom.png" alt="Tom"></img></p>',
+        )
+
+    def test_basepath_leaves_code_alone(self):
+        markdown = '```\n<a href="/docs">docs</a>\n```'
+        html = markdown_to_html_node(markdown, "/site/").to_html()
+        self.assertIn('<a href="/docs">docs</a>', html)
+
+    def test_direct_html_matches_tree(self):
+        markdown = (
+            "# Title *here*\n\nSome **bold** and [link](/x) ![img](/i.png)\n\n"
+            "```\ncode <b>\n```\n\n> a\n> quote `c`\n\n* one\n- _two_\n\n1. first\n2. second"
+        )
+        for block in parse_blocks(markdown):
+            with self.subTest(block_type=block.block_type):
+                self.assertEqual(block_to_html(block, "/site/"), block_to_html_node(block, "/site/").to_html())
+        self.assertEqual(markdown_to_html(markdown, "/site/"), markdown_to_html_node(markdown, "/site/").to_html())
+
 if __name__ == "__main__":
     unittest.main()
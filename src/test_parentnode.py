@@ -1,3 +1,5 @@
+import io
+import sys
 import unittest
 from parentnode import ParentNode
 from leafnode import LeafNode
@@ -58,5 +60,27 @@ class TestParentNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             ParentNode("div", "not a list")  # Invalid children type
 
+    def test_render_into_list(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")]), LeafNode("li", "two")])
+        parts = []
+        node.render_into(parts.append)
+        self.assertEqual(parts, ["<ul>", "<li>", "<b>", "one", "</b>", "</li>", "<li>", "two", "</li>", "</ul>"])
+        self.assertEqual("".join(parts), node.to_html())
+
+    def test_render_into_stream(self):
+        node = ParentNode("div", [LeafNode(None, "text"), LeafNode("a", "link", {"href": "/"})])
+        out = io.StringIO()
+        node.render_into(out.write)
+        self.assertEqual(out.getvalue(), '<div>text<a href="/">link</a></div>')
+
+    def test_deeply_nested(self):
+        # Far deeper than the recursion limit
+        depth = sys.getrecursionlimit() * 5
+        node = LeafNode("b", "core")
+        for _ in range(depth):
+            node = ParentNode("div", [node, LeafNode(None, ".")])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * depth + "<b>core</b>" + ".</div>" * depth)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,63 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+import profiling
+import markdown_to_html
+from generate_page import PageJob, render_page_job
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(profiling.active())
+        profiling.begin_page()
+        self.assertIsNone(profiling.end_page())
+
+    def test_enable_and_disable_restore_originals(self):
+        original = markdown_to_html.text_to_textnodes
+        profiling.enable()
+        self.assertIsNot(markdown_to_html.text_to_textnodes, original)
+        profiling.disable()
+        self.assertIs(markdown_to_html.text_to_textnodes, original)
+
+    def test_exclusive_stage_times(self):
+        profiler = profiling.Profiler()
+        inner = profiler.timed("inner", lambda: sum(range(1000)))
+        outer = profiler.timed("outer", lambda: inner() + inner())
+        profiler.begin_page()
+        outer()
+        stats = profiler.end_page()
+        self.assertEqual(stats["inner"]["calls"], 2)
+        self.assertEqual(stats["outer"]["calls"], 1)
+        self.assertLessEqual(
+            stats["inner"]["seconds"] + stats["outer"]["seconds"],
+            stats["total"]["seconds"],
+        )
+
+    def test_page_stats_and_report(self):
+        profiler = profiling.enable()
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+            (root / "index.md").write_text("# Title\n\nSome **bold** text\n\n* a\n* b")
+            with self.assertLogs(level="INFO"):
+                result = render_page_job(PageJob(root / "index.md", root / "index.html"), root / "template.html", "/")
+            self.assertIsNone(result.error)
+
+            for stage in ("read", "parse_blocks", "text_to_textnodes",
+                          "html_nodes", "to_html", "template", "write", "total"):
+                self.assertIn(stage, result.stats)
+            # One page, one file written; rendering it doesn't count as writing
+            self.assertEqual(result.stats["write"]["calls"], 1)
+
+            profiler.add_page("index.md", result.stats)
+            report_path = root / "profile.json"
+            profiler.write_json(report_path)
+            report = json.loads(report_path.read_text())
+            self.assertEqual(report["aggregate"]["text_to_textnodes"]["calls"], 4)
+            self.assertIn("index.md", profiler.format_report())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import unittest
+import tempfile
+from pathlib import Path
+from builder import SiteBuilder
+from generate_page import BuildError
+from shards import parse_shard, shard_dir, shard_of
+
+class TestShardAssignment(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for spec in ["0/4", "5/4", "1", "a/b", "1/0"]:
+            with self.subTest(spec=spec):
+                with self.assertRaises(ValueError):
+                    parse_shard(spec)
+
+    def test_shard_of_is_stable_and_in_range(self):
+        # Pinned so a change to the hashing is noticed: it would reshuffle every CI shard
+        self.assertEqual([shard_of(f"page{i}.md", 4) for i in range(6)], [2, 4, 1, 3, 1, 1])
+        self.assertTrue(all(1 <= shard_of(f"page{i}.md", 3) <= 3 for i in range(50)))
+        self.assertEqual({shard_of(f"page{i}.md", 3) for i in range(50)}, {1, 2, 3})
+        self.assertEqual(shard_of("anything.md", 1), 1)
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        (self.root / "static").mkdir()
+        (self.root / "static" / "style.css").write_text("body {}")
+        (self.root / "template.html").write_text("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(8):
+            page = self.root / "content" / f"section{i % 3}" / f"page{i}.md"
+            page.parent.mkdir(parents=True, exist_ok=True)
+            page.write_text(f"# Page {i}\n\n[home](/)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build_shards(self, count: int):
+        for index in range(1, count + 1):
+            # Every shard has pages, each either generated or skipped as unchanged
+            with self.assertLogs(level="DEBUG"):
+                SiteBuilder(self.root, "/base/", fragment_cache_bytes=0, shard=(index, count)).build()
+
+    def outputs(self) -> dict:
+        public = self.root / "docs"
+        return {path.relative_to(public).as_posix(): path.read_bytes() for path in public.rglob("*") if path.is_file()}
+
+    def test_merged_shards_match_a_single_build(self):
+        with self.assertLogs(level="INFO"):
+            SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).build()
+        expected = self.outputs()
+
+        self.build_shards(3)
+        merger = SiteBuilder(self.root, "/base/", fragment_cache_bytes=0)
+        with self.assertLogs(level="INFO"):
+            merger.merge_shards(3, clean=True)
+        self.assertEqual(self.outputs(), expected)
+
+        # The merged manifest is complete, so a normal build has nothing to regenerate
+        with self.assertNoLogs(level="INFO"):
+            SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).build()
+
+    def test_merge_removes_deleted_pages(self):
+        self.build_shards(2)
+        with self.assertLogs(level="INFO"):
+            SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+        self.assertIn("section1/page1.html", self.outputs())
+
+        (self.root / "content" / "section1" / "page1.md").unlink()
+        self.build_shards(2)
+        with self.assertLogs(level="INFO") as logs:
+            SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+        self.assertNotIn("section1/page1.html", self.outputs())
+        # Only the removal is done; unchanged pages aren't copied again
+        self.assertFalse(any("Merging" in line for line in logs.output))
+
+    def test_missing_shard(self):
+        self.build_shards(1)
+        with self.assertLogs(level="INFO"):
+            with self.assertRaises(BuildError):
+                SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+
+    def test_failed_shard_is_not_merged(self):
+        bad = self.root / "content" / "bad.md"
+        bad.write_text("No title")
+        failing = shard_of("bad.md", 2)
+        for index in (1, 2):
+            with self.assertLogs(level="DEBUG"):
+                if index == failing:
+                    with self.assertRaises(BuildError):
+                        SiteBuilder(self.root, "/base/", fragment_cache_bytes=0, shard=(index, 2)).build()
+                else:
+                    SiteBuilder(self.root, "/base/", fragment_cache_bytes=0, shard=(index, 2)).build()
+        with self.assertLogs(level="INFO"):
+            with self.assertRaisesRegex(BuildError, "did not build successfully"):
+                SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+        self.assertFalse(any(path.suffix == ".html" for path in (self.root / "docs").rglob("*")))
+
+        bad.write_text("# Fixed")
+        self.build_shards(2)
+        with self.assertLogs(level="INFO"):
+            SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+        self.assertIn("bad.html", self.outputs())
+
+    def test_mismatched_shard_is_not_merged(self):
+        self.build_shards(2)
+        with self.assertLogs(level="INFO"):
+            with self.assertRaisesRegex(BuildError, "basepath"):
+                SiteBuilder(self.root, "/other/", fragment_cache_bytes=0).merge_shards(2)
+
+        manifest_path = shard_dir(self.root, 1, 2) / "manifest.json"
+        data = json.loads(manifest_path.read_text())
+        for record in data["pages"].values():
+            record["generator"] = "0"
+        manifest_path.write_text(json.dumps(data))
+        # Static files are already in place and no page is copied
+        with self.assertNoLogs(level="INFO"):
+            with self.assertRaisesRegex(BuildError, "generator version"):
+                SiteBuilder(self.root, "/base/", fragment_cache_bytes=0).merge_shards(2)
+
+if __name__ == "__main__":
+    unittest.main()
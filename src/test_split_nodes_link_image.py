@@ -40,6 +40,24 @@ class TestSplitNodesLink(unittest.TestCase):
         self.assertEqual(nodes[0].text, "Already processed")
         self.assertEqual(nodes[0].url, "url.com")
 
+    def test_repeated_link(self):
+        node = TextNode("[a](x) then [a](x) again", TextType.NORMAL)
+        self.assertEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("a", TextType.LINK, "x"),
+                TextNode(" then ", TextType.NORMAL),
+                TextNode("a", TextType.LINK, "x"),
+                TextNode(" again", TextType.NORMAL),
+            ]
+        )
+
+    def test_images_left_in_place(self):
+        node = TextNode("![pic](a.png) and [site](b.com)", TextType.NORMAL)
+        nodes = split_nodes_link([node])
+        self.assertEqual(nodes[0], TextNode("![pic](a.png) and ", TextType.NORMAL))
+        self.assertEqual(nodes[1], TextNode("site", TextType.LINK, "b.com"))
+
 class TestSplitNodesImage(unittest.TestCase):
     def test_single_image(self):
         node = TextNode(
@@ -0,0 +1,48 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from unittest import mock
+import staging
+from staging import stage_directory, staging_dir, swap_in
+
+class TestStaging(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.live = Path(self.tmp.name) / "docs"
+        (self.live / "blog").mkdir(parents=True)
+        (self.live / "index.html").write_text("home")
+        (self.live / "blog" / "post.html").write_text("post")
+        self.staging = staging_dir(self.live)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_stage_links_the_live_tree(self):
+        self.staging.mkdir()
+        (self.staging / "leftover.html").write_text("from an interrupted build")
+
+        self.assertEqual(stage_directory(self.live, self.staging), 2)
+        self.assertFalse((self.staging / "leftover.html").exists())
+        self.assertTrue(os.path.samefile(self.staging / "blog" / "post.html", self.live / "blog" / "post.html"))
+
+        self.assertEqual(stage_directory(self.live, self.staging, link=False), 0)
+        self.assertEqual(list(self.staging.iterdir()), [])
+
+    def test_swap_in(self):
+        for exchange in (True, False):
+            with self.subTest(exchange=exchange):
+                stage_directory(self.live, self.staging, link=False)
+                (self.staging / "new.html").write_text(str(exchange))
+                with mock.patch.object(staging, "exchange_directories", wraps=staging.exchange_directories) as spy:
+                    if not exchange:
+                        spy.side_effect = lambda a, b: False
+                    swap_in(self.staging, self.live)
+
+                self.assertEqual([path.name for path in self.live.iterdir()], ["new.html"])
+                self.assertEqual((self.live / "new.html").read_text(), str(exchange))
+                # Only docs/ is left behind
+                self.assertEqual([path.name for path in self.live.parent.iterdir()], ["docs"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import pickle
+import unittest
+import tempfile
+from pathlib import Path
+from template import CompiledTemplate, TemplateCache, compile_template
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+class TestCompileTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+        return path
+
+    def test_literals_and_slots(self):
+        path = self.write("t.html", "<title>{{ Title }}</title><p>{{Content}}</p>")
+        template = compile_template(path)
+        self.assertEqual(template.literals, ("<title>", "</title><p>", "</p>"))
+        self.assertEqual(template.slots, ("Title", "Content"))
+        self.assertEqual(template.deps, (path.resolve(),))
+
+    def test_render(self):
+        template = CompiledTemplate(("<h1>", "</h1>", ""), ("Title", "Content"), ())
+        self.assertEqual(template.render({"Title": "Hi", "Content": "<p>x</p>"}), "<h1>Hi</h1><p>x</p>")
+
+    def test_render_into_streams_nodes(self):
+        template = CompiledTemplate(("<main>", "</main>"), ("Content",), ())
+        parts = []
+        template.render_into(parts.append, {"Content": ParentNode("p", [LeafNode(None, "hi")])})
+        self.assertEqual(parts, ["<main>", "<p>", "hi", "</p>", "</main>"])
+
+    def test_missing_variable_renders_empty(self):
+        path = self.write("t.html", "by {{ author }}.")
+        self.assertEqual(compile_template(path).render({}), "by .")
+
+    def test_include(self):
+        self.write("partials/nav.html", "<nav>{{ Title }}</nav>")
+        self.write("partials/footer.html", "<footer>fin</footer>")
+        path = self.write(
+            "t.html",
+            '{% include "partials/nav.html" %}<main>{{ Content }}</main>{% include \'partials/footer.html\' %}',
+        )
+        template = compile_template(path)
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "body"}),
+            "<nav>Home</nav><main>body</main><footer>fin</footer>",
+        )
+        self.assertEqual(len(template.deps), 3)
+
+    def test_nested_include_is_relative_to_partial(self):
+        self.write("partials/inner/leaf.html", "leaf")
+        self.write("partials/outer.html", '[{% include "inner/leaf.html" %}]')
+        path = self.write("t.html", '{% include "partials/outer.html" %}')
+        self.assertEqual(compile_template(path).render({}), "[leaf]")
+
+    def test_include_cycle(self):
+        self.write("a.html", '{% include "b.html" %}')
+        self.write("b.html", '{% include "a.html" %}')
+        with self.assertRaises(ValueError):
+            compile_template(self.root / "a.html")
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.default = self.root / "template.html"
+        self.default.write_text("<main>{{ Content }}</main>")
+        (self.root / "layouts").mkdir()
+        (self.root / "layouts" / "post.html").write_text("<article>{{ Content }}</article>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_compiles_once(self):
+        cache = TemplateCache(self.default)
+        first = cache.layout()
+        self.default.write_text("changed")
+        self.assertIs(cache.layout(), first)
+
+    def test_refresh_drops_changed_templates(self):
+        cache = TemplateCache(self.default)
+        first, post = cache.layout(), cache.layout("post")
+        self.assertEqual(cache.refresh(), 0)
+        self.assertIs(cache.layout(), first)
+
+        self.default.write_text("<body>{{ Content }}</body>")
+        self.assertEqual(cache.refresh(), 1)
+        self.assertEqual(cache.layout().render({"Content": "x"}), "<body>x</body>")
+        self.assertIs(cache.layout("post"), post)
+
+    def test_named_layout(self):
+        cache = TemplateCache(self.default)
+        self.assertEqual(cache.layout("post").render({"Content": "x"}), "<article>x</article>")
+        with self.assertRaises(FileNotFoundError):
+            cache.layout("missing")
+
+    def test_preloaded_cache_pickles(self):
+        cache = pickle.loads(pickle.dumps(TemplateCache(self.default).preload()))
+        self.default.unlink()
+        self.assertEqual(cache.layout().render({"Content": "x"}), "<main>x</main>")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -124,5 +124,35 @@ class TestTextToTextNodes(unittest.TestCase):
         with self.assertRaises(ValueError):
             text_to_textnodes("This `is unmatched")
 
+    def test_adjacent_markup(self):
+        """Test markup directly next to other markup"""
+        text = "**bold**_italic_`code`[link](url.com)![img](pic.jpg)"
+        self.assertEqual(
+            text_to_textnodes(text),
+            [
+                TextNode("bold", TextType.BOLD),
+                TextNode("italic", TextType.ITALIC),
+                TextNode("code", TextType.CODE),
+                TextNode("link", TextType.LINK, "url.com"),
+                TextNode("img", TextType.IMAGE, "pic.jpg"),
+            ]
+        )
+
+    def test_code_content_is_literal(self):
+        """Test that code spans are not parsed for emphasis"""
+        nodes = text_to_textnodes("Run `a*b*c` now")
+        self.assertEqual(nodes[1], TextNode("a*b*c", TextType.CODE))
+
+    def test_empty_delimited_span(self):
+        """Test that an empty pair of delimiters produces no node"""
+        self.assertEqual(text_to_textnodes("a `` b"), [
+            TextNode("a ", TextType.NORMAL),
+            TextNode(" b", TextType.NORMAL),
+        ])
+
+    def test_bracket_without_link(self):
+        """Test that brackets that don't form a link stay plain text"""
+        self.assertEqual(text_to_textnodes("see [note] (below)"), [TextNode("see [note] (below)", TextType.NORMAL)])
+
 if __name__ == "__main__":
     unittest.main()
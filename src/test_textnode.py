@@ -1,6 +1,6 @@
 import unittest
 
-from textnode import TextNode, TextType, text_node_to_html_node
+from textnode import TextNode, TextType, text_node_to_html, text_node_to_html_node
 
 class TestTextNode(unittest.TestCase):
     def test_eq(self):
@@ -75,5 +75,20 @@ class TestTextNodeToHTMLNode(unittest.TestCase):
         with self.assertRaises(ValueError):
             text_node_to_html_node(node)
 
+    def test_direct_html_matches_leaf_node(self):
+        nodes = [
+            TextNode("plain", TextType.NORMAL),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("code", TextType.CODE),
+            TextNode("link", TextType.LINK, "/about"),
+            TextNode("alt", TextType.IMAGE, "/img.png"),
+        ]
+        for node in nodes:
+            with self.subTest(node=node):
+                self.assertEqual(text_node_to_html(node, "/site/"), text_node_to_html_node(node, "/site/").to_html())
+        with self.assertRaises(ValueError):
+            text_node_to_html(TextNode("Click me", TextType.LINK))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from urls import rebase_url, rebase_html_attributes
+
+class TestRebaseUrl(unittest.TestCase):
+    def test_root_relative(self):
+        self.assertEqual(rebase_url("/images/tom.png", "/site/"), "/site/images/tom.png")
+        self.assertEqual(rebase_url("/", "/site/"), "/site/")
+
+    def test_default_basepath(self):
+        self.assertEqual(rebase_url("/images/tom.png", "/"), "/images/tom.png")
+
+    def test_other_urls_unchanged(self):
+        self.assertEqual(rebase_url("https://example.com/x", "/site/"), "https://example.com/x")
+        self.assertEqual(rebase_url("//cdn.example.com/x.js", "/site/"), "//cdn.example.com/x.js")
+        self.assertEqual(rebase_url("relative/page", "/site/"), "relative/page")
+
+class TestRebaseHtmlAttributes(unittest.TestCase):
+    def test_rebases_href_and_src(self):
+        html = '<link href="/index.css" /><img src="/a.png"><a href="https://x.com">'
+        self.assertEqual(
+            rebase_html_attributes(html, "/site/"),
+            '<link href="/site/index.css" /><img src="/site/a.png"><a href="https://x.com">',
+        )
+
+    def test_ignores_protocol_relative_and_other_attributes(self):
+        html = '<script src="//cdn/x.js"></script><div data-href="/x">'
+        self.assertEqual(rebase_html_attributes(html, "/site/"), html)
+
+if __name__ == "__main__":
+    unittest.main()
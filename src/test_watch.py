@@ -0,0 +1,44 @@
+import os
+import unittest
+import tempfile
+from pathlib import Path
+from watch import LIVE_RELOAD_SCRIPT, LiveReload, Watcher, inject_live_reload
+
+class TestWatcher(unittest.TestCase):
+    def test_poll_reports_added_modified_and_deleted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            kept, edited, deleted = root / "kept.md", root / "sub" / "edited.md", root / "deleted.md"
+            edited.parent.mkdir()
+            for path in (kept, edited, deleted):
+                path.write_text("x")
+
+            watcher = Watcher([root])
+            self.assertEqual(watcher.poll(), set())
+
+            edited.write_text("changed")
+            # Make sure the edit is visible even on a coarse mtime clock
+            os.utime(edited, ns=(0, 0))
+            deleted.unlink()
+            added = root / "added.md"
+            added.write_text("new")
+            self.assertEqual(watcher.poll(), {edited, deleted, added})
+            self.assertEqual(watcher.poll(), set())
+
+class TestLiveReload(unittest.TestCase):
+    def test_inject_before_body_end(self):
+        html = b"<html><body><p>hi</p></body></html>"
+        self.assertEqual(
+            inject_live_reload(html),
+            b"<html><body><p>hi</p>" + LIVE_RELOAD_SCRIPT.encode() + b"</body></html>",
+        )
+        self.assertTrue(inject_live_reload(b"<p>bare</p>").endswith(LIVE_RELOAD_SCRIPT.encode()))
+
+    def test_wait_returns_new_version(self):
+        live_reload = LiveReload()
+        self.assertEqual(live_reload.wait(0, 0.01), 0)
+        live_reload.notify()
+        self.assertEqual(live_reload.wait(0, 0.01), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,46 +1,78 @@
+import re
 from textnode import TextNode, TextType
-from split_nodes import split_nodes_delimiter
-from split_nodes_link_image import split_nodes_link, split_nodes_image
+from markdown_parser import MARKDOWN_LINK_PATTERN
+
+# One alternation for everything that can start inline markup: an image or
+# link, then the emphasis and code delimiters, longest first so ** wins over *
+INLINE_TOKEN_REGEX = re.compile(MARKDOWN_LINK_PATTERN + r"|\*\*|__|\*|_|`")
+
+DELIMITER_TYPES = {
+    "**": TextType.BOLD,
+    "__": TextType.BOLD,
+    "*": TextType.ITALIC,
+    "_": TextType.ITALIC,
+    "`": TextType.CODE,
+}
 
 def text_to_textnodes(text):
     """
     Convert a markdown-flavored text string into a list of TextNode objects.
-    
-    The function processes the text in stages:
-    1. Creates initial text node
-    2. Splits on image markdown
-    3. Splits on link markdown
-    4. Splits on delimiter pairs (**, *, `)
-    
+
+    The text is scanned once, left to right. At each piece of markup:
+    1. Images and links become IMAGE / LINK nodes
+    2. A delimiter (**, __, *, _, `) is paired with the next occurrence of
+       the same delimiter, and everything between becomes one node
+    3. Text between markup becomes NORMAL nodes
+
+    Like the split_nodes_* helpers, delimited content is not parsed further,
+    and empty delimited spans produce no node.
+
     Args:
         text (str): Markdown-flavored text to parse
-        
+
     Returns:
         list: List of TextNode objects representing the parsed text
-    
+
+    Raises:
+        ValueError: If a delimiter has no closing partner
+
     Example:
         >>> text = "Hello **world** with [link](url.com)"
         >>> nodes = text_to_textnodes(text)
         >>> [node.text_type for node in nodes]
-        [TextType.TEXT, TextType.BOLD, TextType.TEXT, TextType.LINK]
+        [TextType.NORMAL, TextType.BOLD, TextType.NORMAL, TextType.LINK]
     """
-    # Start with a single text node
-    nodes = [TextNode(text, TextType.NORMAL)]
-    
-    # Split on image markdown first (images can't contain other markdown)
-    nodes = split_nodes_image(nodes)
-    
-    # Split on link markdown next (links can't contain other markdown)
-    nodes = split_nodes_link(nodes)
-    
-    # Split on markdown delimiters
-    # Process bold delimiters first (both ** and __)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "__", TextType.BOLD)
-    # Then process italic delimiters (both * and _)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    # Finally process code delimiter
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = []
+    # Start of the plain text not yet emitted
+    plain_start = 0
+    search = INLINE_TOKEN_REGEX.search
+
+    match = search(text)
+    while match is not None:
+        start = match.start()
+        # Everything since the previous piece of markup is plain text
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], TextType.NORMAL))
+
+        bang, label, url = match.groups()
+        if label is not None:
+            # Images and links never contain other markup
+            text_type = TextType.IMAGE if bang else TextType.LINK
+            nodes.append(TextNode(label, text_type, url))
+            plain_start = match.end()
+        else:
+            delimiter = match.group()
+            close = text.find(delimiter, match.end())
+            if close == -1:
+                raise ValueError(f"Found unmatched delimiter {delimiter}")
+            if close > match.end():
+                nodes.append(TextNode(text[match.end():close], DELIMITER_TYPES[delimiter]))
+            plain_start = close + len(delimiter)
+
+        match = search(text, plain_start)
+
+    # Add any plain text after the last piece of markup
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], TextType.NORMAL))
 
     return nodes
@@ -1,5 +1,6 @@
 from enum import Enum
 from leafnode import LeafNode
+from urls import rebase_url
 
 class TextType(Enum):
     NORMAL = "normal"
@@ -10,6 +11,8 @@ class TextType(Enum):
     IMAGE = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url = None):
         self.text = text
         self.text_type = text_type
@@ -27,7 +30,13 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
 
-def text_node_to_html_node(text_node):
+def text_node_to_html_node(text_node, basepath="/"):
+    """
+    Convert a TextNode into the LeafNode that renders it.
+
+    Root-relative link and image URLs are prefixed with basepath here, so
+    the rendered page needs no rewriting afterwards.
+    """
     match text_node.text_type:
         case TextType.NORMAL:
             return LeafNode(None, text_node.text)
@@ -40,10 +49,37 @@ def text_node_to_html_node(text_node):
         case TextType.LINK:
             if text_node.url is None:
                 raise ValueError("URL is required for link text nodes")
-            return LeafNode("a", text_node.text, {"href": text_node.url})
+            return LeafNode("a", text_node.text, {"href": rebase_url(text_node.url, basepath)})
+        case TextType.IMAGE:
+            if text_node.url is None:
+                raise ValueError("URL is required for image text nodes")
+            return LeafNode("img", "", {"src": rebase_url(text_node.url, basepath), "alt": text_node.text})
+        case _:
+            raise ValueError(f"Invalid text type: {text_node.text_type}")
+
+def text_node_to_html(text_node, basepath="/"):
+    """
+    Render a TextNode straight to the HTML its LeafNode would produce.
+
+    The fast path for inline content: no LeafNode or props dict is built
+    just to be turned back into a string.
+    """
+    match text_node.text_type:
+        case TextType.NORMAL:
+            return text_node.text
+        case TextType.BOLD:
+            return f"<b>{text_node.text}</b>"
+        case TextType.ITALIC:
+            return f"<i>{text_node.text}</i>"
+        case TextType.CODE:
+            return f"<code>{text_node.text}</code>"
+        case TextType.LINK:
+            if text_node.url is None:
+                raise ValueError("URL is required for link text nodes")
+            return f'<a href="{rebase_url(text_node.url, basepath)}">{text_node.text}</a>'
         case TextType.IMAGE:
             if text_node.url is None:
                 raise ValueError("URL is required for image text nodes")
-            return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+            return f'<img src="{rebase_url(text_node.url, basepath)}" alt="{text_node.text}"></img>'
         case _:
             raise ValueError(f"Invalid text type: {text_node.text_type}")
@@ -0,0 +1,36 @@
+import re
+
+# href="/... or src="/... but not protocol-relative href="//...
+ROOT_RELATIVE_ATTRIBUTE_REGEX = re.compile(r'(?<![\w-])(href|src)="/(?!/)')
+
+def rebase_url(url: str, basepath: str) -> str:
+    """
+    Prefix a root-relative URL with the site's basepath.
+
+    Args:
+        url (str): URL as written in the source
+        basepath (str): URL prefix the site is served under, ending in '/'
+
+    Returns:
+        str: The rebased URL; other URLs are returned unchanged
+
+    Example:
+        >>> rebase_url("/images/tom.png", "/site-generator/")
+        '/site-generator/images/tom.png'
+        >>> rebase_url("https://example.com", "/site-generator/")
+        'https://example.com'
+    """
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+def rebase_html_attributes(html: str, basepath: str) -> str:
+    """
+    Rebase root-relative href and src attributes in a fragment of literal HTML.
+
+    Only used on template text, once per compile; rendered page content is
+    rebased as its nodes are built.
+    """
+    if basepath == "/":
+        return html
+    return ROOT_RELATIVE_ATTRIBUTE_REGEX.sub(lambda match: f'{match.group(1)}="{basepath}', html)
@@ -0,0 +1,226 @@
+import os
+import time
+import logging
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Set, Tuple
+from generate_page import BuildError
+
+# Endpoint browsers subscribe to for reload events
+LIVE_RELOAD_PATH = "/__livereload"
+
+# Injected into every HTML page served while watching
+LIVE_RELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVE_RELOAD_PATH}")'
+    '.addEventListener("reload", function () { location.reload(); });</script>'
+)
+
+# Seconds between keep-alive comments on an idle event stream; a write to a
+# closed tab fails and ends its handler thread
+KEEPALIVE_SECONDS = 15
+
+class Watcher:
+    """
+    Polls a set of files and directory trees for changes.
+
+    Each poll compares (mtime, size) of every file against the previous
+    snapshot, which is cheap for a site-sized tree and needs nothing beyond
+    the standard library.
+    """
+
+    def __init__(self, paths: Iterable[Path]):
+        self.paths = set(paths)
+        self.files = self.snapshot()
+
+    def snapshot(self) -> Dict[Path, Tuple[int, int]]:
+        """
+        Stat every watched file, walking watched directories.
+        """
+        files = {}
+        for path in self.paths:
+            if path.is_dir():
+                for dirpath, _, filenames in os.walk(path):
+                    for name in filenames:
+                        self._stat_into(files, Path(dirpath) / name)
+            else:
+                self._stat_into(files, path)
+        return files
+
+    @staticmethod
+    def _stat_into(files: dict, path: Path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return
+        files[path] = (stat.st_mtime_ns, stat.st_size)
+
+    def watch(self, paths: Iterable[Path]):
+        """
+        Replace the watched paths, adopting newly watched files as unchanged.
+        """
+        self.paths = set(paths)
+        current = self.snapshot()
+        # Keep the old state of files still watched so pending edits aren't lost
+        self.files = {path: self.files.get(path, state) for path, state in current.items()}
+
+    def poll(self) -> Set[Path]:
+        """
+        Return every file added, modified or deleted since the last poll.
+        """
+        current = self.snapshot()
+        changed = {path for path in current.keys() | self.files.keys() if current.get(path) != self.files.get(path)}
+        self.files = current
+        return changed
+
+class LiveReload:
+    """
+    Broadcasts reload events to every waiting browser connection.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def notify(self):
+        with self._condition:
+            self.version += 1
+            self._condition.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        """
+        Block until the version moves past seen or timeout expires; return the version.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+def inject_live_reload(html: bytes) -> bytes:
+    """
+    Add the live reload script just before </body>, or at the end if there is none.
+    """
+    marker = html.rfind(b"</body>")
+    script = LIVE_RELOAD_SCRIPT.encode('utf-8')
+    if marker == -1:
+        return html + script
+    return html[:marker] + script + html[marker:]
+
+class LiveReloadMixin:
+    """
+    Request handler methods for the server-sent event stream.
+
+    The server must have a ``live_reload`` attribute holding the
+    LiveReload to listen to; start_server sets it.
+    """
+
+    def send_event_stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+
+        live_reload = self.server.live_reload
+        seen = live_reload.version
+        try:
+            while True:
+                version = live_reload.wait(seen, KEEPALIVE_SECONDS)
+                if version != seen:
+                    seen = version
+                    self.wfile.write(f"event: reload\ndata: {version}\n\n".encode('utf-8'))
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class LiveReloadHandler(LiveReloadMixin, SimpleHTTPRequestHandler):
+    """
+    Serves the built site and injects the live reload script into its pages.
+    """
+
+    def do_GET(self):
+        if self.path == LIVE_RELOAD_PATH:
+            self.send_event_stream()
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.split('?', 1)[0].endswith('/'):
+            path = path / "index.html"
+        if path.suffix != ".html" or not path.is_file():
+            # Static files and directory redirects are served as usual
+            super().do_GET()
+            return
+
+        body = inject_live_reload(path.read_bytes())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"{self.address_string()} {format % args}")
+
+def start_server(handler, port: int, live_reload: LiveReload, **attributes) -> ThreadingHTTPServer:
+    """
+    Start an HTTP server on a background thread and return it.
+
+    Args:
+        handler: Request handler class (or factory) using LiveReloadMixin
+        port (int): Port to listen on, on localhost
+        live_reload (LiveReload): Reload events to push to pages
+        **attributes: Extra attributes set on the server for handlers to use
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.live_reload = live_reload
+    for name, value in attributes.items():
+        setattr(server, name, value)
+    # Open event streams must not keep the process alive on exit
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(f"Serving on http://127.0.0.1:{port}/")
+    return server
+
+def watch(builder, port: int = 8888, interval: float = 0.1):
+    """
+    Serve the site and rebuild the affected pages whenever a source changes.
+
+    Every rebuild pushes a reload event to the open pages. Runs until
+    interrupted.
+
+    Args:
+        builder (SiteBuilder): Builder whose site has already been built once
+        port (int): Port to serve docs/ on
+        interval (float): Seconds between polls
+    """
+    live_reload = LiveReload()
+    server = start_server(partial(LiveReloadHandler, directory=str(builder.public_dir)), port, live_reload)
+    watcher = Watcher(builder.watched_paths())
+    logging.info("Watching for changes, press Ctrl+C to stop")
+
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if not changed:
+                continue
+
+            start = time.perf_counter()
+            try:
+                plan = builder.rebuild(changed)
+            except BuildError as e:
+                logging.error(str(e))
+                continue
+            finally:
+                # A rebuild can add or drop layouts and partials to watch
+                watcher.watch(builder.watched_paths())
+
+            if not plan.is_empty():
+                logging.info(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+                live_reload.notify()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()